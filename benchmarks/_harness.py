@@ -0,0 +1,154 @@
+# mcp_sdk/benchmarks/_harness.py
+
+"""
+Minimal timing harness shared by the benchmark scripts.
+
+Run benchmarks from the repository root, e.g.:
+
+    python -m benchmarks.validation
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    *,
+    iterations: int = 20000,
+    warmup: int = 1000,
+) -> Result:
+    """
+    Time `fn` call by call and summarize throughput and latency.
+    """
+    for _ in range(warmup):
+        fn()
+
+    clock = time.perf_counter_ns
+    samples: List[int] = [0] * iterations
+
+    started = clock()
+    for index in range(iterations):
+        t0 = clock()
+        fn()
+        samples[index] = clock() - t0
+    elapsed = clock() - started
+
+    return summarize(name, samples, elapsed)
+
+
+def summarize(name: str, samples_ns: List[int], elapsed_ns: int) -> Result:
+    ordered = sorted(samples_ns)
+    count = len(ordered)
+    return Result(
+        name=name,
+        iterations=count,
+        ops_per_sec=count / (elapsed_ns / 1e9) if elapsed_ns else 0.0,
+        p50_us=ordered[count // 2] / 1e3,
+        p99_us=ordered[min(count - 1, int(count * 0.99))] / 1e3,
+    )
+
+
+def print_table(results: List[Result]) -> None:
+    width = max(len(result.name) for result in results)
+    print(f"{'benchmark':<{width}}  {'ops/sec':>12}  {'p50 us':>9}  {'p99 us':>9}")
+    for result in results:
+        print(
+            f"{result.name:<{width}}  {result.ops_per_sec:>12,.0f}  "
+            f"{result.p50_us:>9.2f}  {result.p99_us:>9.2f}"
+        )
+
+
+# -------------------------------------------------
+# Baselines
+# -------------------------------------------------
+
+class Comparison(NamedTuple):
+    current: Result
+    baseline: Optional[Result]
+    # relative change, positive is faster: ops/sec and p50 latency
+    ops_change: float
+    p50_change: float
+    regressed: bool
+
+
+def save_baseline(path: str, results: List[Result]) -> None:
+    """
+    Write results to a JSON baseline file, with the interpreter and
+    machine they were measured on.
+    """
+    document = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": [result.to_dict() for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2)
+        handle.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Result]:
+    with open(path, encoding="utf-8") as handle:
+        document = json.load(handle)
+    return {entry["name"]: Result(**entry) for entry in document["results"]}
+
+
+def compare(results: List[Result], baseline: Dict[str, Result], threshold: float) -> List[Comparison]:
+    """
+    Compare results against a baseline by benchmark name.
+
+    A benchmark regressed when its throughput dropped, or its p50
+    latency grew, by more than `threshold` (a fraction, e.g. 0.15).
+    Benchmarks missing from the baseline never regress.
+    """
+    comparisons: List[Comparison] = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            comparisons.append(Comparison(result, None, 0.0, 0.0, False))
+            continue
+
+        ops_change = result.ops_per_sec / base.ops_per_sec - 1 if base.ops_per_sec else 0.0
+        p50_change = base.p50_us / result.p50_us - 1 if result.p50_us else 0.0
+        regressed = ops_change < -threshold or p50_change < -threshold
+        comparisons.append(Comparison(result, base, ops_change, p50_change, regressed))
+    return comparisons
+
+
+def print_comparison(comparisons: List[Comparison]) -> None:
+    width = max(len(item.current.name) for item in comparisons)
+    print(
+        f"{'benchmark':<{width}}  {'ops/sec':>12}  {'p50 us':>9}  {'p99 us':>9}"
+        f"  {'ops vs base':>11}  {'p50 vs base':>11}"
+    )
+    for item in comparisons:
+        result = item.current
+        if item.baseline is None:
+            change = f"{'new':>11}  {'new':>11}"
+        else:
+            change = f"{item.ops_change:>+11.1%}  {item.p50_change:>+11.1%}"
+        flag = "  REGRESSION" if item.regressed else ""
+        print(
+            f"{result.name:<{width}}  {result.ops_per_sec:>12,.0f}  "
+            f"{result.p50_us:>9.2f}  {result.p99_us:>9.2f}  {change}{flag}"
+        )
@@ -0,0 +1,79 @@
+# mcp_sdk/benchmarks/json_codec.py
+
+"""
+Compare JSON codec backends on realistic MCP payloads.
+
+For each installed backend, measures parsing a request and serializing
+responses, both through the str API (loads/dumps plus the transport
+encode/decode the shells used to do) and the bytes API
+(loads_bytes/dumps_bytes).
+
+Usage:
+    python -m benchmarks.json_codec
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from benchmarks._harness import Result, measure, print_table
+from utils.json import CODECS
+
+
+REQUEST = {
+    "tool": "ai",
+    "input": {
+        "prompt": "Jelaskan apa itu MCP stateless secara singkat, dengan contoh dan kelebihannya.",
+        "negative_prompt": "2D, pixel, cartoon",
+        "seed": 42,
+    },
+    "meta": {"id": "req-00042", "client_id": "web-frontend"},
+    "ai": {"provider": "pollinations", "type": "text", "model": "openai"},
+}
+
+TEXT_RESPONSE = {
+    "success": True,
+    "meta": {"id": "req-00042"},
+    "data": {"text": "MCP stateless berarti setiap request diproses secara independen. " * 20},
+}
+
+ERROR_RESPONSE = {
+    "success": False,
+    "meta": {},
+    "error": {
+        "code": "SCHEMA_VIOLATION",
+        "message": "Field 'prompt' must be a string",
+        "details": {"errors": [{"path": "prompt", "message": "Field 'prompt' must be a string"}]},
+    },
+}
+
+BATCH_RESPONSE = [dict(TEXT_RESPONSE, meta={"id": i}) for i in range(50)]
+
+
+def bench_codec(name: str, codec: Any) -> List[Result]:
+    raw_str = codec.dumps(REQUEST)
+    raw_bytes = raw_str.encode("utf-8")
+
+    cases: Dict[str, Any] = {
+        "request loads(str.decode)": lambda: codec.loads(raw_bytes.decode("utf-8")),
+        "request loads_bytes": lambda: codec.loads(raw_bytes),
+        "text response dumps().encode": lambda: codec.dumps(TEXT_RESPONSE).encode("utf-8"),
+        "text response dumps_bytes": lambda: codec.dumps_bytes(TEXT_RESPONSE),
+        "error response dumps_bytes": lambda: codec.dumps_bytes(ERROR_RESPONSE),
+        "batch(50) response dumps_bytes": lambda: codec.dumps_bytes(BATCH_RESPONSE),
+    }
+    return [
+        measure(f"{name}: {case}", fn, iterations=5000 if "batch" in case else 50000)
+        for case, fn in cases.items()
+    ]
+
+
+def main() -> None:
+    results: List[Result] = []
+    for name, factory in CODECS.items():
+        results.extend(bench_codec(name, factory()))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
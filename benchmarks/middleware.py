@@ -0,0 +1,44 @@
+# mcp_sdk/benchmarks/middleware.py
+
+"""
+Per-request cost of the dispatcher middleware chain.
+
+none    -- Dispatcher without middleware (plain request path)
+no-op   -- one Middleware with default hooks: chain, context and spans
+payload -- dispatch_payload() with the same middleware (adds parse and
+           serialize spans)
+
+Usage:
+    python -m benchmarks.middleware
+"""
+
+from __future__ import annotations
+
+from benchmarks._harness import measure, print_table
+from core.dispatcher import Dispatcher
+from core.middleware import Middleware
+from core.tools import get_tools
+from protocol.request import MCPRequest
+
+
+PAYLOAD = {
+    "tool": "validate_input",
+    "input": {"fields": {"name": "x", "email": "y"}, "required": ["name", "email", "age"]},
+}
+REQUEST = MCPRequest.from_dict(PAYLOAD)
+
+
+def main() -> None:
+    plain = Dispatcher(get_tools())
+    chained = Dispatcher(get_tools(), middleware=[Middleware()])
+
+    print_table([
+        measure("dispatch: no middleware", lambda: plain.dispatch(REQUEST), iterations=100000),
+        measure("dispatch: one no-op middleware", lambda: chained.dispatch(REQUEST), iterations=100000),
+        measure("dispatch_payload: no middleware", lambda: plain.dispatch_payload(PAYLOAD), iterations=100000),
+        measure("dispatch_payload: one no-op middleware", lambda: chained.dispatch_payload(PAYLOAD), iterations=100000),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# mcp_sdk/benchmarks/suite.py
+
+"""
+Offline benchmark suite for protocol, dispatcher and shells.
+
+Every case runs in-process against stub AI executors, so results do not
+depend on the network or on provider SDKs being installed:
+
+- protocol:   MCPRequest.from_dict, MCPSchema.validate_request,
+              MCPResponse.to_dict + JSON serialization
+- dispatcher: Dispatcher.dispatch for a tool and for an AI request
+- shells:     one STDIO line through shell.stdio.serve, one POST /mcp
+              over a keep-alive connection to a local shell.http server
+
+Each case runs `--repeat` times (in rounds over all cases, with the
+garbage collector paused) and keeps its fastest run, which filters out
+most scheduler noise.
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json [--threshold 0.15]
+
+With --compare the exit status is 1 when any benchmark regressed.
+Baselines are only comparable on the same machine and interpreter.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import http.client
+import io
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks._harness import (
+    Result,
+    compare,
+    load_baseline,
+    measure,
+    print_comparison,
+    print_table,
+    save_baseline,
+)
+from core.dispatcher import Dispatcher
+from core.metrics import Metrics
+from core.tools import get_tools
+from protocol.request import MCPRequest
+from protocol.schema import MCPSchema
+from utils.json import dumps_bytes as json_dumps_bytes
+
+
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_REPEAT = 3
+
+TOOL_PAYLOAD = {
+    "tool": "validate_input",
+    "input": {"fields": {"name": "x", "email": "y"}, "required": ["name", "email", "age"]},
+    "meta": {"id": "bench-tool"},
+}
+
+AI_PAYLOAD = {
+    "tool": "ai",
+    "input": {"prompt": "Jelaskan apa itu MCP stateless secara singkat."},
+    "meta": {"id": "bench-ai"},
+    "ai": {"provider": "stub", "type": "text"},
+}
+
+HTTP_CASE = "shell: http post (ai, keep-alive)"
+
+STUB_TEXT = "MCP stateless berarti setiap request diproses secara independen. " * 8
+
+
+class StubTextExecutor:
+    """
+    AI executor returning a fixed completion, without any IO.
+    """
+
+    provider = "stub"
+
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        return STUB_TEXT
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        return STUB_TEXT
+
+
+def build_bench_dispatcher() -> Dispatcher:
+    # same instrumentation as build_dispatcher(), stub providers
+    return Dispatcher(
+        get_tools(),
+        ai_executors={"stub": StubTextExecutor()},
+        metrics=Metrics(),
+    )
+
+
+# -------------------------------------------------
+# Cases
+# -------------------------------------------------
+
+Case = Tuple[str, Callable[[], Any], int]
+
+
+def protocol_cases() -> List[Case]:
+    tool_request = MCPRequest.from_dict(TOOL_PAYLOAD)
+    ai_request = MCPRequest.from_dict(AI_PAYLOAD)
+    response = build_bench_dispatcher().dispatch(ai_request)
+
+    return [
+        ("protocol: from_dict tool", lambda: MCPRequest.from_dict(TOOL_PAYLOAD), 100000),
+        ("protocol: from_dict ai", lambda: MCPRequest.from_dict(AI_PAYLOAD), 100000),
+        ("protocol: validate_request tool", lambda: MCPSchema.validate_request(tool_request), 100000),
+        ("protocol: validate_request ai", lambda: MCPSchema.validate_request(ai_request), 100000),
+        ("protocol: to_dict + dumps_bytes", lambda: json_dumps_bytes(response.to_dict()), 100000),
+    ]
+
+
+def dispatcher_cases() -> List[Case]:
+    dispatcher = build_bench_dispatcher()
+    tool_request = MCPRequest.from_dict(TOOL_PAYLOAD)
+    ai_request = MCPRequest.from_dict(AI_PAYLOAD)
+
+    return [
+        ("dispatcher: dispatch tool", lambda: dispatcher.dispatch(tool_request), 50000),
+        ("dispatcher: dispatch ai (stub)", lambda: dispatcher.dispatch(ai_request), 50000),
+    ]
+
+
+def stdio_cases() -> List[Case]:
+    from shell.stdio import serve
+
+    dispatcher = build_bench_dispatcher()
+    line = json_dumps_bytes(AI_PAYLOAD) + b"\n"
+
+    def _one_line() -> None:
+        serve(dispatcher, stdin=io.BytesIO(line), stdout=io.BytesIO())
+
+    return [("shell: stdio line (ai)", _one_line, 20000)]
+
+
+class _HTTPTarget:
+    """
+    shell.http server on an ephemeral local port, serving a stub dispatcher.
+    """
+
+    def __init__(self) -> None:
+        from shell.http import MCPHandler, PooledHTTPServer
+
+        handler = type("BenchHandler", (MCPHandler,), {"dispatcher": build_bench_dispatcher()})
+        # idle between rounds; keep the one client connection open
+        self.server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2, keepalive_timeout=600)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self._connections: List[http.client.HTTPConnection] = []
+
+    def client(self) -> Callable[[], bytes]:
+        conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+        self._connections.append(conn)
+        body = json_dumps_bytes(AI_PAYLOAD)
+        headers = {"Content-Type": "application/json"}
+
+        def _post() -> bytes:
+            conn.request("POST", "/mcp", body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {data[:200]!r}")
+            return data
+
+        return _post
+
+    def close(self) -> None:
+        # the server waits for its keep-alive workers; hang up first
+        for conn in self._connections:
+            conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_cases(cases: List[Case], repeat: int, scale: float) -> List[Result]:
+    best: Dict[str, Result] = {}
+    # whole rounds rather than back-to-back runs of one case, so a slow
+    # spell on the machine does not hit every run of the same case
+    for _ in range(repeat):
+        for name, fn, iterations in cases:
+            count = max(100, int(iterations * scale))
+            gc.collect()
+            gc.disable()
+            try:
+                result = measure(name, fn, iterations=count, warmup=min(1000, count))
+            finally:
+                gc.enable()
+            if name not in best or result.ops_per_sec > best[name].ops_per_sec:
+                best[name] = result
+    return [best[name] for name, _, _ in cases]
+
+
+def run_suite(pattern: Optional[str] = None, repeat: int = DEFAULT_REPEAT, scale: float = 1.0) -> List[Result]:
+    cases = protocol_cases() + dispatcher_cases() + stdio_cases()
+
+    target: Optional[_HTTPTarget] = None
+    if pattern is None or pattern in HTTP_CASE:
+        target = _HTTPTarget()
+        cases.append((HTTP_CASE, target.client(), 5000))
+
+    try:
+        return run_cases([case for case in cases if pattern is None or pattern in case[0]], repeat, scale)
+    finally:
+        if target is not None:
+            target.close()
+
+
+# -------------------------------------------------
+# Entry point
+# -------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Offline MCP benchmark suite")
+    parser.add_argument("-k", "--filter", default=None,
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="runs per benchmark; the fastest is kept")
+    parser.add_argument("--quick", action="store_true",
+                        help="a tenth of the iterations (smoke run, noisier)")
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown flagged as a regression (default: 0.15)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.filter, repeat=max(1, args.repeat), scale=0.1 if args.quick else 1.0)
+    if not results:
+        print("no benchmark matches the filter", file=sys.stderr)
+        return 2
+
+    exit_code = 0
+    if args.compare:
+        baseline: Dict[str, Result] = load_baseline(args.compare)
+        comparisons = compare(results, baseline, args.threshold)
+        print_comparison(comparisons)
+        regressed = [item.current.name for item in comparisons if item.regressed]
+        if regressed:
+            print(f"\n{len(regressed)} regression(s) over {args.threshold:.0%}: {', '.join(regressed)}")
+            exit_code = 1
+    else:
+        print_table(results)
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# mcp_sdk/benchmarks/validation.py
+
+"""
+Per-request validation overhead: legacy multi-pass vs compiled.
+
+legacy   -- MCPSchema.validate_request followed by the hand-written
+            checks tools also run inside execute()
+compiled -- the single-pass validator MCPSchema.compile_tool_validator
+            builds from a tool's input_schema (what the dispatcher runs)
+
+Both paths go through public MCPSchema entry points, raise on invalid
+input the same way and are timed by the same harness: module-level
+functions bound to their request, run in batches of `--number` calls
+(a per-call clock read would cost about as much as the validation
+itself). Cases alternate within each of `--repeat` rounds and the
+fastest batch per case is reported.
+
+Usage:
+    python -m benchmarks.validation [--repeat 7] [--number 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import gc
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.tools import get_tools
+from protocol.errors import MCPError, MCPErrorCode
+from protocol.request import MCPRequest
+from protocol.schema import MCPSchema
+
+
+DEFAULT_REPEAT = 7
+DEFAULT_NUMBER = 100000
+
+
+def _legacy_generate_checks(input: Dict[str, Any]) -> None:
+    if not isinstance(input, dict):
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Input must be a dictionary")
+    prompt = input.get("prompt")
+    if not isinstance(prompt, str):
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Field 'prompt' must be a string")
+    if not prompt.strip():
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Field 'prompt' cannot be empty")
+
+
+def _legacy_validate_checks(input: Dict[str, Any]) -> None:
+    if not isinstance(input, dict):
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Input must be a dictionary")
+    if not isinstance(input.get("fields"), dict):
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Field 'fields' must be a dictionary")
+    if not isinstance(input.get("required", []), list):
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message="Field 'required' must be a list")
+
+
+REQUESTS = {
+    "ai": (
+        MCPRequest.from_dict({"tool": "ai", "input": {"prompt": "Explain stateless dispatch"}}),
+        _legacy_generate_checks,
+    ),
+    "validate_input": (
+        MCPRequest.from_dict({
+            "tool": "validate_input",
+            "input": {"fields": {"name": "x", "email": "y"}, "required": ["name", "email", "age"]},
+        }),
+        _legacy_validate_checks,
+    ),
+}
+
+
+def _legacy(checks: Callable[[Dict[str, Any]], None], request: MCPRequest) -> None:
+    MCPSchema.validate_request(request)
+    checks(request.input)
+
+
+def _compiled(validator: Callable[[MCPRequest], List[Dict[str, str]]], request: MCPRequest) -> None:
+    # as Dispatcher._validate: structured errors become one SCHEMA_VIOLATION
+    errors = validator(request)
+    if errors:
+        raise MCPError(code=MCPErrorCode.SCHEMA_VIOLATION, message=errors[0]["message"])
+
+
+def best_ns(cases: List[Tuple[str, Callable[[], None]]], repeat: int, number: int) -> Dict[str, float]:
+    """Fastest batch per case, in ns per call."""
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        for name, fn in cases:
+            gc.collect()
+            gc.disable()
+            try:
+                elapsed = timeit.timeit(fn, number=number)
+            finally:
+                gc.enable()
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return {name: seconds / number * 1e9 for name, seconds in best.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.validation")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="rounds; the fastest batch per case is kept")
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER,
+                        help="calls per batch")
+    args = parser.parse_args(argv)
+
+    tools = get_tools()
+    cases = []
+    for name, (request, legacy_checks) in REQUESTS.items():
+        validator = MCPSchema.compile_tool_validator(getattr(tools[name], "input_schema", None))
+        cases.append((f"{name}: legacy multi-pass", functools.partial(_legacy, legacy_checks, request)))
+        cases.append((f"{name}: compiled single-pass", functools.partial(_compiled, validator, request)))
+
+    timings = best_ns(cases, args.repeat, args.number)
+
+    width = max(len(name) for name, _ in cases)
+    print(f"{'benchmark':<{width}}  {'ns/call':>9}  {'vs legacy':>9}")
+    for (legacy, _), (compiled, _) in zip(cases[::2], cases[1::2]):
+        change = (timings[compiled] - timings[legacy]) / timings[legacy]
+        print(f"{legacy:<{width}}  {timings[legacy]:>9.0f}")
+        print(f"{compiled:<{width}}  {timings[compiled]:>9.0f}  {change:>+9.0%}")
+
+
+if __name__ == "__main__":
+    main()
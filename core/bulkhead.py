@@ -0,0 +1,284 @@
+# mcp_sdk/core/bulkhead.py
+
+"""
+Bulkhead concurrency caps per provider (executor key) and per tool.
+
+Every configured key gets its own compartment:
+- at most `max_in_flight` calls run at once
+- up to `max_queue` callers wait (FIFO, at most `max_wait` seconds
+  and never past the request deadline) for a free slot; anyone else
+  is rejected at once with MCPErrorCode.OVERLOADED
+- a private thread pool of `max_in_flight` workers for sync executor
+  methods called from the async path
+
+A backlog in one compartment therefore never holds slots, queue
+places or worker threads of another. Keys without a limit run
+unbounded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Mapping, Optional, TypeVar, Union
+
+from protocol.errors import MCPError, MCPErrorCode
+from utils import deadline
+
+
+T = TypeVar("T")
+
+PROVIDER = "provider"
+TOOL = "tool"
+
+
+@dataclass(frozen=True)
+class BulkheadLimit:
+    """
+    Attributes:
+        max_in_flight: calls allowed to run at once
+        max_queue: callers allowed to wait for a slot (0: never wait)
+        max_wait: longest wait for a slot, in seconds
+    """
+
+    max_in_flight: int
+    max_queue: int = 0
+    max_wait: float = 1.0
+
+    def __post_init__(self) -> None:
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        if self.max_queue < 0 or self.max_wait < 0:
+            raise ValueError("max_queue and max_wait must be >= 0")
+
+
+class _Waiter:
+    """
+    A queued caller. `granted` is set (under the bulkhead lock) when a
+    releasing caller hands its slot over.
+    """
+
+    __slots__ = ("granted", "_event", "_loop", "_future")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.granted = False
+        self._loop = loop
+        self._event = threading.Event() if loop is None else None
+        self._future = loop.create_future() if loop is not None else None
+
+    def wake(self) -> None:
+        if self._loop is None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+
+class _Compartment:
+    __slots__ = ("limit", "in_flight", "waiters", "pool", "admitted", "queued", "rejected", "peak")
+
+    def __init__(self, limit: BulkheadLimit) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque[_Waiter] = deque()
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.peak = 0
+
+
+class Bulkhead:
+    """
+    Isolated concurrency compartments for providers and tools.
+    Thread-safe; sync callers block their thread while queued, async
+    callers wait on their own event loop.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Mapping[str, Union[int, BulkheadLimit]]] = None,
+        tools: Optional[Mapping[str, Union[int, BulkheadLimit]]] = None,
+    ) -> None:
+        """
+        Args:
+            providers: limit per executor key (an int is max_in_flight, no queue)
+            tools: limit per tool name
+        """
+        self._lock = threading.Lock()
+        self._compartments: Dict[tuple, _Compartment] = {}
+        for scope, limits in ((PROVIDER, providers), (TOOL, tools)):
+            for key, limit in (limits or {}).items():
+                if isinstance(limit, int):
+                    limit = BulkheadLimit(max_in_flight=limit)
+                self._compartments[(scope, key)] = _Compartment(limit)
+
+    # -------------------------------------------------
+    # Slots
+    # -------------------------------------------------
+
+    @contextmanager
+    def slot(self, scope: str, key: str) -> Iterator[None]:
+        """Hold a slot of (scope, key) for the block; raises OVERLOADED."""
+        compartment = self._compartments.get((scope, key))
+        if compartment is None:
+            yield
+            return
+
+        self._acquire(compartment, scope, key)
+        try:
+            yield
+        finally:
+            self._release(compartment)
+
+    @asynccontextmanager
+    async def aslot(self, scope: str, key: str) -> AsyncIterator[None]:
+        """Awaitable variant of slot()."""
+        compartment = self._compartments.get((scope, key))
+        if compartment is None:
+            yield
+            return
+
+        await self._aacquire(compartment, scope, key)
+        try:
+            yield
+        finally:
+            self._release(compartment)
+
+    def run(self, scope: str, key: str, fn: Callable[[], T]) -> T:
+        with self.slot(scope, key):
+            return fn()
+
+    async def arun(self, scope: str, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        async with self.aslot(scope, key):
+            return await factory()
+
+    async def to_thread(self, scope: str, key: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on the compartment's own thread pool (the
+        loop's default pool for keys without a limit).
+        """
+        compartment = self._compartments.get((scope, key))
+        if compartment is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        if compartment.pool is None:
+            with self._lock:
+                if compartment.pool is None:
+                    compartment.pool = ThreadPoolExecutor(
+                        max_workers=compartment.limit.max_in_flight,
+                        thread_name_prefix=f"mcp-{scope}-{key}",
+                    )
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(compartment.pool, call)
+
+    # -------------------------------------------------
+    # Acquire / release
+    # -------------------------------------------------
+
+    def _try_enter(self, compartment: _Compartment, scope: str, key: str, waiter: Optional[_Waiter]) -> bool:
+        # caller holds the lock; True if a slot was taken right away
+        if compartment.in_flight < compartment.limit.max_in_flight and not compartment.waiters:
+            compartment.in_flight += 1
+            compartment.admitted += 1
+            compartment.peak = max(compartment.peak, compartment.in_flight)
+            return True
+
+        if waiter is None or len(compartment.waiters) >= compartment.limit.max_queue:
+            compartment.rejected += 1
+            raise self._overloaded(compartment, scope, key, "is full")
+
+        compartment.waiters.append(waiter)
+        compartment.queued += 1
+        return False
+
+    def _acquire(self, compartment: _Compartment, scope: str, key: str) -> None:
+        waiter = _Waiter() if compartment.limit.max_queue else None
+        with self._lock:
+            if self._try_enter(compartment, scope, key, waiter):
+                return
+
+        waiter._event.wait(deadline.bound(compartment.limit.max_wait))
+        self._settle(compartment, scope, key, waiter)
+
+    async def _aacquire(self, compartment: _Compartment, scope: str, key: str) -> None:
+        waiter = _Waiter(asyncio.get_running_loop()) if compartment.limit.max_queue else None
+        with self._lock:
+            if self._try_enter(compartment, scope, key, waiter):
+                return
+
+        try:
+            await asyncio.wait_for(waiter._future, deadline.bound(compartment.limit.max_wait))
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self._release_locked(compartment)
+                else:
+                    compartment.waiters.remove(waiter)
+            raise
+        self._settle(compartment, scope, key, waiter)
+
+    def _settle(self, compartment: _Compartment, scope: str, key: str, waiter: _Waiter) -> None:
+        # after a wait: keep a handed-over slot, otherwise leave the queue
+        with self._lock:
+            if waiter.granted:
+                compartment.admitted += 1
+                return
+            compartment.waiters.remove(waiter)
+            compartment.rejected += 1
+        raise self._overloaded(compartment, scope, key, "queue wait timed out")
+
+    def _release(self, compartment: _Compartment) -> None:
+        with self._lock:
+            self._release_locked(compartment)
+
+    @staticmethod
+    def _release_locked(compartment: _Compartment) -> None:
+        if compartment.waiters:
+            # hand the slot straight to the oldest waiter
+            waiter = compartment.waiters.popleft()
+            waiter.granted = True
+            waiter.wake()
+        else:
+            compartment.in_flight -= 1
+
+    @staticmethod
+    def _overloaded(compartment: _Compartment, scope: str, key: str, reason: str) -> MCPError:
+        return MCPError(
+            code=MCPErrorCode.OVERLOADED,
+            message=f"Concurrency limit for {scope} '{key}' {reason}",
+            details={
+                "scope": scope,
+                "key": key,
+                "max_in_flight": compartment.limit.max_in_flight,
+                "queued": len(compartment.waiters),
+            },
+        )
+
+    # -------------------------------------------------
+    # Stats
+    # -------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        with self._lock:
+            for (scope, key), compartment in self._compartments.items():
+                prefix = f"{scope}_{key}_"
+                stats[prefix + "in_flight"] = compartment.in_flight
+                stats[prefix + "waiting"] = len(compartment.waiters)
+                stats[prefix + "peak"] = compartment.peak
+                stats[prefix + "admitted"] = compartment.admitted
+                stats[prefix + "queued"] = compartment.queued
+                stats[prefix + "rejected"] = compartment.rejected
+        return stats
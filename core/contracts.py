@@ -20,6 +20,14 @@ class Tool(Protocol):
     - have no side effects
     - accept dict input
     - return dict output
+
+    Because of this, results may be memoized by the dispatcher.
+    A tool can opt out by defining `cacheable = False`.
+
+    A tool may declare `input_schema` (see protocol.validator); the
+    dispatcher compiles it once at registration and validates input
+    before execute() is called. execute() should still guard what it
+    relies on cheaply, since it may be called directly.
     """
 
     name: str
@@ -51,6 +59,23 @@ class AIExecutor(Protocol):
         ...
 
 
+@runtime_checkable
+class AsyncAIExecutor(Protocol):
+    """
+    Optional awaitable counterpart of AIExecutor.
+
+    Executors implementing it are awaited directly by
+    Dispatcher.dispatch_async. Related optional methods:
+    - agenerate_audio(prompt, output_file, **kwargs)
+    - atranscribe(file_path, **kwargs)
+    """
+
+    provider: str
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> Any:
+        ...
+
+
 # -------------------------------------------------
 # PROVIDER METADATA CONTRACT
 # -------------------------------------------------
@@ -2,28 +2,127 @@
 
 from __future__ import annotations
 
-from typing import Dict, Optional, Any
+import asyncio
+import contextlib
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Any, NamedTuple, Sequence, Tuple
 
 from protocol.request import MCPRequest
 from protocol.response import MCPResponse
 from protocol.errors import MCPError, MCPErrorCode
 from protocol.schema import MCPSchema
 
+from core.bulkhead import PROVIDER, TOOL, Bulkhead
+from core.cache import ResultCache, make_key
 from core.contracts import Tool, AIExecutor
+from core.metrics import Metrics, RequestLabels
+from core.middleware import Middleware, MiddlewareChain, RequestContext
+from core.ratelimit import RateLimiter
+from core.singleflight import SingleFlight
+from utils import deadline
+
+
+# (sync method, async method) pairs probed on an executor, in order
+_TEXT_IMAGE_METHODS = (("generate", "agenerate"), ("generate_async", "generate_async"))
+_AUDIO_GENERATE_METHODS = (("generate_audio", "agenerate_audio"), ("generate", "agenerate"))
+_AUDIO_TRANSCRIBE_METHODS = (("transcribe", "atranscribe"),)
+_TEXT_STREAM_METHODS = (("stream", "astream"),)
+_AUDIO_STREAM_METHODS = (("stream_audio", "astream_audio"),)
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+_AI_TYPES = frozenset({"text", "image", "audio"})
+# metrics code for requests that never produced a response (cancelled, interrupted)
+_ABORTED_CODE = "ABORTED"
+# admission rejections: the request never reached the upstream
+_REJECTED_CODES = frozenset({MCPErrorCode.RATE_LIMITED, MCPErrorCode.OVERLOADED})
+
+
+class _AICall(NamedTuple):
+    """
+    Resolved AI execution plan, shared by the sync and async paths.
+    """
+
+    provider: str
+    ai_type: str
+    executor: AIExecutor
+    methods: Tuple[Tuple[str, str], ...]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    unsupported: str
+    client: Optional[str] = None
+    deadline: Optional[float] = None
 
 
 class Dispatcher:
     """
     Stateless dispatcher that routes MCPRequest to tools or AI executors.
+
+    An optional ResultCache memoizes tool results. Tools opt out by
+    setting `cacheable = False`. AI executors are never cached here.
+
+    An optional SingleFlight coalesces concurrent identical AI requests
+    into one upstream execution.
+
+    Tool requests are validated by a single-pass validator compiled at
+    registration from the tool's optional `input_schema`.
+
+    Optional Metrics record request counts, latency, in-flight requests
+    and upstream errors. Without it no instrumentation code runs.
+
+    Optional middleware (see core.middleware) wrap every request with
+    before / after / on_error hooks and per-phase timing spans. Without
+    middleware the request path is unchanged.
+
+    An optional RateLimiter admits AI requests per provider and per
+    meta.client_id (see core.ratelimit); rejected requests answer
+    RATE_LIMITED without calling the executor.
+
+    An optional Bulkhead caps in-flight calls per provider and per tool
+    (see core.bulkhead); a full compartment answers OVERLOADED.
+
+    AI requests may carry meta.timeout_ms (relative) or meta.deadline_ms
+    (absolute, Unix epoch milliseconds). The deadline bounds every wait
+    on the way to the upstream (see utils.deadline); when it passes the
+    upstream call is cancelled and the request answers
+    DEADLINE_EXCEEDED.
     """
 
     def __init__(
         self,
         tools: Dict[str, Tool],
-        ai_executors: Optional[Dict[str, AIExecutor]] = None,
+        ai_executors: Optional[Mapping[str, AIExecutor]] = None,
+        batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        cache: Optional[ResultCache] = None,
+        singleflight: Optional[SingleFlight] = None,
+        metrics: Optional[Metrics] = None,
+        middleware: Sequence[Middleware] = (),
+        rate_limiter: Optional[RateLimiter] = None,
+        bulkhead: Optional[Bulkhead] = None,
     ) -> None:
+        if batch_concurrency < 1:
+            raise ValueError("batch_concurrency must be >= 1")
+
         self._tools = tools
+        self._validators = {
+            name: MCPSchema.compile_tool_validator(getattr(tool, "input_schema", None))
+            for name, tool in tools.items()
+            if isinstance(name, str) and name.isidentifier()
+        }
         self._ai_executors = ai_executors or {}
+        self._batch_concurrency = batch_concurrency
+        self._cache = cache
+        self._singleflight = singleflight
+        self._metrics = metrics
+        self._middleware = MiddlewareChain(middleware) if middleware else None
+        self._rate_limiter = rate_limiter
+        self._bulkhead = bulkhead
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        return self._metrics
 
     # -------------------------------------------------
 
@@ -31,55 +130,692 @@ class Dispatcher:
         """
         Route MCPRequest to the appropriate execution path.
         """
+        if self._middleware is None:
+            if self._metrics is None:
+                return self._dispatch(request)
+            return self._metered(request, self._dispatch, request)
+
+        ctx = RequestContext(request)
+        response = self._metered(request, self._dispatch_chained, ctx)
+        self._middleware.complete(ctx)
+        return response
+
+    async def dispatch_async(self, request: MCPRequest) -> MCPResponse:
+        """
+        Awaitable variant of dispatch().
+
+        AI executors are awaited through their async methods
+        (agenerate, agenerate_audio, atranscribe) when available,
+        otherwise their sync methods run in a worker thread so the
+        event loop is never blocked.
+        """
+        if self._middleware is None:
+            if self._metrics is None:
+                return await self._dispatch_async(request)
+            return await self._ametered(request, self._dispatch_async, request)
+
+        ctx = RequestContext(request)
+        response = await self._ametered(request, self._dispatch_chained_async, ctx)
+        self._middleware.complete(ctx)
+        return response
+
+    def dispatch_payload(self, payload: Dict[str, Any], render: Optional[Callable[[MCPResponse], Any]] = None) -> Any:
+        """
+        Parse a raw request dict, dispatch it and serialize the response.
+
+        Returns render(response) when `render` is given (e.g. encode it
+        for the wire), else response.to_dict(); either way middleware
+        spans also cover parsing and serialization. Parse errors are
+        raised as by MCPRequest.from_dict().
+        """
+        render = render or MCPResponse.to_dict
+        if self._middleware is None:
+            return render(self.dispatch(MCPRequest.from_dict(payload)))
+
+        ctx = RequestContext()
+        with ctx.span("parse"):
+            ctx.request = MCPRequest.from_dict(payload)
+
+        response = self._metered(ctx.request, self._dispatch_chained, ctx)
+
+        with ctx.span("serialize"):
+            result = render(response)
+
+        self._middleware.complete(ctx)
+        return result
+
+    async def dispatch_payload_async(
+        self,
+        payload: Dict[str, Any],
+        render: Optional[Callable[[MCPResponse], Any]] = None,
+    ) -> Any:
+        """
+        Awaitable variant of dispatch_payload().
+        """
+        render = render or MCPResponse.to_dict
+        if self._middleware is None:
+            return render(await self.dispatch_async(MCPRequest.from_dict(payload)))
+
+        ctx = RequestContext()
+        with ctx.span("parse"):
+            ctx.request = MCPRequest.from_dict(payload)
+
+        response = await self._ametered(ctx.request, self._dispatch_chained_async, ctx)
+
+        with ctx.span("serialize"):
+            result = render(response)
+
+        self._middleware.complete(ctx)
+        return result
+
+    def _metered(self, request: MCPRequest, run: Callable[[Any], MCPResponse], arg: Any) -> MCPResponse:
+        if self._metrics is None:
+            return run(arg)
+
+        token = self._metrics.begin(self._metric_labels(request))
+        code = _ABORTED_CODE
+        try:
+            response = run(arg)
+            code = self._error_code(response)
+            return response
+        finally:
+            self._metrics.end(token, code)
+
+    async def _ametered(
+        self,
+        request: MCPRequest,
+        run: Callable[[Any], Awaitable[MCPResponse]],
+        arg: Any,
+    ) -> MCPResponse:
+        if self._metrics is None:
+            return await run(arg)
+
+        token = self._metrics.begin(self._metric_labels(request))
+        code = _ABORTED_CODE
+        try:
+            response = await run(arg)
+            code = self._error_code(response)
+            return response
+        finally:
+            self._metrics.end(token, code)
+
+    def _dispatch(self, request: MCPRequest) -> MCPResponse:
         try:
-            MCPSchema.validate_request(request)
+            self._validate(request)
 
             if getattr(request, "ai", None) is not None:
-                result = self._dispatch_ai(request)
-
-                ai_type = request.ai.get("type")
-                if ai_type == "text":
-                    payload = {"text": result}
-                elif ai_type == "image":
-                    payload = {"image": result}
-                elif ai_type == "audio":
-                    # audio executors may return path or text depending on impl
-                    payload = {"audio": result}
-                else:
-                    raise MCPError(
-                        code=MCPErrorCode.SCHEMA_VIOLATION,
-                        message="Invalid AI task type",
-                    )
+                payload = self._wrap_ai_result(request, self._dispatch_ai(request))
             else:
                 payload = self._dispatch_tool(request)
 
             return MCPResponse.success_response(data=payload)
 
-        except MCPError as err:
-            return MCPResponse.error_response(error=err.to_dict())
+        except Exception as exc:
+            return self._error_response(exc)
+
+    async def _dispatch_async(self, request: MCPRequest) -> MCPResponse:
+        try:
+            self._validate(request)
+
+            if getattr(request, "ai", None) is not None:
+                result = await self._dispatch_ai_async(request)
+                payload = self._wrap_ai_result(request, result)
+            else:
+                payload = await self._arun_tool(self._route_tool(request), request)
+
+            return MCPResponse.success_response(data=payload)
 
         except Exception as exc:
-            internal = MCPError(
-                code=MCPErrorCode.INTERNAL_ERROR,
-                message="Internal error occurred",
-                details={"error": str(exc)},
-            )
-            return MCPResponse.error_response(error=internal.to_dict())
+            return self._error_response(exc)
+
+    # -------------------------------------------------
+    # Middleware path
+    # -------------------------------------------------
+
+    def _dispatch_chained(self, ctx: RequestContext) -> MCPResponse:
+        request = ctx.request
+        try:
+            response = self._middleware.before(ctx)
+            if response is None:
+                with ctx.span("validate"):
+                    self._validate(request)
+
+                if getattr(request, "ai", None) is not None:
+                    with ctx.span("route"):
+                        call = self._plan_ai(request)
+                    with ctx.span("execute"):
+                        payload = self._wrap_ai_result(request, self._run_ai(call))
+                else:
+                    with ctx.span("route"):
+                        tool = self._route_tool(request)
+                    with ctx.span("execute"):
+                        payload = self._run_tool(tool, request)
+
+                response = MCPResponse.success_response(data=payload)
+
+        except Exception as exc:
+            response = self._recover(ctx, exc)
+
+        return self._after(ctx, response)
+
+    async def _dispatch_chained_async(self, ctx: RequestContext) -> MCPResponse:
+        request = ctx.request
+        try:
+            response = self._middleware.before(ctx)
+            if response is None:
+                with ctx.span("validate"):
+                    self._validate(request)
+
+                if getattr(request, "ai", None) is not None:
+                    with ctx.span("route"):
+                        call = self._plan_ai(request)
+                    with ctx.span("execute"):
+                        payload = self._wrap_ai_result(request, await self._arun_ai(call))
+                else:
+                    with ctx.span("route"):
+                        tool = self._route_tool(request)
+                    with ctx.span("execute"):
+                        payload = await self._arun_tool(tool, request)
+
+                response = MCPResponse.success_response(data=payload)
+
+        except Exception as exc:
+            response = self._recover(ctx, exc)
+
+        return self._after(ctx, response)
+
+    def _chained_stream(self, request: MCPRequest) -> Iterator[MCPResponse]:
+        ctx = RequestContext(request)
+        try:
+            try:
+                response = self._middleware.before(ctx)
+                if response is None:
+                    with ctx.span("execute"):
+                        for frame in self._dispatch_stream(request):
+                            if frame.meta.get("partial"):
+                                yield frame
+                            else:
+                                response = frame
+            except Exception as exc:
+                response = self._recover(ctx, exc)
+
+            yield self._after(ctx, response)
+        finally:
+            # also runs when the consumer stops early
+            self._middleware.complete(ctx)
+
+    async def _achained_stream(self, request: MCPRequest) -> AsyncIterator[MCPResponse]:
+        ctx = RequestContext(request)
+        try:
+            try:
+                response = self._middleware.before(ctx)
+                if response is None:
+                    with ctx.span("execute"):
+                        async for frame in self._dispatch_stream_async(request):
+                            if frame.meta.get("partial"):
+                                yield frame
+                            else:
+                                response = frame
+            except Exception as exc:
+                response = self._recover(ctx, exc)
+
+            yield self._after(ctx, response)
+        finally:
+            self._middleware.complete(ctx)
+
+    def _recover(self, ctx: RequestContext, exc: Exception) -> MCPResponse:
+        try:
+            response = self._middleware.on_error(ctx, exc)
+        except Exception as hook_exc:
+            return self._error_response(hook_exc)
+        return response if response is not None else self._error_response(exc)
+
+    def _after(self, ctx: RequestContext, response: MCPResponse) -> MCPResponse:
+        try:
+            response = self._middleware.after(ctx, response)
+        except Exception as exc:
+            response = self._error_response(exc)
+        ctx.response = response
+        return response
+
+    def dispatch_batch(
+        self,
+        requests: Sequence[MCPRequest],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[MCPResponse]:
+        """
+        Dispatch several requests concurrently.
+
+        At most `max_concurrency` requests (default: the dispatcher's
+        batch_concurrency) run at once. Responses are returned in
+        input order; a failing request never affects the others.
+        """
+        limit = min(max_concurrency or self._batch_concurrency, len(requests))
+        if limit <= 1:
+            return [self.dispatch(request) for request in requests]
+
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="mcp-batch") as pool:
+            return list(pool.map(self.dispatch, requests))
+
+    async def dispatch_batch_async(
+        self,
+        requests: Sequence[MCPRequest],
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[MCPResponse]:
+        """
+        Awaitable variant of dispatch_batch().
+        """
+        slots = asyncio.Semaphore(max_concurrency or self._batch_concurrency)
+
+        async def _bounded(request: MCPRequest) -> MCPResponse:
+            async with slots:
+                return await self.dispatch_async(request)
+
+        return list(await asyncio.gather(*(_bounded(request) for request in requests)))
+
+    def dispatch_stream(self, request: MCPRequest) -> Iterator[MCPResponse]:
+        """
+        Dispatch a request, yielding partial frames while it runs.
+
+        For text requests with input.stream = true on an executor that
+        implements stream(), every upstream token is yielded as a
+        partial frame ({"delta": token}, meta.partial = true) as soon as
+        it arrives, followed by one final regular response.
+
+        Audio generation requests stream the same way on executors that
+        implement stream_audio(): each MP3 chunk is a partial frame
+        ({"chunk": bytes}) and chunks are never accumulated.
+
+        Any other request yields its single regular response.
+        """
+        if self._middleware is None:
+            frames = self._dispatch_stream(request)
+        else:
+            frames = self._chained_stream(request)
+
+        if self._metrics is None:
+            return frames
+        return self._metered_stream(request, frames)
+
+    def _metered_stream(self, request: MCPRequest, frames: Iterator[MCPResponse]) -> Iterator[MCPResponse]:
+        token = self._metrics.begin(self._metric_labels(request))
+        code = _ABORTED_CODE
+        try:
+            for response in frames:
+                if not response.meta.get("partial"):
+                    code = self._error_code(response)
+                yield response
+        finally:
+            self._metrics.end(token, code)
+
+    def _dispatch_stream(self, request: MCPRequest) -> Iterator[MCPResponse]:
+        try:
+            self._validate(request)
+            call = self._plan_stream(request)
+        except Exception as exc:
+            yield self._error_response(exc)
+            return
+
+        method = getattr(call.executor, call.methods[0][0], None) if call else None
+        if method is None:
+            yield self._dispatch(request)
+            return
+
+        # the bulkhead slot is held until the last piece arrives
+        slot = contextlib.ExitStack()
+        try:
+            with deadline.scope(call.deadline):
+                if self._rate_limiter is not None:
+                    self._rate_limiter.admit(call.provider, call.client)
+                if self._bulkhead is not None:
+                    try:
+                        slot.enter_context(self._bulkhead.slot(PROVIDER, call.provider))
+                    except MCPError:
+                        self._refund(call)
+                        raise
+        except MCPError as exc:
+            yield self._error_response(self._timed_out(call, exc))
+            return
+
+        parts: List[str] = []
+        try:
+            with slot:
+                pieces = method(*call.args, **call.kwargs)
+                if call.deadline is not None:
+                    pieces = self._bounded_pieces(call, pieces)
+                for piece in pieces:
+                    if call.ai_type == "text":
+                        parts.append(piece)
+                    yield self._partial_response(call.ai_type, piece)
+            final = MCPResponse.success_response(data=self._stream_result(request, call, parts))
+        except Exception as exc:
+            final = self._error_response(self._timed_out(call, exc))
+
+        if self._metrics is not None:
+            self._metrics.record_upstream(call.provider, call.ai_type, failed=not final.success)
+
+        yield final
+
+    @staticmethod
+    def _bounded_pieces(call: _AICall, pieces: Iterator[Any]) -> Iterator[Any]:
+        # the deadline is scoped to each pull so it never leaks into the consumer
+        done = object()
+        try:
+            while True:
+                with deadline.scope(call.deadline):
+                    piece = next(pieces, done)
+                    if deadline.expired():
+                        raise TimeoutError("Stream passed the request deadline")
+                if piece is done:
+                    return
+                yield piece
+        finally:
+            close = getattr(pieces, "close", None)
+            if close is not None:
+                close()
+
+    def dispatch_stream_async(self, request: MCPRequest) -> AsyncIterator[MCPResponse]:
+        """
+        Awaitable variant of dispatch_stream().
+        """
+        if self._middleware is None:
+            frames = self._dispatch_stream_async(request)
+        else:
+            frames = self._achained_stream(request)
+
+        if self._metrics is None:
+            return frames
+        return self._ametered_stream(request, frames)
+
+    async def _ametered_stream(
+        self,
+        request: MCPRequest,
+        frames: AsyncIterator[MCPResponse],
+    ) -> AsyncIterator[MCPResponse]:
+        token = self._metrics.begin(self._metric_labels(request))
+        code = _ABORTED_CODE
+        try:
+            async for response in frames:
+                if not response.meta.get("partial"):
+                    code = self._error_code(response)
+                yield response
+        finally:
+            self._metrics.end(token, code)
+
+    async def _dispatch_stream_async(self, request: MCPRequest) -> AsyncIterator[MCPResponse]:
+        try:
+            self._validate(request)
+            call = self._plan_stream(request)
+        except Exception as exc:
+            yield self._error_response(exc)
+            return
+
+        if call is None:
+            yield await self._dispatch_async(request)
+            return
+
+        slot = contextlib.AsyncExitStack()
+        try:
+            with deadline.scope(call.deadline):
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.aadmit(call.provider, call.client)
+                if self._bulkhead is not None:
+                    try:
+                        await slot.enter_async_context(self._bulkhead.aslot(PROVIDER, call.provider))
+                    except MCPError:
+                        self._refund(call)
+                        raise
+        except MCPError as exc:
+            yield self._error_response(self._timed_out(call, exc))
+            return
+
+        parts: List[str] = []
+        try:
+            async with slot:
+                pieces = self._apieces(call)
+                if call.deadline is not None:
+                    pieces = self._abounded_pieces(call, pieces)
+                async for piece in pieces:
+                    if call.ai_type == "text":
+                        parts.append(piece)
+                    yield self._partial_response(call.ai_type, piece)
+            final = MCPResponse.success_response(data=self._stream_result(request, call, parts))
+        except Exception as exc:
+            final = self._error_response(self._timed_out(call, exc))
+
+        if self._metrics is not None:
+            self._metrics.record_upstream(call.provider, call.ai_type, failed=not final.success)
+
+        yield final
+
+    async def _apieces(self, call: _AICall) -> AsyncIterator[Any]:
+        sync_name, async_name = call.methods[0]
+        method = getattr(call.executor, async_name, None)
+        if method is not None:
+            async for piece in method(*call.args, **call.kwargs):
+                yield piece
+            return
+
+        # sync-only stream: pull each piece in a worker thread
+        pieces = getattr(call.executor, sync_name)(*call.args, **call.kwargs)
+        done = object()
+        while True:
+            piece = await self._to_thread(call.provider, next, pieces, done)
+            if piece is done:
+                return
+            yield piece
+
+    @staticmethod
+    async def _abounded_pieces(call: _AICall, pieces: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        done = object()
+        try:
+            while True:
+                with deadline.scope(call.deadline):
+                    # a timeout cancels the pending pull, closing the upstream stream
+                    piece = await asyncio.wait_for(anext(pieces, done), deadline.remaining())
+                if piece is done:
+                    return
+                yield piece
+        finally:
+            await pieces.aclose()
 
     # -------------------------------------------------
     # Internal routing
     # -------------------------------------------------
 
+    def _validate(self, request: MCPRequest) -> None:
+        if request.ai is None:
+            validator = self._validators.get(request.tool)
+            if validator is not None:
+                errors = validator(request)
+                if errors:
+                    raise MCPError(
+                        code=MCPErrorCode.SCHEMA_VIOLATION,
+                        message=errors[0]["message"],
+                        details={"errors": errors},
+                    )
+                return
+
+        MCPSchema.validate_request(request)
+
     def _dispatch_tool(self, request: MCPRequest) -> Dict[str, Any]:
+        return self._run_tool(self._route_tool(request), request)
+
+    def _route_tool(self, request: MCPRequest) -> Tool:
         if not request.tool:
             raise MCPError(
                 code=MCPErrorCode.INVALID_REQUEST,
                 message="Tool name is required for tool execution",
             )
-        tool = self._get_tool(request.tool)
-        return tool.execute(request.input)
+        return self._get_tool(request.tool)
+
+    def _run_tool(self, tool: Tool, request: MCPRequest) -> Dict[str, Any]:
+        if self._bulkhead is None:
+            return self._call_tool(tool, request)
+        with self._bulkhead.slot(TOOL, tool.name):
+            return self._call_tool(tool, request)
+
+    async def _arun_tool(self, tool: Tool, request: MCPRequest) -> Dict[str, Any]:
+        if self._bulkhead is None:
+            return self._call_tool(tool, request)
+        async with self._bulkhead.aslot(TOOL, tool.name):
+            return self._call_tool(tool, request)
+
+    def _call_tool(self, tool: Tool, request: MCPRequest) -> Dict[str, Any]:
+        if self._cache is None or not getattr(tool, "cacheable", True):
+            return tool.execute(request.input)
+
+        key = make_key("tool", tool.name, request.input)
+        if key is None:
+            return tool.execute(request.input)
+
+        found, cached = self._cache.get(key)
+        if found:
+            return cached
+
+        result = tool.execute(request.input)
+        self._cache.put(key, result)
+        return result
 
     def _dispatch_ai(self, request: MCPRequest) -> Any:
+        return self._run_ai(self._plan_ai(request))
+
+    async def _dispatch_ai_async(self, request: MCPRequest) -> Any:
+        return await self._arun_ai(self._plan_ai(request))
+
+    def _run_ai(self, call: _AICall) -> Any:
+        if call.deadline is None:
+            return self._call_ai(call)
+
+        with deadline.scope(call.deadline):
+            try:
+                result = self._call_ai(call)
+            except Exception as exc:
+                if deadline.expired():
+                    raise self._deadline_exceeded(call.provider) from exc
+                raise
+            if deadline.expired():
+                # nobody is waiting for a late answer any more
+                raise self._deadline_exceeded(call.provider)
+            return result
+
+    async def _arun_ai(self, call: _AICall) -> Any:
+        if call.deadline is None:
+            return await self._acall_ai(call)
+
+        with deadline.scope(call.deadline):
+            try:
+                # cancels the upstream coroutine when the deadline passes
+                return await asyncio.wait_for(self._acall_ai(call), deadline.remaining())
+            except Exception as exc:
+                if deadline.expired():
+                    raise self._deadline_exceeded(call.provider) from exc
+                raise
+
+    def _call_ai(self, call: _AICall) -> Any:
+        execute = functools.partial(self._execute_ai, call)
+        if self._metrics is not None:
+            execute = functools.partial(self._metrics.upstream, call.provider, call.ai_type, execute)
+        if self._bulkhead is not None:
+            execute = functools.partial(self._bulkhead.run, PROVIDER, call.provider, execute)
+        if self._rate_limiter is not None:
+            # client tokens per request; provider tokens only for the call that goes upstream
+            self._rate_limiter.admit_client(call.client)
+            execute = functools.partial(self._rate_limiter.run, call.provider, execute)
+
+        key = self._coalesce_key(call)
+        try:
+            if key is None:
+                return execute()
+            return self._singleflight.do(key, execute)
+        except MCPError as exc:
+            if exc.code in _REJECTED_CODES:
+                self._refund(call)
+            raise
+
+    async def _acall_ai(self, call: _AICall) -> Any:
+        execute = functools.partial(self._aexecute_ai, call)
+        if self._metrics is not None:
+            execute = functools.partial(self._metrics.aupstream, call.provider, call.ai_type, execute)
+        if self._bulkhead is not None:
+            execute = functools.partial(self._bulkhead.arun, PROVIDER, call.provider, execute)
+        if self._rate_limiter is not None:
+            await self._rate_limiter.aadmit_client(call.client)
+            execute = functools.partial(self._rate_limiter.arun, call.provider, execute)
+
+        key = self._coalesce_key(call)
+        try:
+            if key is None:
+                return await execute()
+            return await self._singleflight.ado(key, execute)
+        except MCPError as exc:
+            if exc.code in _REJECTED_CODES:
+                self._refund(call)
+            raise
+
+    def _refund(self, call: _AICall) -> None:
+        # a request turned away before going upstream keeps its client token
+        if self._rate_limiter is not None:
+            self._rate_limiter.refund_client(call.client)
+
+    @classmethod
+    def _timed_out(cls, call: _AICall, exc: Exception) -> Exception:
+        """
+        DEADLINE_EXCEEDED once the call's deadline has passed (whatever
+        failed first: a wait, the upstream or a timeout), else exc.
+        """
+        if call.deadline is None or time.monotonic() < call.deadline:
+            return exc
+        return cls._deadline_exceeded(call.provider)
+
+    @staticmethod
+    def _deadline_exceeded(provider: Optional[str]) -> MCPError:
+        return MCPError(
+            code=MCPErrorCode.DEADLINE_EXCEEDED,
+            message="Request deadline exceeded",
+            details={"provider": provider},
+        )
+
+    def _coalesce_key(self, call: _AICall) -> Optional[str]:
+        if self._singleflight is None:
+            return None
+        return make_key("ai", call.provider, call.ai_type, call.methods, call.args, call.kwargs)
+
+    @staticmethod
+    def _execute_ai(call: _AICall) -> Any:
+        for sync_name, _ in call.methods:
+            method = getattr(call.executor, sync_name, None)
+            if method is not None:
+                return method(*call.args, **call.kwargs)
+
+        raise MCPError(code=MCPErrorCode.TOOL_ERROR, message=call.unsupported)
+
+    async def _aexecute_ai(self, call: _AICall) -> Any:
+        for sync_name, async_name in call.methods:
+            method = getattr(call.executor, async_name, None)
+            if method is not None:
+                return await method(*call.args, **call.kwargs)
+
+            method = getattr(call.executor, sync_name, None)
+            if method is not None:
+                return await self._to_thread(
+                    call.provider, functools.partial(method, *call.args, **call.kwargs)
+                )
+
+        raise MCPError(code=MCPErrorCode.TOOL_ERROR, message=call.unsupported)
+
+    def _to_thread(self, provider: str, fn: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+        # sync executor calls use the provider's own pool when it has a bulkhead
+        if self._bulkhead is None:
+            return asyncio.to_thread(fn, *args)
+        return self._bulkhead.to_thread(PROVIDER, provider, fn, *args)
+
+    def _plan_ai(self, request: MCPRequest) -> _AICall:
+        """
+        Resolve executor, method candidates and arguments for an AI request.
+        """
         ai_spec = request.ai or {}
         provider_name = ai_spec.get("provider")
 
@@ -90,6 +826,9 @@ class Dispatcher:
             )
 
         executor = self._get_ai_executor(provider_name)
+        client = request.meta.get("client_id")
+        client = client if isinstance(client, str) else None
+        deadline_at = self._request_deadline(request)
 
         ai_type = ai_spec.get("type")
         # extra kwargs from ai spec (provider-level hints)
@@ -106,17 +845,17 @@ class Dispatcher:
                 )
 
             # merge kwargs: input-level take precedence over ai_spec
-            call_kwargs = {**extra_kwargs, **input_kwargs}
-
-            if hasattr(executor, "generate"):
-                return executor.generate(prompt, **call_kwargs)
-            elif hasattr(executor, "generate_async"):
-                return executor.generate_async(prompt, **call_kwargs)
-            else:
-                raise MCPError(
-                    code=MCPErrorCode.TOOL_ERROR,
-                    message=f"AI executor for '{provider_name}' does not support text/image generation",
-                )
+            return _AICall(
+                provider=provider_name,
+                ai_type=ai_type,
+                executor=executor,
+                methods=_TEXT_IMAGE_METHODS,
+                args=(prompt,),
+                kwargs={**extra_kwargs, **input_kwargs},
+                unsupported=f"AI executor for '{provider_name}' does not support text/image generation",
+                client=client,
+                deadline=deadline_at,
+            )
 
         if ai_type == "audio":
             prompt = request.input.get("prompt")
@@ -124,23 +863,34 @@ class Dispatcher:
 
             # Case A: generate audio from prompt -> save to file
             if isinstance(prompt, str) and prompt.strip() and file_path:
-                call_kwargs = {**extra_kwargs, **input_kwargs}
-                if hasattr(executor, "generate_audio"):
-                    return executor.generate_audio(prompt, output_file=file_path, **call_kwargs)
-                if hasattr(executor, "generate"):
-                    return executor.generate(prompt, output_file=file_path, **call_kwargs)
-                raise MCPError(
-                    code=MCPErrorCode.TOOL_ERROR,
-                    message=f"AI executor for '{provider_name}' does not support audio generation to file",
+                generate_kwargs = {**extra_kwargs, **input_kwargs}
+                generate_kwargs.pop("file_path", None)
+                return _AICall(
+                    provider=provider_name,
+                    ai_type=ai_type,
+                    executor=executor,
+                    methods=_AUDIO_GENERATE_METHODS,
+                    args=(prompt,),
+                    kwargs={"output_file": file_path, **generate_kwargs},
+                    unsupported=f"AI executor for '{provider_name}' does not support audio generation to file",
+                    client=client,
+                    deadline=deadline_at,
                 )
 
             # Case B: transcribe existing file -> return text
             if file_path and not prompt:
-                if hasattr(executor, "transcribe"):
-                    return executor.transcribe(file_path, **{**extra_kwargs, **input_kwargs})
-                raise MCPError(
-                    code=MCPErrorCode.TOOL_ERROR,
-                    message=f"AI executor for '{provider_name}' does not support audio transcription",
+                transcribe_kwargs = {**extra_kwargs, **input_kwargs}
+                transcribe_kwargs.pop("file_path", None)
+                return _AICall(
+                    provider=provider_name,
+                    ai_type=ai_type,
+                    executor=executor,
+                    methods=_AUDIO_TRANSCRIBE_METHODS,
+                    args=(file_path,),
+                    kwargs=transcribe_kwargs,
+                    unsupported=f"AI executor for '{provider_name}' does not support audio transcription",
+                    client=client,
+                    deadline=deadline_at,
                 )
 
             raise MCPError(
@@ -153,6 +903,116 @@ class Dispatcher:
             message="Invalid AI task type",
         )
 
+    @classmethod
+    def _request_deadline(cls, request: MCPRequest) -> Optional[float]:
+        """
+        time.monotonic() deadline from meta.timeout_ms / meta.deadline_ms
+        (the earlier one wins), or None.
+        """
+        meta = request.meta
+        timeout_ms = meta.get("timeout_ms")
+        deadline_ms = meta.get("deadline_ms")
+        if timeout_ms is None and deadline_ms is None:
+            return None
+
+        budgets = []
+        for name, value in (("timeout_ms", timeout_ms), ("deadline_ms", deadline_ms)):
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise MCPError(
+                    code=MCPErrorCode.SCHEMA_VIOLATION,
+                    message=f"meta.{name} must be a non-negative number of milliseconds",
+                )
+            budgets.append(value / 1000 if name == "timeout_ms" else value / 1000 - time.time())
+
+        budget = min(budgets)
+        if budget <= 0:
+            raise cls._deadline_exceeded(request.ai.get("provider"))
+        return time.monotonic() + budget
+
+    def _plan_stream(self, request: MCPRequest) -> Optional[_AICall]:
+        """
+        Resolve a streaming plan, or None if the request is not streamable.
+        """
+        if getattr(request, "ai", None) is None or request.input.get("stream") is not True:
+            return None
+
+        call = self._plan_ai(request)
+        if call.ai_type == "text":
+            methods = _TEXT_STREAM_METHODS
+        elif call.methods is _AUDIO_GENERATE_METHODS:
+            methods = _AUDIO_STREAM_METHODS
+        else:
+            return None
+
+        sync_name, async_name = methods[0]
+        if not (hasattr(call.executor, sync_name) or hasattr(call.executor, async_name)):
+            return None
+
+        kwargs = dict(call.kwargs)
+        kwargs.pop("stream", None)
+        return call._replace(methods=methods, kwargs=kwargs)
+
+    @staticmethod
+    def _partial_response(ai_type: str, piece: Any) -> MCPResponse:
+        data = {"chunk": piece} if ai_type == "audio" else {"delta": piece}
+        return MCPResponse.success_response(data=data, meta={"partial": True})
+
+    @classmethod
+    def _stream_result(cls, request: MCPRequest, call: _AICall, parts: List[str]) -> Dict[str, Any]:
+        if call.ai_type == "audio":
+            # audio chunks went to the client and the output file only
+            return cls._wrap_ai_result(request, call.kwargs.get("output_file"))
+        return cls._wrap_ai_result(request, "".join(parts))
+
+    @staticmethod
+    def _wrap_ai_result(request: MCPRequest, result: Any) -> Dict[str, Any]:
+        ai_type = request.ai.get("type")
+        if ai_type == "text":
+            return {"text": result}
+        if ai_type == "image":
+            return {"image": result}
+        if ai_type == "audio":
+            # audio executors may return path or text depending on impl
+            return {"audio": result}
+        raise MCPError(
+            code=MCPErrorCode.SCHEMA_VIOLATION,
+            message="Invalid AI task type",
+        )
+
+    def _metric_labels(self, request: MCPRequest) -> RequestLabels:
+        # unknown names collapse to one label value to bound cardinality
+        ai = getattr(request, "ai", None)
+        if ai is not None:
+            provider = ai.get("provider")
+            ai_type = ai.get("type")
+            return (
+                "ai",
+                provider if isinstance(provider, str) and provider in self._ai_executors else "_unknown",
+                ai_type if isinstance(ai_type, str) and ai_type in _AI_TYPES else "_unknown",
+            )
+        tool = request.tool
+        return ("tool", tool if isinstance(tool, str) and tool in self._tools else "_unknown", "")
+
+    @staticmethod
+    def _error_code(response: MCPResponse) -> str:
+        if response.success:
+            return ""
+        return str((response.error or {}).get("code", "UNKNOWN"))
+
+    @staticmethod
+    def _error_response(exc: Exception) -> MCPResponse:
+        if isinstance(exc, MCPError):
+            return MCPResponse.error_response(error=exc.to_dict())
+
+        internal = MCPError(
+            code=MCPErrorCode.INTERNAL_ERROR,
+            message="Internal error occurred",
+            details={"error": str(exc)},
+        )
+        return MCPResponse.error_response(error=internal.to_dict())
+
     # -------------------------------------------------
     # Registry helpers
     # -------------------------------------------------
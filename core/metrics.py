@@ -0,0 +1,333 @@
+# mcp_sdk/core/metrics.py
+
+"""
+In-process request metrics.
+
+- request counters by kind (tool / ai), name (tool or provider),
+  AI type and error code
+- latency histograms (seconds, cumulative buckets)
+- in-flight gauges
+- upstream call / error counters per provider, counted around the real
+  executor call (coalesced requests do not count twice)
+- collectors: named callables returning flat numeric stats
+  (cache, singleflight, connection pool, ...) read at snapshot time
+
+Recording a request takes no lock (series are sharded per thread) and
+a few dict updates: about 1 us per request on CPython 3.11
+(benchmarks/metrics.py), i.e. roughly a third of a validate_input
+dispatch but nothing next to an upstream AI call.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (kind, name, ai_type)
+RequestLabels = Tuple[str, str, str]
+
+_REQUEST_LABELS = ("kind", "name", "ai_type")
+_UPSTREAM_LABELS = ("provider", "ai_type")
+
+
+class _Series:
+    """Everything one thread recorded for one (kind, name, ai_type)."""
+
+    __slots__ = ("started", "codes", "buckets", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.started = 0
+        # error code -> count; "" means success
+        self.codes: Dict[str, int] = {}
+        # one slot per bucket plus +Inf
+        self.buckets = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def merge(self, other: _Series) -> None:
+        # `other` may be a live shard its thread keeps writing: copy first
+        self.started += other.started
+        for code, value in list(other.codes.items()):
+            self.codes[code] = self.codes.get(code, 0) + value
+        self.buckets = [a + b for a, b in zip(self.buckets, list(other.buckets))]
+        self.sum += other.sum
+        self.count += other.count
+
+
+_Shard = Dict[RequestLabels, _Series]
+
+# returned by begin(), passed back to end(): labels, start time,
+# and the series and thread begin() recorded on
+Token = Tuple[RequestLabels, float, _Series, int]
+
+
+class Metrics:
+    """
+    Thread-safe metrics registry for one Dispatcher (or several).
+
+    Request series are sharded per thread: each thread only writes its
+    own shard, so recording takes no lock. snapshot() sums the shards
+    and folds in those of finished threads.
+    """
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._buckets = tuple(sorted(buckets))
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        # series of threads that have exited
+        self._retired: _Shard = {}
+        # (provider, ai_type) -> [calls, errors]
+        self._upstream: Dict[Tuple[str, str], List[int]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    # -------------------------------------------------
+    # Recording
+    # -------------------------------------------------
+
+    def begin(self, labels: RequestLabels) -> Token:
+        """Mark a request as in flight; pass the token to end()."""
+        series = self._series(labels)
+        series.started += 1
+        return labels, self._clock(), series, threading.get_ident()
+
+    def end(self, token: Token, code: str = "") -> None:
+        """Record a finished request (code "" on success)."""
+        labels, started, series, ident = token
+        elapsed = self._clock() - started
+
+        # may run on another thread than begin(); that thread records
+        # into its own shard (in-flight is the difference of the sums,
+        # so per-thread counts still add up)
+        if threading.get_ident() != ident:
+            series = self._series(labels)
+        series.codes[code] = series.codes.get(code, 0) + 1
+        series.buckets[bisect.bisect_left(self._buckets, elapsed)] += 1
+        series.sum += elapsed
+        series.count += 1
+
+    def _series(self, labels: RequestLabels) -> _Series:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = self._new_shard()
+
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = _Series(len(self._buckets))
+        return series
+
+    def _new_shard(self) -> _Shard:
+        shard: _Shard = {}
+        with self._lock:
+            self._retire_dead_shards()
+            self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        # caller holds the lock; short-lived threads (e.g. batch pools)
+        # must not grow the shard list without bound
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+                continue
+            for labels, series in shard.items():
+                retired = self._retired.get(labels)
+                if retired is None:
+                    retired = self._retired[labels] = _Series(len(self._buckets))
+                retired.merge(series)
+        self._shards = live
+
+    def upstream(self, provider: str, ai_type: str, fn: Callable[[], T]) -> T:
+        """Run one upstream executor call, counting calls and errors."""
+        try:
+            result = fn()
+        except BaseException:
+            self.record_upstream(provider, ai_type, failed=True)
+            raise
+        self.record_upstream(provider, ai_type, failed=False)
+        return result
+
+    async def aupstream(self, provider: str, ai_type: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Awaitable variant of upstream()."""
+        try:
+            result = await factory()
+        except BaseException:
+            self.record_upstream(provider, ai_type, failed=True)
+            raise
+        self.record_upstream(provider, ai_type, failed=False)
+        return result
+
+    def record_upstream(self, provider: str, ai_type: str, failed: bool) -> None:
+        """Count one upstream call made outside upstream() (e.g. a stream)."""
+        with self._lock:
+            counts = self._upstream.setdefault((provider, ai_type), [0, 0])
+            counts[0] += 1
+            if failed:
+                counts[1] += 1
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Register a stats source read at snapshot time.
+
+        Numeric values are exported as gauges `mcp_<name>_<key>`.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    # -------------------------------------------------
+    # Export
+    # -------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Point-in-time copy of every metric as plain JSON-able data.
+        """
+        with self._lock:
+            self._retire_dead_shards()
+            totals: _Shard = {}
+            for shard in [self._retired] + [shard for _, shard in self._shards]:
+                # list() copies atomically while the owner keeps writing
+                for labels, entry in list(shard.items()):
+                    total = totals.get(labels)
+                    if total is None:
+                        total = totals[labels] = _Series(len(self._buckets))
+                    total.merge(entry)
+            series = list(totals.items())
+            requests = [
+                {"labels": {**dict(zip(_REQUEST_LABELS, labels)), "code": code}, "value": value}
+                for labels, entry in series
+                for code, value in entry.codes.items()
+            ]
+            latency = [
+                {
+                    "labels": dict(zip(_REQUEST_LABELS, labels)),
+                    "count": entry.count,
+                    "sum": entry.sum,
+                    "buckets": self._cumulative(entry),
+                }
+                for labels, entry in series
+            ]
+            in_flight = [
+                {"labels": dict(zip(_REQUEST_LABELS, labels)), "value": entry.started - entry.count}
+                for labels, entry in series
+            ]
+            upstream = [
+                {
+                    "labels": dict(zip(_UPSTREAM_LABELS, labels)),
+                    "calls": calls,
+                    "errors": errors,
+                    "error_rate": errors / calls if calls else 0.0,
+                }
+                for labels, (calls, errors) in self._upstream.items()
+            ]
+            collectors = dict(self._collectors)
+
+        return {
+            "requests": requests,
+            "latency": latency,
+            "in_flight": in_flight,
+            "upstream": upstream,
+            "collectors": {name: _collect(collect) for name, collect in collectors.items()},
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Snapshot in Prometheus text exposition format (version 0.0.4).
+        """
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        lines += _family("mcp_requests_total", "counter", "MCP requests by outcome (code is empty on success).")
+        for sample in snap["requests"]:
+            lines.append(_sample("mcp_requests_total", sample["labels"], sample["value"]))
+
+        lines += _family("mcp_request_duration_seconds", "histogram", "MCP request latency in seconds.")
+        for sample in snap["latency"]:
+            for le, count in sample["buckets"].items():
+                lines.append(_sample("mcp_request_duration_seconds_bucket", {**sample["labels"], "le": le}, count))
+            lines.append(_sample("mcp_request_duration_seconds_sum", sample["labels"], sample["sum"]))
+            lines.append(_sample("mcp_request_duration_seconds_count", sample["labels"], sample["count"]))
+
+        lines += _family("mcp_requests_in_flight", "gauge", "MCP requests currently executing.")
+        for sample in snap["in_flight"]:
+            lines.append(_sample("mcp_requests_in_flight", sample["labels"], sample["value"]))
+
+        lines += _family("mcp_upstream_calls_total", "counter", "Executor calls made to AI providers.")
+        for sample in snap["upstream"]:
+            lines.append(_sample("mcp_upstream_calls_total", sample["labels"], sample["calls"]))
+        lines += _family("mcp_upstream_errors_total", "counter", "Executor calls to AI providers that failed.")
+        for sample in snap["upstream"]:
+            lines.append(_sample("mcp_upstream_errors_total", sample["labels"], sample["errors"]))
+
+        for name, stats in snap["collectors"].items():
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"mcp_{_sanitize(name)}_{_sanitize(key)}"
+                lines += _family(metric, "gauge", f"{name} {key}.")
+                lines.append(_sample(metric, {}, value))
+
+        return "\n".join(lines) + "\n"
+
+    def _cumulative(self, series: _Series) -> Dict[str, int]:
+        buckets: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self._buckets, series.buckets):
+            running += count
+            buckets[_format_value(bound)] = running
+        buckets["+Inf"] = series.count
+        return buckets
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+
+def _collect(collect: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        return dict(collect())
+    except Exception as exc:
+        # a broken collector must not break the scrape
+        return {"error": str(exc)}
+
+
+def _family(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _sample(name: str, labels: Dict[str, Any], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sanitize(name: str) -> str:
+    return "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in name)
@@ -0,0 +1,135 @@
+# mcp_sdk/core/middleware.py
+
+"""
+Dispatcher middleware.
+
+A Middleware wraps every request a Dispatcher handles:
+- before(ctx): runs in registration order; returning a response
+  short-circuits the request (later middleware and execution are skipped)
+- after(ctx, response): runs in reverse order and may replace the response
+- on_error(ctx, exc): runs in reverse order when a hook, validation,
+  routing or execution raised; the first response returned is used
+  instead of the default error response
+- on_complete(ctx): runs last, once ctx.response and every span are set
+
+Only middleware whose before() ran see the other hooks, so a short
+circuit unwinds like a call stack.
+
+ctx.spans holds phase timings in seconds: "validate", "route",
+"execute", plus "parse" and "serialize" for Dispatcher.dispatch_payload()
+(which the CLI, HTTP and STDIO shells all use). A streamed request
+records "execute" only, from its first to its last frame.
+
+A Dispatcher without middleware runs none of this.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from protocol.request import MCPRequest
+from protocol.response import MCPResponse
+
+
+class RequestContext:
+    """
+    Per-request state shared by the middleware of one dispatch.
+    """
+
+    __slots__ = ("request", "response", "spans", "state", "_entered")
+
+    def __init__(self, request: Optional[MCPRequest] = None) -> None:
+        self.request = request
+        # final response, set before on_complete()
+        self.response: Optional[MCPResponse] = None
+        # phase name -> seconds
+        self.spans: Dict[str, float] = {}
+        # free-form scratch space for middleware (e.g. a trace id)
+        self.state: Dict[str, Any] = {}
+        # number of middleware whose before() ran
+        self._entered = 0
+
+    def span(self, name: str) -> _Span:
+        """Context manager timing one phase into spans[name]."""
+        return _Span(self.spans, name)
+
+
+class _Span:
+    __slots__ = ("_spans", "_name", "_start")
+
+    def __init__(self, spans: Dict[str, float], name: str) -> None:
+        self._spans = spans
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._spans[self._name] = time.perf_counter() - self._start
+
+
+class Middleware:
+    """
+    Base class with no-op hooks; override the ones you need.
+
+    Hooks run on the dispatching thread (or event loop) and should be
+    quick: they add to the latency of every request.
+    """
+
+    def before(self, ctx: RequestContext) -> Optional[MCPResponse]:
+        return None
+
+    def after(self, ctx: RequestContext, response: MCPResponse) -> MCPResponse:
+        return response
+
+    def on_error(self, ctx: RequestContext, exc: Exception) -> Optional[MCPResponse]:
+        return None
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        return None
+
+
+class MiddlewareChain:
+    """
+    Ordered middleware, run with onion semantics.
+    """
+
+    def __init__(self, middleware: Sequence[Middleware]) -> None:
+        self._middleware: Tuple[Middleware, ...] = tuple(middleware)
+
+    def __len__(self) -> int:
+        return len(self._middleware)
+
+    def before(self, ctx: RequestContext) -> Optional[MCPResponse]:
+        for index, middleware in enumerate(self._middleware):
+            ctx._entered = index + 1
+            response = middleware.before(ctx)
+            if response is not None:
+                return response
+        return None
+
+    def after(self, ctx: RequestContext, response: MCPResponse) -> MCPResponse:
+        for middleware in self._entered(ctx):
+            response = middleware.after(ctx, response)
+        return response
+
+    def on_error(self, ctx: RequestContext, exc: Exception) -> Optional[MCPResponse]:
+        for middleware in self._entered(ctx):
+            response = middleware.on_error(ctx, exc)
+            if response is not None:
+                return response
+        return None
+
+    def complete(self, ctx: RequestContext) -> None:
+        for middleware in self._entered(ctx):
+            try:
+                middleware.on_complete(ctx)
+            except Exception:
+                # the response is final by now; a failing observer
+                # (log, audit) must not lose it or skip the others
+                pass
+
+    def _entered(self, ctx: RequestContext) -> Tuple[Middleware, ...]:
+        return self._middleware[ctx._entered - 1::-1] if ctx._entered else ()
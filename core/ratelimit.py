@@ -0,0 +1,277 @@
+# mcp_sdk/core/ratelimit.py
+
+"""
+Token-bucket admission control for AI requests.
+
+Two kinds of bucket:
+- per provider (executor key): protects the upstream, taken only by
+  calls that really go upstream (coalesced requests share one)
+- per client (`meta.client_id`): keeps one client from using a
+  provider's whole budget; requests without a client_id skip it
+
+When a bucket is empty a caller may wait for its token, in arrival
+order, if fewer than `max_queue` callers are already waiting and the
+wait is at most `max_wait` seconds (and ends before the request
+deadline, see utils.deadline). Otherwise it is rejected at once with
+MCPErrorCode.RATE_LIMITED, so a throttled provider never piles up
+blocked workers.
+
+A request turned away after it took its client token (by the provider
+bucket or the bulkhead) gets that token back: only requests that go
+upstream count against a client's budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from protocol.errors import MCPError, MCPErrorCode
+from utils import deadline
+
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CLIENTS = 10000
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Attributes:
+        rate: sustained requests per second
+        burst: requests allowed back to back (bucket size)
+        max_queue: callers allowed to wait for a token (0: never wait)
+        max_wait: longest wait accepted, in seconds
+    """
+
+    rate: float
+    burst: int = 1
+    max_queue: int = 0
+    max_wait: float = 1.0
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        if self.max_queue < 0 or self.max_wait < 0:
+            raise ValueError("max_queue and max_wait must be >= 0")
+
+
+class _Bucket:
+    """
+    Token bucket whose balance goes negative by one per waiting caller
+    (each waiter holds a reservation on a future token).
+    """
+
+    __slots__ = ("limit", "tokens", "stamp")
+
+    def __init__(self, limit: RateLimit, now: float) -> None:
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.stamp = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(float(self.limit.burst), self.tokens + (now - self.stamp) * self.limit.rate)
+        self.stamp = now
+
+    def reserve(self, now: float, max_wait: float) -> Optional[float]:
+        """Seconds to wait for a token, or None if the caller is rejected."""
+        self.refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+
+        waiting = max(0, math.ceil(-self.tokens))
+        wait = (1.0 - self.tokens) / self.limit.rate
+        if waiting >= self.limit.max_queue or wait > max_wait:
+            return None
+        self.tokens -= 1.0
+        return wait
+
+    def refund(self) -> None:
+        self.tokens = min(float(self.limit.burst), self.tokens + 1.0)
+
+    def idle(self, now: float) -> bool:
+        self.refill(now)
+        return self.tokens >= self.limit.burst
+
+
+class RateLimiter:
+    """
+    Per-provider and per-client token buckets. Thread-safe; waits
+    block the calling thread (sync) or sleep on the caller's loop
+    (async).
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Mapping[str, RateLimit]] = None,
+        per_client: Optional[RateLimit] = None,
+        clients: Optional[Mapping[str, RateLimit]] = None,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            providers: limit per executor key; unlisted providers are unlimited
+            per_client: default limit for every meta.client_id
+            clients: limits for specific client ids (override per_client)
+            max_clients: client buckets kept before idle ones are dropped
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        now = clock()
+        self._providers: Dict[str, _Bucket] = {
+            name: _Bucket(limit, now) for name, limit in (providers or {}).items()
+        }
+        self._per_client = per_client
+        self._client_limits = dict(clients or {})
+        self._clients: Dict[str, _Bucket] = {}
+        self._max_clients = max_clients
+
+        self.admitted = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+
+    # -------------------------------------------------
+    # Admission
+    # -------------------------------------------------
+
+    def admit(self, provider: str, client_id: Optional[str]) -> None:
+        """Take a client token, then a provider token; raises RATE_LIMITED."""
+        self.admit_client(client_id)
+        try:
+            wait, bucket = self._reserve("provider", provider)
+            self._wait(wait, bucket)
+        except BaseException:
+            self.refund_client(client_id)
+            raise
+
+    async def aadmit(self, provider: str, client_id: Optional[str]) -> None:
+        await self.aadmit_client(client_id)
+        try:
+            wait, bucket = self._reserve("provider", provider)
+            await self._await(wait, bucket)
+        except BaseException:
+            self.refund_client(client_id)
+            raise
+
+    def admit_client(self, client_id: Optional[str]) -> None:
+        """Take a client token, waiting if allowed; raises RATE_LIMITED."""
+        wait, bucket = self._reserve("client", client_id)
+        self._wait(wait, bucket)
+
+    async def aadmit_client(self, client_id: Optional[str]) -> None:
+        wait, bucket = self._reserve("client", client_id)
+        await self._await(wait, bucket)
+
+    def run(self, provider: str, fn: Callable[[], T]) -> T:
+        """Take a provider token, then call fn()."""
+        wait, bucket = self._reserve("provider", provider)
+        self._wait(wait, bucket)
+        return fn()
+
+    async def arun(self, provider: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Awaitable variant of run()."""
+        wait, bucket = self._reserve("provider", provider)
+        await self._await(wait, bucket)
+        return await factory()
+
+    def refund_client(self, client_id: Optional[str]) -> None:
+        """Give back the client token of a request rejected before going upstream."""
+        if client_id is None:
+            return
+        with self._lock:
+            bucket = self._clients.get(client_id)
+            if bucket is not None:
+                bucket.refund()
+
+    def _reserve(self, scope: str, key: Optional[str]) -> Tuple[float, Optional[_Bucket]]:
+        if key is None:
+            return 0.0, None
+
+        with self._lock:
+            bucket = self._bucket(scope, key)
+            if bucket is None:
+                return 0.0, None
+
+            wait = bucket.reserve(self._clock(), deadline.bound(bucket.limit.max_wait))
+            if wait is None:
+                self.rejected += 1
+                retry_after = (1.0 - bucket.tokens) / bucket.limit.rate
+            else:
+                self.admitted += 1
+                if wait > 0:
+                    self.delayed += 1
+                    self.wait_time_total += wait
+                return wait, bucket
+
+        raise MCPError(
+            code=MCPErrorCode.RATE_LIMITED,
+            message=f"Rate limit exceeded for {scope} '{key}'",
+            details={"scope": scope, "key": key, "retry_after_s": round(retry_after, 3)},
+        )
+
+    def _bucket(self, scope: str, key: str) -> Optional[_Bucket]:
+        # caller holds the lock
+        if scope == "provider":
+            return self._providers.get(key)
+
+        bucket = self._clients.get(key)
+        if bucket is None:
+            limit = self._client_limits.get(key, self._per_client)
+            if limit is None:
+                return None
+            if len(self._clients) >= self._max_clients:
+                self._drop_idle_clients()
+            bucket = self._clients[key] = _Bucket(limit, self._clock())
+        return bucket
+
+    def _drop_idle_clients(self) -> None:
+        # a full bucket is the same as a new one, so forgetting it is free
+        now = self._clock()
+        for key in [key for key, bucket in self._clients.items() if bucket.idle(now)]:
+            del self._clients[key]
+
+    def _wait(self, wait: float, bucket: Optional[_Bucket]) -> None:
+        if wait <= 0:
+            return
+        try:
+            time.sleep(wait)
+        except BaseException:
+            self._refund(bucket)
+            raise
+
+    async def _await(self, wait: float, bucket: Optional[_Bucket]) -> None:
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except BaseException:
+            # a cancelled waiter gives its reserved token back
+            self._refund(bucket)
+            raise
+
+    def _refund(self, bucket: Optional[_Bucket]) -> None:
+        if bucket is not None:
+            with self._lock:
+                bucket.refund()
+
+    # -------------------------------------------------
+    # Stats
+    # -------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "delayed": self.delayed,
+                "rejected": self.rejected,
+                "wait_time_total": self.wait_time_total,
+                "clients": len(self._clients),
+            }
@@ -0,0 +1,137 @@
+# mcp_sdk/core/singleflight.py
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils import deadline
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one execution.
+
+    The first caller for a key (the leader) runs the call; callers
+    arriving while it is in flight wait and receive the same result
+    or exception. Nothing is retained once the call completes, so
+    this is not a cache.
+
+    Sync callers (do) and async callers (ado) are coalesced
+    separately; async calls are grouped per event loop.
+
+    Waiting callers give up at their own request deadline
+    (utils.deadline); no caller's deadline ends the shared execution.
+    An async execution runs detached from every deadline and is
+    cancelled once all callers waiting on it have gone. A sync leader
+    runs the call on its own thread, so a sync caller with a deadline
+    executes alone instead of leading a shared call.
+
+    Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[Tuple[int, str], int] = {}
+
+        self.requests = 0
+        self.executions = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                self.executions += 1
+                if deadline.current() is None:
+                    call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.event.wait(deadline.remaining()):
+                raise TimeoutError("Coalesced call did not finish before the request deadline")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        if call is None:
+            # bounded by this caller's deadline, so not shared
+            return fn()
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task_key = (id(asyncio.get_running_loop()), key)
+
+        with self._lock:
+            self.requests += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(self._detached(factory))
+                self._tasks[task_key] = task
+                self.executions += 1
+                task.add_done_callback(lambda _: self._forget(task_key))
+            self._waiters[task_key] = self._waiters.get(task_key, 0) + 1
+
+        # a cancelled waiter must not cancel the shared execution
+        # while others still wait on it
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                last = False
+                if self._tasks.get(task_key) is task:
+                    self._waiters[task_key] -= 1
+                    last = self._waiters[task_key] == 0
+            if last:
+                task.cancel()
+            raise
+
+    @staticmethod
+    async def _detached(factory: Callable[[], Awaitable[Any]]) -> Any:
+        # the task copies the leader's context; drop its deadline
+        with deadline.detached():
+            return await factory()
+
+    def _forget(self, task_key: Tuple[int, str]) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
+            self._waiters.pop(task_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of coalescing counters.
+
+        coalescing_ratio is the share of requests served by another
+        request's execution.
+        """
+        with self._lock:
+            coalesced = self.requests - self.executions
+            return {
+                "requests": self.requests,
+                "executions": self.executions,
+                "coalesced": coalesced,
+                "in_flight": len(self._calls) + len(self._tasks),
+                "coalescing_ratio": coalesced / self.requests if self.requests else 0.0,
+            }
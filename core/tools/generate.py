@@ -16,10 +16,21 @@ class GenerateTextTool:
     - is stateless
     - deterministic
     - performs simple text generation logic
+
+    Input is validated by the dispatcher against `input_schema`;
+    execute() keeps its own checks for direct calls.
     """
 
     name = "ai"
 
+    input_schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {
+            "prompt": {"type": "string", "pattern": r"\S"},
+        },
+        "required": ["prompt"],
+    }
+
     def execute(self, input: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(input, dict):
             raise MCPError(
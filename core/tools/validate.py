@@ -16,10 +16,22 @@ class ValidateInputTool:
     - does NOT block execution
     - does NOT know business rules
     - only reports validation results
+
+    Input is validated by the dispatcher against `input_schema`;
+    execute() keeps its own checks for direct calls.
     """
 
     name = "validate_input"
 
+    input_schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {
+            "fields": {"type": "object"},
+            "required": {"type": "array"},
+        },
+        "required": ["fields"],
+    }
+
     def execute(self, input: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(input, dict):
             raise MCPError(
@@ -10,6 +10,9 @@ class MCPErrorCode(str, Enum):
     TOOL_NOT_FOUND = "TOOL_NOT_FOUND"
     TOOL_ERROR = "TOOL_ERROR"
     INTERNAL_ERROR = "INTERNAL_ERROR"
+    RATE_LIMITED = "RATE_LIMITED"
+    OVERLOADED = "OVERLOADED"
+    DEADLINE_EXCEEDED = "DEADLINE_EXCEEDED"
 
 
 class MCPError(Exception):
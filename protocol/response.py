@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, Optional
 
 
@@ -73,6 +73,14 @@ class MCPResponse:
         if not isinstance(self.meta, dict):
             raise ValueError("Field 'meta' must be a dictionary")
 
+    # ---------- Derivation ----------
+
+    def with_meta(self, **meta: Any) -> "MCPResponse":
+        """
+        Return a copy with extra meta entries merged in.
+        """
+        return replace(self, meta={**self.meta, **meta})
+
     # ---------- Serialization ----------
 
     def to_dict(self) -> Dict[str, Any]:
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Literal
+from typing import Any, Callable, Dict, Optional, Literal
 
 from .request import MCPRequest
 from .errors import MCPError, MCPErrorCode
+from .validator import ValidationErrors, compile_schema
+
+
+MAX_INPUT_FIELDS = 100
 
 
 # ---- AI SCHEMA DEFINITIONS (PROTOCOL-LEVEL) -----------------
@@ -103,6 +107,32 @@ class MCPSchema:
         if getattr(request, "ai", None) is not None:
             AITaskSchema.validate(request.ai)
 
+    @staticmethod
+    def compile_tool_validator(
+        input_schema: Optional[Dict[str, Any]] = None,
+    ) -> Callable[[MCPRequest], ValidationErrors]:
+        """
+        Compile a single-pass validator for requests to one registered tool.
+
+        Covers what validate_request checks for a non-AI request whose
+        tool name is already known to be valid (with the same messages),
+        plus the tool's own declared input schema. Returns structured
+        errors, never raises.
+        """
+        check_input = compile_schema({**(input_schema or {}), "type": "object"})
+
+        def validate(request: MCPRequest) -> ValidationErrors:
+            if request.meta is not None and not isinstance(request.meta, dict):
+                return [{"path": "meta", "message": "Meta must be a dictionary if provided"}]
+            payload = request.input
+            if not isinstance(payload, dict):
+                return [{"path": "", "message": "Input payload must be an object"}]
+            if len(payload) > MAX_INPUT_FIELDS:
+                return [{"path": "", "message": "Input payload too large"}]
+            return check_input(payload)
+
+        return validate
+
     @staticmethod
     def _validate_input_payload(payload: Any) -> None:
         if not isinstance(payload, dict):
@@ -112,9 +142,9 @@ class MCPSchema:
             )
 
         # defensive size guard
-        if len(payload) > 100:
+        if len(payload) > MAX_INPUT_FIELDS:
             raise MCPError(
                 code=MCPErrorCode.SCHEMA_VIOLATION,
                 message="Input payload too large",
-                details={"max_fields": 100},
+                details={"max_fields": MAX_INPUT_FIELDS},
             )
@@ -8,10 +8,22 @@ audio models, APIs). They must remain isolated from core logic.
 
 Currently available providers:
 - pollinations
+
+Vendor subpackages are imported on first attribute access, so importing
+shared helpers (providers.cache, providers.pool, ...) stays cheap.
 """
 
-from . import pollinations
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = [
     "pollinations",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
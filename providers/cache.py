@@ -0,0 +1,393 @@
+# mcp_sdk/providers/cache.py
+
+"""
+Persistent, content-addressed cache for AI generations.
+
+Entries are keyed by a hash of provider, model, task type, prompt and
+normalized params. Text is stored inline in the entry metadata; image
+and audio bytes are stored as separate blob files. The store is
+bounded by total size and evicts least recently used entries.
+
+Only requests that can be treated as deterministic are cached (by
+default: an explicit non-negative integer seed and no streaming).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from providers.wrapper import ExecutorWrapper
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# kwargs that only choose where output goes, not what is generated
+_OUTPUT_KWARGS = frozenset({"file_path", "output_file", "save_to_file"})
+
+# temp output file suffix when the entry does not record one
+_DEFAULT_SUFFIXES = {"image": ".png", "audio": ".mp3"}
+
+
+def _fixed_seed(seed: Any) -> bool:
+    # providers read a missing, negative (e.g. -1) or non-int seed as "random"
+    return isinstance(seed, int) and not isinstance(seed, bool) and seed >= 0
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    kind: str  # "text" | "blob"
+    text: Optional[str] = None
+    blob_path: Optional[Path] = None
+    suffix: str = ""  # file suffix of a stored output file, e.g. ".jpg"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Per-provider caching policy.
+
+    Attributes:
+        enabled: cache this provider at all
+        require_seed: only cache calls with an explicit non-negative int seed
+    """
+
+    enabled: bool = True
+    require_seed: bool = True
+
+
+# -------------------------------------------------
+# Disk store
+# -------------------------------------------------
+
+class DiskCache:
+    """
+    Size-bounded LRU store on the local filesystem.
+
+    Layout:
+        <root>/<key[:2]>/<key>.json   metadata (+ inline text)
+        <root>/<key[:2]>/<key>.bin    blob, if any
+
+    Writes are atomic (temp file + rename). Recency is tracked through
+    file mtimes, so it survives restarts.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (bytes on disk, last use)
+        self._index: Dict[str, Tuple[int, float]] = {}
+        self._total = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._scan()
+
+    # ---------- Public API ----------
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        meta_path = self._meta_path(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        blob_path = self._blob_path(key)
+        if meta.get("kind") == "blob" and not blob_path.exists():
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self._touch(key)
+        with self._lock:
+            self.hits += 1
+
+        if meta.get("kind") == "text":
+            return CacheEntry(kind="text", text=meta.get("text"))
+        return CacheEntry(kind="blob", blob_path=blob_path, suffix=meta.get("suffix", ""))
+
+    def put_text(self, key: str, text: str) -> None:
+        meta = json.dumps({"kind": "text", "text": text}, ensure_ascii=False).encode("utf-8")
+        self._write_atomic(self._meta_path(key), meta)
+        self._account(key)
+
+    def put_bytes(self, key: str, data: bytes | bytearray | memoryview) -> None:
+        self._write_atomic(self._blob_path(key), bytes(data))
+        self._write_atomic(self._meta_path(key), b'{"kind":"blob"}')
+        self._account(key)
+
+    def put_file(self, key: str, source: str | Path) -> None:
+        blob_path = self._blob_path(key)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=blob_path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, blob_path)
+        except BaseException:
+            _unlink(Path(tmp))
+            raise
+        meta = json.dumps({"kind": "blob", "suffix": Path(source).suffix}).encode("utf-8")
+        self._write_atomic(self._meta_path(key), meta)
+        self._account(key)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry (e.g. one whose blob could not be read)."""
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._total -= entry[0]
+        _unlink(self._meta_path(key))
+        _unlink(self._blob_path(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ---------- Internal helpers ----------
+
+    def _meta_path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    def _blob_path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.bin"
+
+    def _entry_size(self, key: str) -> Tuple[int, float]:
+        size, last_used = 0, 0.0
+        for path in (self._meta_path(key), self._blob_path(key)):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            size += st.st_size
+            last_used = max(last_used, st.st_mtime)
+        return size, last_used
+
+    def _scan(self) -> None:
+        for meta_path in self._root.glob("*/*.json"):
+            key = meta_path.stem
+            size, last_used = self._entry_size(key)
+            self._index[key] = (size, last_used)
+            self._total += size
+        self._evict()
+
+    def _account(self, key: str) -> None:
+        size, last_used = self._entry_size(key)
+        with self._lock:
+            previous = self._index.get(key)
+            if previous is not None:
+                self._total -= previous[0]
+            self._index[key] = (size, last_used)
+            self._total += size
+        self._evict()
+
+    def _touch(self, key: str) -> None:
+        for path in (self._meta_path(key), self._blob_path(key)):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                self._index[key] = (entry[0], self._entry_size(key)[1])
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total <= self._max_bytes:
+                return
+            victims = sorted(self._index.items(), key=lambda item: item[1][1])
+            removed = []
+            for key, (size, _) in victims:
+                if self._total <= self._max_bytes:
+                    break
+                del self._index[key]
+                self._total -= size
+                self.evictions += 1
+                removed.append(key)
+
+        for key in removed:
+            _unlink(self._meta_path(key))
+            _unlink(self._blob_path(key))
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            _unlink(Path(tmp))
+            raise
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+# -------------------------------------------------
+# Executor wrapper
+# -------------------------------------------------
+
+class CachedExecutor(ExecutorWrapper):
+    """
+    Serve repeated deterministic AI generations from a DiskCache.
+
+    Result handling:
+    - text results are stored inline
+    - bytes results are stored as blobs and returned as bytes
+    - file results (save_to_file / output_file) are stored as blobs
+      and copied to the requested path on a hit
+    - anything else (e.g. live image objects) is not cached
+    """
+
+    def __init__(
+        self,
+        inner: Any,
+        cache: DiskCache,
+        *,
+        provider: str,
+        ai_type: str,
+        policy: CachePolicy = CachePolicy(),
+    ) -> None:
+        super().__init__(inner)
+        self._cache = cache
+        self._provider_key = provider
+        self._ai_type = ai_type
+        self._policy = policy
+
+    def _call(self, method: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        key = self._key(method, args, kwargs)
+        if key is None:
+            return fn(*args, **kwargs)
+
+        found, value = self._lookup(key, kwargs)
+        if found:
+            return value
+
+        result = fn(*args, **kwargs)
+        self._store(key, result, kwargs)
+        return result
+
+    async def _acall(self, method: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        key = self._key(method, args, kwargs)
+        if key is None:
+            return await fn(*args, **kwargs)
+
+        found, value = await asyncio.to_thread(self._lookup, key, kwargs)
+        if found:
+            return value
+
+        result = await fn(*args, **kwargs)
+        await asyncio.to_thread(self._store, key, result, kwargs)
+        return result
+
+    # ---------- Policy ----------
+
+    def _key(self, method: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[str]:
+        if kwargs.get("stream"):
+            return None
+
+        if self._policy.require_seed and not _fixed_seed(kwargs.get("seed")):
+            return None
+
+        params = {k: v for k, v in kwargs.items() if k not in _OUTPUT_KWARGS}
+        try:
+            canonical = json.dumps(
+                {
+                    "provider": self._provider_key,
+                    "model": params.pop("model", None),
+                    "type": self._ai_type,
+                    "method": method,
+                    "args": list(args),
+                    "params": params,
+                },
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _output_path(kwargs: Dict[str, Any]) -> Optional[str]:
+        if kwargs.get("output_file"):
+            return str(kwargs["output_file"])
+        if kwargs.get("save_to_file"):
+            return str(kwargs["file_path"]) if kwargs.get("file_path") else ""
+        return None
+
+    # ---------- Storage ----------
+
+    def _lookup(self, key: str, kwargs: Dict[str, Any]) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+
+        if entry.kind == "text":
+            return True, entry.text
+
+        output_path = self._output_path(kwargs)
+        temp_path: Optional[str] = None
+        try:
+            if output_path is None:
+                return True, entry.blob_path.read_bytes()
+
+            if not output_path:
+                suffix = entry.suffix or _DEFAULT_SUFFIXES.get(self._ai_type, "")
+                fd, temp_path = tempfile.mkstemp(suffix=suffix)
+                os.close(fd)
+                output_path = temp_path
+
+            shutil.copyfile(entry.blob_path, output_path)
+        except OSError:
+            # evicted or deleted since get(); the cache is best-effort
+            if temp_path is not None:
+                _unlink(Path(temp_path))
+            self._cache.discard(key)
+            return False, None
+        return True, output_path
+
+    def _store(self, key: str, result: Any, kwargs: Dict[str, Any]) -> None:
+        output_path = self._output_path(kwargs)
+
+        try:
+            if isinstance(result, (bytes, bytearray, memoryview)):
+                self._cache.put_bytes(key, result)
+            elif isinstance(result, str) and output_path is not None:
+                self._cache.put_file(key, result)
+            elif isinstance(result, str) and self._ai_type == "text":
+                self._cache.put_text(key, result)
+        except OSError:
+            # the cache is best-effort; a failed write must not fail the call
+            pass
@@ -0,0 +1,271 @@
+# mcp_sdk/providers/hedging.py
+
+"""
+Hedged requests and jittered retries for upstream tail latency.
+
+HedgedExecutor wraps any AI executor:
+- hedging: if an attempt has not answered after the `hedge_percentile`
+  of recently observed latencies, a duplicate attempt is started; the
+  first success wins and the other attempt is cancelled. Calls that
+  write a file (save_to_file / file_path / output_file) are never
+  hedged: both attempts would write the same path at once
+- retries: transient failures (timeouts, connection errors, HTTP
+  408/425/429/5xx) are retried with full-jitter exponential backoff
+- budget: hedges and retries both spend from one token bucket that
+  each call refills by `budget_ratio`, so extra upstream load stays
+  below that ratio of real traffic (e.g. 0.1 -> at most ~10% more)
+
+Retries never sleep past the request deadline (utils.deadline).
+
+Attempts run as coroutines so a losing attempt is really cancelled.
+Sync calls run them on the shared provider runtime loop; executors
+without async methods run each attempt in a worker thread, where a
+losing attempt is abandoned rather than interrupted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, FrozenSet, Optional, Tuple
+
+from providers.runtime import run_sync
+from providers.wrapper import ASYNC_METHODS, ExecutorWrapper
+from utils import deadline
+
+
+# sync method -> its async counterpart
+_ASYNC_NAMES = {sync_name: async_name for async_name, sync_name in ASYNC_METHODS.items()}
+
+# kwargs that make a call write a file, so it must not run twice at once
+_FILE_KWARGS = ("save_to_file", "file_path", "output_file")
+
+_TRANSIENT_STATUS = re.compile(r"\bHTTP (408|425|429|5\d\d)\b")
+# httpx transport errors, matched by name so httpx is not imported here
+_TRANSIENT_NAMES = frozenset({"TransportError", "TimeoutException"})
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    True if exc (or an exception it was raised from) looks temporary:
+    a timeout, a connection error or a retryable HTTP status.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (TimeoutError, ConnectionError)):
+            return True
+        if any(cls.__name__ in _TRANSIENT_NAMES for cls in type(exc).__mro__):
+            return True
+        if _TRANSIENT_STATUS.search(str(exc)):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    Attributes:
+        hedge_percentile: hedge an attempt still running after this
+            percentile (0-1) of recent latencies; None disables hedging
+        hedge_methods: methods safe to run twice at once (calls writing
+            a file are never hedged)
+        initial_delay: hedge delay until `min_samples` latencies are known
+        min_samples: latencies needed before the percentile is used
+        window: recent latencies kept per method
+        max_retries: retries of a transient failure per call
+        backoff_base: ceiling of the first retry backoff, in seconds
+            (doubles per retry; the actual wait is uniform below it)
+        backoff_max: largest backoff ceiling
+        budget_ratio: extra attempts (hedges + retries) earned per call
+        budget_burst: extra attempts that can be spent back to back
+        retry_on: predicate choosing which failures are retried
+        seed: RNG seed for the jitter
+    """
+
+    hedge_percentile: Optional[float] = 0.95
+    hedge_methods: FrozenSet[str] = frozenset({"generate", "transcribe"})
+    initial_delay: float = 2.0
+    min_samples: int = 20
+    window: int = 512
+    max_retries: int = 2
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    budget_ratio: float = 0.1
+    budget_burst: float = 10.0
+    retry_on: Callable[[BaseException], bool] = is_transient
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.hedge_percentile is not None and not 0.0 < self.hedge_percentile < 1.0:
+            raise ValueError("hedge_percentile must be within (0, 1)")
+        if self.initial_delay < 0 or self.backoff_base < 0 or self.backoff_max < self.backoff_base:
+            raise ValueError("delays must be >= 0 and backoff_max >= backoff_base")
+        if self.min_samples < 1 or self.window < self.min_samples or self.max_retries < 0:
+            raise ValueError("need 1 <= min_samples <= window and max_retries >= 0")
+        if self.budget_ratio < 0 or self.budget_burst < 1:
+            raise ValueError("budget_ratio must be >= 0 and budget_burst >= 1")
+
+
+class HedgedExecutor(ExecutorWrapper):
+    """
+    Cut upstream tail latency with budgeted hedges and retries.
+    """
+
+    def __init__(self, inner: Any, policy: HedgePolicy = HedgePolicy()) -> None:
+        super().__init__(inner)
+        self._policy = policy
+        self._lock = threading.Lock()
+        self._rng = random.Random(policy.seed)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._budget = policy.budget_burst
+
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.budget_denied = 0
+
+    # -------------------------------------------------
+    # Execution
+    # -------------------------------------------------
+
+    def _call(self, method: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        afn = getattr(self._inner, _ASYNC_NAMES.get(method, ""), None)
+        if afn is None:
+            afn = functools.partial(asyncio.to_thread, fn)
+        # the runtime loop does not see the caller's context; carry the deadline over
+        return run_sync(self._scoped(deadline.current(), self._acall(method, afn, *args, **kwargs)))
+
+    async def _acall(self, method: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        policy = self._policy
+        hedge = (
+            policy.hedge_percentile is not None
+            and method in policy.hedge_methods
+            and not any(kwargs.get(name) for name in _FILE_KWARGS)
+        )
+        with self._lock:
+            self.calls += 1
+            self._budget = min(policy.budget_burst, self._budget + policy.budget_ratio)
+
+        retries = 0
+        while True:
+            try:
+                if hedge:
+                    return await self._hedged(method, fn, args, kwargs)
+                return await self._attempt(method, fn, args, kwargs)
+            except Exception as exc:
+                if retries >= policy.max_retries or not policy.retry_on(exc):
+                    raise
+                delay = self._backoff(retries)
+                left = deadline.remaining()
+                if (left is not None and left <= delay) or not self._spend():
+                    raise
+                retries += 1
+                with self._lock:
+                    self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, method: str, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        primary = asyncio.ensure_future(self._attempt(method, fn, args, kwargs))
+        backup: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(method))
+            if done or not self._spend():
+                return await primary
+
+            with self._lock:
+                self.hedges += 1
+            backup = asyncio.ensure_future(self._attempt(method, fn, args, kwargs))
+
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is backup:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error
+        finally:
+            # cancel the loser (or both, if the caller gave up)
+            for attempt in (primary, backup):
+                if attempt is None:
+                    continue
+                if not attempt.done():
+                    attempt.cancel()
+                elif not attempt.cancelled():
+                    attempt.exception()  # mark a losing failure as retrieved
+
+    async def _attempt(self, method: str, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        started = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            # a cancelled loser ran at least this long; keeps the tail visible
+            self._observe(method, time.monotonic() - started)
+            raise
+        self._observe(method, time.monotonic() - started)
+        return result
+
+    @staticmethod
+    async def _scoped(active: Optional[float], coro: Any) -> Any:
+        with deadline.scope(active):
+            return await coro
+
+    # -------------------------------------------------
+    # Policy state
+    # -------------------------------------------------
+
+    def _observe(self, method: str, latency: float) -> None:
+        with self._lock:
+            window = self._latencies.get(method)
+            if window is None:
+                window = self._latencies[method] = deque(maxlen=self._policy.window)
+            window.append(latency)
+
+    def _hedge_delay(self, method: str) -> float:
+        with self._lock:
+            window = self._latencies.get(method)
+            if window is None or len(window) < self._policy.min_samples:
+                return self._policy.initial_delay
+            ordered = sorted(window)
+        index = min(len(ordered) - 1, math.ceil(self._policy.hedge_percentile * len(ordered)) - 1)
+        return ordered[index]
+
+    def _backoff(self, retry: int) -> float:
+        ceiling = min(self._policy.backoff_max, self._policy.backoff_base * (2 ** retry))
+        with self._lock:
+            return self._rng.uniform(0.0, ceiling)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._budget >= 1.0:
+                self._budget -= 1.0
+                return True
+            self.budget_denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "retries": self.retries,
+            "budget_denied": self.budget_denied,
+        }
+        if self._policy.hedge_percentile is not None:
+            for method in list(self._latencies):
+                stats[f"{method}_hedge_delay"] = self._hedge_delay(method)
+        return stats
@@ -10,14 +10,26 @@ Public API:
 - PollinationsTextClient
 - PollinationsImageClient
 - PollinationsAudioClient
+
+Each client's module (and the SDK behind it) is imported on first use.
 """
 
-from .text import PollinationsTextClient
-from .image import PollinationsImageClient
-from .audio import PollinationsAudioClient
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "PollinationsTextClient": ".text",
+    "PollinationsImageClient": ".image",
+    "PollinationsAudioClient": ".audio",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "PollinationsTextClient",
-    "PollinationsImageClient",
-    "PollinationsAudioClient",
-]
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
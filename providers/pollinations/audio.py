@@ -1,10 +1,19 @@
 # mcp_sdk/providers/pollinations/audio.py
 from __future__ import annotations
 import asyncio
+import http.client
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
+from urllib.parse import quote, urlencode
 
-import pollinations
+from providers.pool import PooledResponse, get_pool
+from utils import deadline
+
+AUDIO_ENDPOINT = "https://text.pollinations.ai"
+CHUNK_SIZE = 64 * 1024
 
 
 class PollinationsAudioClient:
@@ -14,20 +23,67 @@ class PollinationsAudioClient:
     Responsibilities:
     - Accepts a text prompt
     - Returns the AI answer as an audio file (MP3)
-    - Bridges async Pollinations API to sync usage
+    - Streams the MP3 in chunks as it downloads; files are written
+      incrementally to a temp file and atomically renamed, so memory
+      stays bounded by the chunk size
+    - Borrows keep-alive connections from the shared provider pool
+    - Exposes agenerate_audio() for event-loop callers
     """
 
     def __init__(
         self,
-        model: str | None = "openai",
+        model: str | None = "openai-audio",
         system: str | None = "You are a helpful AI assistant.",
+        voice: str = "alloy",
+        endpoint: str = AUDIO_ENDPOINT,
+        timeout: float = 120.0,
         **kwargs: Any,
     ) -> None:
-        self._model = pollinations.Text(
-            model=model,
-            system=system,
-            **kwargs,
-        )
+        self._endpoint = endpoint.rstrip("/")
+        self._timeout = timeout
+        # default query parameters, overridable per call
+        self._params = {"model": model, "system": system, "voice": voice, **kwargs}
+
+    def stream_audio(
+        self,
+        prompt: str,
+        output_file: str | Path | None = None,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> Iterator[bytes]:
+        """
+        Stream the MP3 answer chunk by chunk as it arrives.
+
+        Args:
+            prompt: The text prompt for AI
+            output_file: Optional path; chunks are also written there
+                (temp file in the same directory, renamed on completion)
+            chunk_size: Maximum bytes per yielded chunk
+            **kwargs: Extra query parameters passed to Pollinations
+
+        Yields:
+            bytes: MP3 chunks
+        """
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("prompt must be a non-empty string")
+
+        try:
+            response = self._open(prompt, **kwargs)
+        except Exception as e:
+            raise RuntimeError(f"Pollinations audio generation failed: {e}") from e
+
+        try:
+            if output_file is None:
+                yield from self._read_chunks(response, chunk_size)
+                return
+
+            with _atomic_output(Path(output_file)) as out:
+                for chunk in self._read_chunks(response, chunk_size):
+                    out.write(chunk)
+                    yield chunk
+        finally:
+            response.close()
 
     def generate_audio(
         self,
@@ -47,16 +103,70 @@ class PollinationsAudioClient:
             str: Path to saved MP3 file
         """
         output_file = str(Path(output_file))
-        if not prompt or not isinstance(prompt, str):
-            raise ValueError("prompt must be a non-empty string")
 
-        try:
-            # Gunakan method SpeakAsync atau sejenis untuk text -> audio
-            # Hasilnya akan berupa bytes audio yang kita simpan sendiri
-            audio_bytes = asyncio.run(self._model.SpeakAsync(prompt, **kwargs))
+        for _ in self.stream_audio(prompt, output_file, **kwargs):
+            pass
+        return output_file
 
-            # Simpan MP3 ke file
-            Path(output_file).write_bytes(audio_bytes)
-            return output_file
-        except Exception as e:
+    async def agenerate_audio(
+        self,
+        prompt: str,
+        output_file: str | Path,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Awaitable variant of generate_audio(); same arguments and return value.
+
+        The download is blocking socket and file IO, so it runs in a
+        worker thread rather than on the caller's loop.
+        """
+        return await asyncio.to_thread(self.generate_audio, prompt, output_file, **kwargs)
+
+    def _open(self, prompt: str, **kwargs: Any) -> PooledResponse:
+        params = {k: v for k, v in {**self._params, **kwargs}.items() if v is not None}
+        url = f"{self._endpoint}/{quote(prompt, safe='')}?{urlencode(params)}"
+
+        response = get_pool().request("GET", url, timeout=deadline.bound(self._timeout))
+        if response.status >= 400:
+            detail = response.read(512).decode("utf-8", "replace")
+            response.close()
+            raise RuntimeError(f"HTTP {response.status}: {detail}")
+        return response
+
+    @staticmethod
+    def _read_chunks(response: PooledResponse, chunk_size: int) -> Iterator[bytes]:
+        try:
+            while True:
+                # read1 returns whatever has arrived instead of waiting for a full chunk
+                chunk = response.read1(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        except (OSError, http.client.HTTPException) as e:
             raise RuntimeError(f"Pollinations audio generation failed: {e}") from e
+        # read1 signals a connection closed early as a plain end of body
+        if response.length:
+            raise RuntimeError(
+                f"Pollinations audio generation failed: body ended {response.length} bytes short"
+            )
+
+
+@contextmanager
+def _atomic_output(path: Path) -> Iterator[BinaryIO]:
+    """
+    Write to a temp file next to `path`, renamed into place on success.
+
+    Readers never observe a partial file; on error (or an abandoned
+    stream) the temp file is removed and `path` is left untouched.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            yield out
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
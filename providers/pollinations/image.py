@@ -1,5 +1,6 @@
 from __future__ import annotations
 import asyncio
+import io
 import tempfile
 from pathlib import Path
 from typing import Any
@@ -7,10 +8,18 @@ from typing import Any
 import pollinations
 from PIL.Image import Image as PILImage
 
+from providers.runtime import run_async, run_sync
+
 
 class PollinationsImageClient:
     """
     Synchronous wrapper around pollinations.Image.
+
+    agenerate() is the awaitable counterpart for event-loop callers.
+
+    With `image_format` set, the image is encoded straight into an
+    in-memory buffer and returned as a memoryview (no temp file, no
+    re-read).
     """
 
     def __init__(
@@ -45,8 +54,11 @@ class PollinationsImageClient:
         model: str = "flux",
         save_to_file: bool = False,
         file_path: str | None = None,
+        image_format: str | None = None,
+        quality: int | None = None,
+        compress_level: int | None = None,
         **kwargs: Any,
-    ) -> PILImage | str:
+    ) -> PILImage | str | memoryview:
         """
         Generate an image from a text prompt.
 
@@ -55,37 +67,156 @@ class PollinationsImageClient:
             negative: Optional negative prompt
             save_to_file: If True, image is saved to disk
             file_path: Optional path to save image (if None, uses temp file)
+            image_format: "PNG", "JPEG" or "WEBP"; without save_to_file the
+                encoded bytes are returned
+            quality: JPEG/WebP quality (1-100)
+            compress_level: PNG zlib compression level (0-9)
             **kwargs: Extra args passed to pollinations.Image.Async
 
         Returns:
-            PIL.Image.Image if save_to_file is False,
-            else str path to saved image
+            str path to saved image if save_to_file is True,
+            memoryview of encoded bytes if image_format is set,
+            else PIL.Image.Image
         """
         if not prompt or not isinstance(prompt, str):
             raise ValueError("prompt must be a non-empty string")
+        if image_format:
+            # reject unsupported formats before the network call
+            self._save_options(image_format, quality, compress_level)
 
         try:
             image = self._run_async(prompt, negative=negative, model=model, **kwargs)
         except Exception as e:
             raise RuntimeError(f"Pollinations image generation failed: {e}") from e
 
-        if save_to_file:
-            if file_path is None:
-                tmp_file = tempfile.NamedTemporaryFile(
-                    suffix=".png", delete=False
-                )
-                file_path = tmp_file.name
-                tmp_file.close()
-            else:
-                file_path = str(Path(file_path))
-
-            image.save(file_path, format="PNG")
-            return file_path
+        return self._finish(image, save_to_file, file_path, image_format, quality, compress_level)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        negative: str = "",
+        model: str = "flux",
+        save_to_file: bool = False,
+        file_path: str | None = None,
+        image_format: str | None = None,
+        quality: int | None = None,
+        compress_level: int | None = None,
+        **kwargs: Any,
+    ) -> PILImage | str | memoryview:
+        """
+        Awaitable variant of generate(); same arguments and return values.
+        """
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("prompt must be a non-empty string")
+        if image_format:
+            # reject unsupported formats before the network call
+            self._save_options(image_format, quality, compress_level)
+
+        try:
+            image = await run_async(
+                self._model.Async(prompt, negative=negative, model=model, **kwargs)
+            )
+        except Exception as e:
+            raise RuntimeError(f"Pollinations image generation failed: {e}") from e
+
+        if save_to_file or image_format:
+            return await asyncio.to_thread(
+                self._finish, image, save_to_file, file_path, image_format, quality, compress_level
+            )
 
         return image
 
     def _run_async(self, prompt: str, **kwargs: Any) -> PILImage:
         """
-        Internal helper to run async image generation in a blocking manner.
+        Internal helper to run async image generation in a blocking manner
+        on the shared provider loop.
+        """
+        return run_sync(self._model.Async(prompt, **kwargs))
+
+    @classmethod
+    def _finish(
+        cls,
+        image: PILImage,
+        save_to_file: bool,
+        file_path: str | None,
+        image_format: str | None,
+        quality: int | None,
+        compress_level: int | None,
+    ) -> PILImage | str | memoryview:
+        if save_to_file:
+            return cls._save(image, file_path, image_format or "PNG", quality, compress_level)
+        if image_format:
+            return cls._encode(image, image_format, quality, compress_level)
+        return image
+
+    @classmethod
+    def _save(
+        cls,
+        image: PILImage,
+        file_path: str | None,
+        image_format: str = "PNG",
+        quality: int | None = None,
+        compress_level: int | None = None,
+    ) -> str:
+        """
+        Save image to disk, to a temp file if no path is given.
+        """
+        fmt, options = cls._save_options(image_format, quality, compress_level)
+
+        if file_path is None:
+            tmp_file = tempfile.NamedTemporaryFile(
+                suffix=_SUFFIXES[fmt], delete=False
+            )
+            file_path = tmp_file.name
+            tmp_file.close()
+        else:
+            file_path = str(Path(file_path))
+
+        cls._prepare(image, fmt).save(file_path, format=fmt, **options)
+        return file_path
+
+    @classmethod
+    def _encode(
+        cls,
+        image: PILImage,
+        image_format: str,
+        quality: int | None = None,
+        compress_level: int | None = None,
+    ) -> memoryview:
+        """
+        Encode image into an in-memory buffer, without copying it out.
         """
-        return asyncio.run(self._model.Async(prompt, **kwargs))
+        fmt, options = cls._save_options(image_format, quality, compress_level)
+
+        buffer = io.BytesIO()
+        cls._prepare(image, fmt).save(buffer, format=fmt, **options)
+        return buffer.getbuffer()
+
+    @staticmethod
+    def _save_options(
+        image_format: str,
+        quality: int | None,
+        compress_level: int | None,
+    ) -> tuple[str, dict[str, Any]]:
+        fmt = image_format.upper()
+        fmt = "JPEG" if fmt == "JPG" else fmt
+        if fmt not in _SUFFIXES:
+            raise ValueError(f"Unsupported image format: {image_format}")
+
+        options: dict[str, Any] = {}
+        if fmt == "PNG" and compress_level is not None:
+            options["compress_level"] = compress_level
+        if fmt in ("JPEG", "WEBP") and quality is not None:
+            options["quality"] = quality
+        return fmt, options
+
+    @staticmethod
+    def _prepare(image: PILImage, fmt: str) -> PILImage:
+        # JPEG has no alpha channel
+        if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+            return image.convert("RGB")
+        return image
+
+
+_SUFFIXES = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
@@ -1,9 +1,10 @@
 from __future__ import annotations
-import asyncio
-from typing import Any, List, Union
+from typing import Any, AsyncIterator, Iterator, List, Union
 
 import pollinations
 
+from providers.runtime import iterate_async, iterate_sync, run_async, run_sync
+
 
 class PollinationsTextClient:
     """
@@ -12,7 +13,10 @@ class PollinationsTextClient:
     Responsibilities:
     - Generate text from prompts
     - Supports streaming and non-streaming modes
-    - Bridges async Pollinations SDK to synchronous usage
+    - stream() / astream() yield tokens as they arrive upstream
+    - Bridges async Pollinations SDK to synchronous usage via the
+      shared provider runtime loop
+    - Exposes agenerate() for callers already running an event loop
     """
 
     def __init__(
@@ -67,9 +71,58 @@ class PollinationsTextClient:
         except Exception as e:
             raise RuntimeError(f"Pollinations text generation failed: {e}") from e
 
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Union[str, List[str]]:
+        """
+        Awaitable variant of generate(); same arguments and return values.
+        """
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("prompt must be a non-empty string")
+
+        try:
+            if stream:
+                return await run_async(_collect_stream(self._stream(prompt, **kwargs)))
+            return await run_async(self._model.Async(prompt, **kwargs))
+        except Exception as e:
+            raise RuntimeError(f"Pollinations text generation failed: {e}") from e
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Yield tokens as soon as the upstream produces them.
+
+        Args:
+            prompt: Input text prompt
+            **kwargs: Extra args passed to pollinations.Text.Async
+        """
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("prompt must be a non-empty string")
+
+        try:
+            yield from iterate_sync(self._stream(prompt, **kwargs))
+        except Exception as e:
+            raise RuntimeError(f"Pollinations text generation failed: {e}") from e
+
+    async def astream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Awaitable variant of stream().
+        """
+        if not prompt or not isinstance(prompt, str):
+            raise ValueError("prompt must be a non-empty string")
+
+        try:
+            async for token in iterate_async(self._stream(prompt, **kwargs)):
+                yield token
+        except Exception as e:
+            raise RuntimeError(f"Pollinations text generation failed: {e}") from e
+
     def _run_async(self, prompt: str, **kwargs: Any) -> str:
-        """Run non-streaming async generation in blocking mode."""
-        return asyncio.run(self._model.Async(prompt, **kwargs))
+        """Run non-streaming async generation on the shared provider loop."""
+        return run_sync(self._model.Async(prompt, **kwargs))
 
     def _run_async_stream(self, prompt: str, **kwargs: Any) -> List[str]:
         """
@@ -78,12 +131,12 @@ class PollinationsTextClient:
         Returns:
             List[str]: List of tokens from the async generator
         """
+        return run_sync(_collect_stream(self._stream(prompt, **kwargs)))
 
-        async def _stream():
-            async for token in await self._model.Async(prompt, stream=True, **kwargs):
-                yield token
-
-        return asyncio.run(_collect_stream(_stream()))
+    async def _stream(self, prompt: str, **kwargs: Any):
+        """Async generator over upstream tokens."""
+        async for token in await self._model.Async(prompt, stream=True, **kwargs):
+            yield token
 
 
 async def _collect_stream(async_gen):
@@ -0,0 +1,467 @@
+# mcp_sdk/providers/pool.py
+
+"""
+Shared upstream HTTP connection pool for provider adapters.
+
+Adapters that talk HTTP directly borrow keep-alive connections from one
+per-process pool instead of paying a TCP (and TLS) handshake per call.
+
+- at most `max_per_host` connections per (scheme, host, port); callers
+  beyond that wait for a connection to be released
+- idle connections expire after `keepalive_timeout` seconds
+- host names are resolved through a small TTL cache; TLS still
+  verifies and sends SNI for the original host name
+- stats() reports pool size, reuse rate and wait time
+
+Scope: only PollinationsAudioClient uses this pool today. The text and
+image adapters call the pollinations SDK, which opens its own HTTP
+connections on the shared runtime loop (providers.runtime) and is not
+routed through here.
+"""
+
+from __future__ import annotations
+
+import http.client
+import os
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+DEFAULT_MAX_PER_HOST = 8
+DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+DEFAULT_DNS_TTL = 60.0
+DEFAULT_TIMEOUT = 60.0
+
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_HostKey = Tuple[str, str, int]
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when no connection became free within the wait timeout."""
+
+
+# -------------------------------------------------
+# DNS cache
+# -------------------------------------------------
+
+class DNSCache:
+    """
+    Resolves host names to one address, cached for `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_DNS_TTL,
+        resolver: Callable[..., List[Any]] = socket.getaddrinfo,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._resolver = resolver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host: str, port: int) -> str:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        infos = self._resolver(host, port, type=socket.SOCK_STREAM)
+        if not infos:
+            raise OSError(f"Could not resolve host: {host}")
+        address = infos[0][4][0]
+
+        with self._lock:
+            self._entries[(host, port)] = (address, now + self._ttl)
+        return address
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# -------------------------------------------------
+# Connections
+# -------------------------------------------------
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects to a pre-resolved address."""
+
+    def __init__(self, host: str, port: int, address: str, timeout: float) -> None:
+        super().__init__(host, port, timeout=timeout)
+        self._address = address
+
+    def connect(self) -> None:
+        self.sock = socket.create_connection((self._address, self.port), self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class _HTTPSConnection(_HTTPConnection):
+    """TLS over a pre-resolved address; SNI and verification use `host`."""
+
+    def __init__(self, host: str, port: int, address: str, timeout: float, context: ssl.SSLContext) -> None:
+        super().__init__(host, port, address, timeout)
+        self._ssl_context = context
+
+    def connect(self) -> None:
+        super().connect()
+        self.sock = self._ssl_context.wrap_socket(self.sock, server_hostname=self.host)
+
+
+class PooledResponse:
+    """
+    Response whose connection goes back to the pool on close().
+
+    The connection is reused only if the body was read to the end and
+    the server did not ask to close it. Use as a context manager.
+    """
+
+    def __init__(self, pool: ConnectionPool, key: _HostKey, conn: _HTTPConnection, response: http.client.HTTPResponse) -> None:
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self._released = False
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._response.headers
+
+    @property
+    def length(self) -> Optional[int]:
+        """Body bytes still expected per Content-Length; None if unknown."""
+        return self._response.length
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._response.getheader(name, default)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._response.read(amt)
+
+    def read1(self, amt: int = -1) -> bytes:
+        return self._response.read1(amt)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        # fully consumed bodies leave the response closed and the connection idle
+        reusable = self._response.isclosed() and not self._response.will_close
+        self._response.close()
+        self._pool._release(self._key, self._conn, reusable)
+
+    def __enter__(self) -> PooledResponse:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class _HostPool:
+    def __init__(self, lock: threading.Lock) -> None:
+        self.idle: Deque[Tuple[_HTTPConnection, float]] = deque()
+        self.open = 0
+        # one per host: a release only wakes callers waiting for that host
+        self.available = threading.Condition(lock)
+
+
+# -------------------------------------------------
+# Pool
+# -------------------------------------------------
+
+class ConnectionPool:
+    """
+    Thread-safe keep-alive connection pool keyed by (scheme, host, port).
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        dns_ttl: float = DEFAULT_DNS_TTL,
+        timeout: float = DEFAULT_TIMEOUT,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        dns: Optional[DNSCache] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be >= 1")
+
+        self._max_per_host = max_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._dns = dns or DNSCache(ttl=dns_ttl, clock=clock)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[_HostKey, _HostPool] = {}
+
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.expired = 0
+        self.stale = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> PooledResponse:
+        """
+        Send a request on a pooled connection and return its response.
+
+        The caller must close() the response (or use it as a context
+        manager) to hand the connection back. `timeout` bounds both the
+        wait for a free connection and each socket operation.
+
+        A reused connection the server already closed is retried once
+        on a fresh connection for idempotent methods.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+
+        port = parts.port or (443 if scheme == "https" else 80)
+        key: _HostKey = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        with self._lock:
+            self.requests += 1
+
+        timeout = self._timeout if timeout is None else timeout
+
+        for attempt in (0, 1):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request(method, target, body=body, headers=dict(headers or {}))
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._release(key, conn, reusable=False)
+                if reused:
+                    # the server had already dropped it; not a real reuse
+                    with self._lock:
+                        self.reused -= 1
+                        self.stale += 1
+                if reused and attempt == 0 and method.upper() in _IDEMPOTENT_METHODS:
+                    continue
+                raise
+            except BaseException:
+                self._release(key, conn, reusable=False)
+                raise
+            return PooledResponse(self, key, conn, response)
+
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of pool counters.
+
+        reuse_rate is the share of connection checkouts served by an
+        idle keep-alive connection.
+        """
+        with self._lock:
+            checkouts = self.created + self.reused
+            open_total = sum(host.open for host in self._hosts.values())
+            idle_total = sum(len(host.idle) for host in self._hosts.values())
+            return {
+                "hosts": len(self._hosts),
+                "open": open_total,
+                "idle": idle_total,
+                "in_use": open_total - idle_total,
+                "max_per_host": self._max_per_host,
+                "requests": self.requests,
+                "created": self.created,
+                "reused": self.reused,
+                "expired": self.expired,
+                "stale": self.stale,
+                "reuse_rate": self.reused / checkouts if checkouts else 0.0,
+                "waits": self.waits,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+                "dns_hits": self._dns.hits,
+                "dns_misses": self._dns.misses,
+            }
+
+    def close(self) -> None:
+        """Close every idle connection. In-use connections close on release."""
+        with self._lock:
+            idle = [conn for host in self._hosts.values() for conn, _ in host.idle]
+            for host in self._hosts.values():
+                host.open -= len(host.idle)
+                host.idle.clear()
+                host.available.notify_all()
+        for conn in idle:
+            conn.close()
+
+    # -------------------------------------------------
+    # Internal helpers
+    # -------------------------------------------------
+
+    def _acquire(self, key: _HostKey, wait_timeout: float) -> Tuple[_HTTPConnection, bool]:
+        stale: List[_HTTPConnection] = []
+        waited_since: Optional[float] = None
+
+        with self._lock:
+            host = self._host(key)
+            while True:
+                now = self._clock()
+                while host.idle:
+                    conn, last_used = host.idle.pop()
+                    if now - last_used < self._keepalive_timeout:
+                        self.reused += 1
+                        self._record_wait(waited_since, now)
+                        break
+                    host.open -= 1
+                    self.expired += 1
+                    stale.append(conn)
+                else:
+                    conn = None
+
+                if conn is not None:
+                    reused = True
+                    break
+
+                if host.open < self._max_per_host:
+                    # reserve the slot; the socket is opened outside the lock
+                    host.open += 1
+                    self.created += 1
+                    self._record_wait(waited_since, now)
+                    conn, reused = None, False
+                    break
+
+                if waited_since is None:
+                    waited_since = now
+                    self.waits += 1
+                remaining = waited_since + wait_timeout - now
+                if remaining <= 0 or not host.available.wait(remaining):
+                    self._record_wait(waited_since, self._clock())
+                    raise PoolTimeout(f"No free connection to {key[1]}:{key[2]} after {wait_timeout}s")
+
+        for old in stale:
+            old.close()
+
+        if conn is None:
+            try:
+                conn = self._connect(key)
+            except BaseException:
+                with self._lock:
+                    host.open -= 1
+                    host.available.notify()
+                raise
+        return conn, reused
+
+    def _connect(self, key: _HostKey) -> _HTTPConnection:
+        scheme, hostname, port = key
+        address = self._dns.resolve(hostname, port)
+        if scheme == "https":
+            return _HTTPSConnection(hostname, port, address, self._timeout, self._ssl_context)
+        return _HTTPConnection(hostname, port, address, self._timeout)
+
+    def _release(self, key: _HostKey, conn: _HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            host = self._host(key)
+            if reusable:
+                host.idle.append((conn, self._clock()))
+            else:
+                host.open -= 1
+            host.available.notify()
+        if not reusable:
+            conn.close()
+
+    def _host(self, key: _HostKey) -> _HostPool:
+        # caller holds the lock
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _HostPool(self._lock)
+        return host
+
+    def _record_wait(self, waited_since: Optional[float], now: float) -> None:
+        # caller holds the lock
+        if waited_since is None:
+            return
+        waited = now - waited_since
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+
+
+# -------------------------------------------------
+# Process-wide pool
+# -------------------------------------------------
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the per-process connection pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def configure_pool(**options: Any) -> ConnectionPool:
+    """
+    Replace the per-process pool with one built from `options`
+    (ConnectionPool keyword arguments). The old pool's idle
+    connections are closed.
+    """
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(**options)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def _reset_after_fork() -> None:
+    # sockets must not be shared with the parent; children start empty
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,84 @@
+# mcp_sdk/providers/registry.py
+
+"""
+Lazy executor registry.
+
+Provider adapters pull in heavy SDKs (pollinations, PIL) at import.
+The registry records a factory per executor key and only imports and
+instantiates an executor the first time that key is looked up, so
+tool-only processes (e.g. a CLI validate_input call) never load them.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping
+
+
+ExecutorFactory = Callable[[], Any]
+
+
+def lazy_factory(module: str, attr: str, **kwargs: Any) -> ExecutorFactory:
+    """
+    Factory that imports `module`, then calls `module.attr(**kwargs)`.
+    """
+    def _factory() -> Any:
+        return getattr(importlib.import_module(module), attr)(**kwargs)
+
+    _factory.__qualname__ = f"lazy_factory({module}.{attr})"
+    return _factory
+
+
+class ExecutorRegistry(Mapping[str, Any]):
+    """
+    Read-only mapping of executor key -> executor, built on first access.
+
+    - keys, len() and `in` never trigger a load
+    - each executor is created at most once (thread-safe); a slow
+      factory only blocks lookups of its own key
+    - a failing factory is not cached; the next lookup retries it
+    - errors raised by a factory propagate, even a KeyError: get()
+      returns the default only for keys that have no factory
+    """
+
+    def __init__(self, factories: Mapping[str, ExecutorFactory]) -> None:
+        self._factories: Dict[str, ExecutorFactory] = dict(factories)
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # one per key: held while that key's factory runs
+        self._key_locks = {key: threading.Lock() for key in self._factories}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._instances[key]
+        except KeyError:
+            pass
+
+        factory = self._factories[key]
+        with self._key_locks[key]:
+            if key not in self._instances:
+                instance = factory()
+                with self._lock:
+                    self._instances[key] = instance
+            return self._instances[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Mapping.get would read a KeyError from inside a factory as a missing key
+        if key not in self._factories:
+            return default
+        return self[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._factories
+
+    def loaded(self) -> Dict[str, Any]:
+        """Executors instantiated so far."""
+        with self._lock:
+            return dict(self._instances)
@@ -0,0 +1,262 @@
+# mcp_sdk/providers/runtime.py
+
+"""
+Shared event loop runtime for provider adapters.
+
+Provider SDKs are async; the sync adapters used to bridge them with
+asyncio.run(), which creates and tears down an event loop (and every
+HTTP session bound to it) on each call. Instead, one long-lived loop
+runs in a background daemon thread per process and coroutines are
+submitted to it with run_coroutine_threadsafe.
+
+The loop is created on first use and lives until the process exits;
+a fork gets a fresh loop (the parent's thread does not survive fork).
+
+Blocking waits honour the request deadline (utils.deadline): when it
+passes, the coroutine on the loop is cancelled and TimeoutError is
+raised, so a stuck upstream never holds the calling worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from utils import deadline
+
+
+T = TypeVar("T")
+
+
+class ProviderRuntime:
+    """
+    Owns one background event loop thread.
+
+    The loop is started lazily on first use.
+    """
+
+    def __init__(self, name: str = "mcp-provider-runtime") -> None:
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            loop = self._start()
+        return loop
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def _serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_serve, name=self._name, daemon=True)
+            thread.start()
+            started.wait()
+
+            self._loop = loop
+            self._thread = thread
+            return loop
+
+    def close(self) -> None:
+        """
+        Stop the loop thread. A later call starts a fresh loop.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None:
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        loop.close()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and self._thread is threading.current_thread()
+
+    # -------------------------------------------------
+    # Execution
+    # -------------------------------------------------
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the shared loop and block until it finishes.
+
+        `timeout` is shortened to the request deadline, if any.
+
+        Raises:
+            TimeoutError if timeout elapses (the coroutine is cancelled)
+            RuntimeError if called from the loop thread itself
+        """
+        if self.in_loop_thread():
+            raise RuntimeError("ProviderRuntime.run() cannot block the runtime loop thread")
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(deadline.bound(timeout))
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError("Provider call timed out") from None
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """
+        Await a coroutine on the shared loop from any event loop.
+
+        Cancelling the caller cancels the coroutine on the runtime loop.
+        """
+        loop = self.loop
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def iterate(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Consume an async iterator on the shared loop as a blocking iterator.
+
+        Items are handed over as soon as they are produced. Closing the
+        returned iterator early, or the request deadline passing while
+        waiting for an item, cancels the producer.
+        """
+        if self.in_loop_thread():
+            raise RuntimeError("ProviderRuntime.iterate() cannot block the runtime loop thread")
+
+        items: "queue.SimpleQueue[tuple[str, Any]]" = queue.SimpleQueue()
+
+        async def _pump() -> None:
+            try:
+                async for item in agen:
+                    items.put(("item", item))
+            except BaseException as exc:
+                items.put(("error", exc))
+                raise
+            items.put(("done", None))
+
+        future = asyncio.run_coroutine_threadsafe(_pump(), self.loop)
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=deadline.remaining())
+                except queue.Empty:
+                    raise TimeoutError("Provider call timed out") from None
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+    async def aiterate(self, agen: AsyncIterator[T]) -> AsyncIterator[T]:
+        """
+        Consume an async iterator on the shared loop from any event loop.
+        """
+        loop = self.loop
+        caller = asyncio.get_running_loop()
+        if caller is loop:
+            async for item in agen:
+                yield item
+            return
+
+        items: "asyncio.Queue[tuple[str, Any]]" = asyncio.Queue()
+
+        def _put(kind: str, value: Any) -> None:
+            caller.call_soon_threadsafe(items.put_nowait, (kind, value))
+
+        async def _pump() -> None:
+            try:
+                async for item in agen:
+                    _put("item", item)
+            except BaseException as exc:
+                _put("error", exc)
+                raise
+            _put("done", None)
+
+        future = asyncio.run_coroutine_threadsafe(_pump(), loop)
+        try:
+            while True:
+                kind, value = await items.get()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+
+# -------------------------------------------------
+# Process-wide runtime
+# -------------------------------------------------
+
+_runtime: Optional[ProviderRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> ProviderRuntime:
+    """
+    Return the per-process provider runtime.
+    """
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = ProviderRuntime()
+    return _runtime
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Blocking helper for sync adapters."""
+    return get_runtime().run(coro, timeout)
+
+
+async def run_async(coro: Awaitable[T]) -> T:
+    """Awaitable helper for async adapters."""
+    return await get_runtime().run_async(coro)
+
+
+def iterate_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Blocking iterator helper for sync adapters."""
+    return get_runtime().iterate(agen)
+
+
+def iterate_async(agen: AsyncIterator[T]) -> AsyncIterator[T]:
+    """Async iterator helper for async adapters."""
+    return get_runtime().aiterate(agen)
+
+
+def _reset_after_fork() -> None:
+    # the loop thread does not survive fork(); children start their own
+    global _runtime, _runtime_lock
+    _runtime = None
+    _runtime_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
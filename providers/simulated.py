@@ -0,0 +1,377 @@
+# mcp_sdk/providers/simulated.py
+
+"""
+Simulated AI executors for offline load and capacity testing.
+
+Drop-in stand-ins for the Pollinations clients (same methods, same
+return shapes) that never touch the network. Each call:
+- waits a latency drawn from a lognormal distribution
+- fails with probability `error_rate` (RuntimeError after its latency)
+  or hangs with probability `hang_rate` (TimeoutError after `hang_s`)
+- returns a payload whose size is drawn from the profile's range
+- when streaming, yields tokens / audio chunks every `stream_interval`
+
+Enable them in build_dispatcher (`providers=simulated_factories(...)`)
+or for any shell with MCP_SIMULATE=1 (or a JSON profile path).
+
+Delays are cut short by the request deadline (utils.deadline), which
+then raises TimeoutError like the real provider runtime does.
+
+Only stdlib and utils are imported here.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from utils import deadline
+
+
+_WORDS = (
+    "MCP", "stateless", "request", "dispatcher", "provider", "protocol", "tool",
+    "response", "schema", "adapter", "boundary", "pure", "core", "shell",
+)
+
+PROFILE_ENV = "MCP_SIMULATE"
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_MP3_HEADER = b"ID3\x04\x00\x00\x00\x00\x00\x00"
+
+
+@dataclass(frozen=True)
+class SimulationProfile:
+    """
+    Upstream behaviour of one simulated provider.
+
+    Attributes:
+        latency_p50: median latency in seconds (time to first token when streaming)
+        latency_sigma: lognormal shape; p99 is about p50 * exp(2.33 * sigma)
+        error_rate: fraction of calls that fail
+        hang_rate: fraction of calls that hang for hang_s, then time out
+        hang_s: how long a hanging call blocks
+        text_tokens: (min, max) tokens per text completion
+        image_bytes: (min, max) size of an encoded image
+        audio_bytes: (min, max) size of an MP3 answer
+        chunk_bytes: audio stream chunk size
+        stream_interval: mean seconds between streamed tokens / chunks
+        time_scale: multiplies every delay (0 runs without sleeping)
+        seed: RNG seed; draws repeat exactly for single-threaded callers
+    """
+
+    latency_p50: float = 0.8
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    hang_rate: float = 0.0
+    hang_s: float = 30.0
+    text_tokens: Tuple[int, int] = (50, 400)
+    image_bytes: Tuple[int, int] = (200_000, 1_500_000)
+    audio_bytes: Tuple[int, int] = (50_000, 400_000)
+    chunk_bytes: int = 16 * 1024
+    stream_interval: float = 0.02
+    time_scale: float = 1.0
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.latency_p50 <= 0 or self.latency_sigma < 0:
+            raise ValueError("latency_p50 must be > 0 and latency_sigma >= 0")
+        if not (0.0 <= self.error_rate <= 1.0 and 0.0 <= self.hang_rate <= 1.0):
+            raise ValueError("error_rate and hang_rate must be within [0, 1]")
+        if self.error_rate + self.hang_rate > 1.0:
+            raise ValueError("error_rate + hang_rate must not exceed 1")
+        for name in ("text_tokens", "image_bytes", "audio_bytes"):
+            low, high = getattr(self, name)
+            if not 0 < low <= high:
+                raise ValueError(f"{name} must be (min, max) with 0 < min <= max")
+        if self.chunk_bytes < 1 or self.stream_interval < 0 or self.time_scale < 0 or self.hang_s < 0:
+            raise ValueError("chunk_bytes must be >= 1; intervals and time_scale must be >= 0")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> SimulationProfile:
+        known = {field.name for field in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown simulation profile keys: {sorted(unknown)}")
+        return cls(**{key: tuple(value) if isinstance(value, list) else value for key, value in data.items()})
+
+
+def load_profiles(path: str) -> Dict[str, SimulationProfile]:
+    """
+    Read profiles from JSON: one flat profile for every AI type, and/or
+    per-type overrides under "text", "image" and "audio".
+
+        {"latency_p50": 0.5, "audio": {"latency_p50": 2.0}}
+    """
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError("Simulation profile file must hold a JSON object")
+
+    shared = {key: value for key, value in data.items() if key not in ("text", "image", "audio")}
+    return {
+        ai_type: SimulationProfile.from_dict({**shared, **data.get(ai_type, {})})
+        for ai_type in ("text", "image", "audio")
+    }
+
+
+def profiles_from_env() -> Optional[Dict[str, SimulationProfile]]:
+    """
+    Profiles selected by $MCP_SIMULATE: unset/empty/"0" -> None (real
+    providers), "1" -> defaults, anything else -> a JSON profile path.
+    """
+    value = os.environ.get(PROFILE_ENV, "")
+    if value in ("", "0"):
+        return None
+    if value == "1":
+        return {ai_type: SimulationProfile() for ai_type in ("text", "image", "audio")}
+    return load_profiles(value)
+
+
+# -------------------------------------------------
+# Simulators
+# -------------------------------------------------
+
+class _Simulator:
+    """
+    Draws latencies, outcomes and sizes from a profile.
+    """
+
+    def __init__(self, profile: Optional[SimulationProfile] = None, **kwargs: Any) -> None:
+        # kwargs accepted (and ignored) like the real clients' model options
+        self.profile = profile or SimulationProfile()
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+
+    def _plan(self) -> Tuple[float, Optional[str]]:
+        """(delay, failure) for one call; failure is None, "error" or "hang"."""
+        profile = self.profile
+        with self._lock:
+            latency = self._rng.lognormvariate(math.log(profile.latency_p50), profile.latency_sigma)
+            roll = self._rng.random()
+        if roll < profile.hang_rate:
+            return profile.hang_s * profile.time_scale, "hang"
+        if roll < profile.hang_rate + profile.error_rate:
+            return latency * profile.time_scale, "error"
+        return latency * profile.time_scale, None
+
+    def _size(self, bounds: Tuple[int, int]) -> int:
+        with self._lock:
+            return self._rng.randint(*bounds)
+
+    def _gap(self) -> float:
+        # exponential gaps: tokens arrive as a Poisson process
+        interval = self.profile.stream_interval * self.profile.time_scale
+        if interval <= 0:
+            return 0.0
+        with self._lock:
+            return self._rng.expovariate(1.0 / interval)
+
+    @staticmethod
+    def _fail(failure: Optional[str]) -> None:
+        if failure == "hang":
+            raise TimeoutError("Simulated upstream timeout")
+        if failure == "error":
+            raise RuntimeError("Simulated upstream error: HTTP 503")
+
+    def _run(self) -> None:
+        delay, failure = self._plan()
+        _sleep(delay)
+        self._fail(failure)
+
+    async def _arun(self) -> None:
+        delay, failure = self._plan()
+        await _asleep(delay)
+        self._fail(failure)
+
+
+class SimulatedTextClient(_Simulator):
+    """
+    Stand-in for PollinationsTextClient.
+    """
+
+    provider = "simulated"
+
+    def generate(self, prompt: str, *, stream: bool = False, **kwargs: Any) -> str | List[str]:
+        _check_prompt(prompt)
+        if stream:
+            return list(self.stream(prompt))
+        self._run()
+        return "".join(_tokens(self._size(self.profile.text_tokens)))
+
+    async def agenerate(self, prompt: str, *, stream: bool = False, **kwargs: Any) -> str | List[str]:
+        _check_prompt(prompt)
+        if stream:
+            return [token async for token in self.astream(prompt)]
+        await self._arun()
+        return "".join(_tokens(self._size(self.profile.text_tokens)))
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        _check_prompt(prompt)
+        delay, failure, count, fail_at = self._stream_plan()
+
+        _sleep(delay)
+        for index, token in enumerate(_tokens(count), 1):
+            if index == fail_at:
+                self._fail(failure)
+            yield token
+            _sleep(self._gap())
+
+    async def astream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        _check_prompt(prompt)
+        delay, failure, count, fail_at = self._stream_plan()
+
+        await _asleep(delay)
+        for index, token in enumerate(_tokens(count), 1):
+            if index == fail_at:
+                self._fail(failure)
+            yield token
+            await _asleep(self._gap())
+
+    def _stream_plan(self) -> Tuple[float, Optional[str], int, int]:
+        delay, failure = self._plan()
+        count = self._size(self.profile.text_tokens)
+        # a hang never yields; an error breaks off part way through
+        if failure == "hang":
+            fail_at = 1
+        elif failure == "error":
+            fail_at = self._size((1, count))
+        else:
+            fail_at = 0
+        return delay, failure, count, fail_at
+
+
+class SimulatedImageClient(_Simulator):
+    """
+    Stand-in for PollinationsImageClient.
+
+    Returns PNG-signed bytes of the drawn size, or the file path when
+    asked to save.
+    """
+
+    provider = "simulated_image"
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        save_to_file: bool = False,
+        file_path: str | None = None,
+        **kwargs: Any,
+    ) -> bytes | str:
+        _check_prompt(prompt)
+        self._run()
+        return self._finish(save_to_file, file_path)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        save_to_file: bool = False,
+        file_path: str | None = None,
+        **kwargs: Any,
+    ) -> bytes | str:
+        _check_prompt(prompt)
+        await self._arun()
+        return self._finish(save_to_file, file_path)
+
+    def _finish(self, save_to_file: bool, file_path: str | None) -> bytes | str:
+        size = self._size(self.profile.image_bytes)
+        image = _PNG_SIGNATURE + bytes(max(0, size - len(_PNG_SIGNATURE)))
+        if not save_to_file:
+            return image
+        if file_path:
+            Path(file_path).write_bytes(image)
+            return str(file_path)
+
+        # unique temp file, like the real client; never the working tree
+        fd, path = tempfile.mkstemp(suffix=".png")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(image)
+        return path
+
+
+class SimulatedAudioClient(_Simulator):
+    """
+    Stand-in for PollinationsAudioClient.
+    """
+
+    provider = "simulated_audio"
+
+    def stream_audio(
+        self,
+        prompt: str,
+        output_file: str | Path | None = None,
+        **kwargs: Any,
+    ) -> Iterator[bytes]:
+        _check_prompt(prompt)
+        delay, failure = self._plan()
+        _sleep(delay)
+        self._fail(failure)
+
+        chunks = self._chunks()
+        if output_file is None:
+            for chunk in chunks:
+                yield chunk
+                _sleep(self._gap())
+            return
+
+        with open(output_file, "wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                yield chunk
+                _sleep(self._gap())
+
+    def generate_audio(self, prompt: str, output_file: str | Path, **kwargs: Any) -> str:
+        for _ in self.stream_audio(prompt, output_file):
+            pass
+        return str(output_file)
+
+    async def agenerate_audio(self, prompt: str, output_file: str | Path, **kwargs: Any) -> str:
+        return await asyncio.to_thread(self.generate_audio, prompt, output_file, **kwargs)
+
+    def _chunks(self) -> Iterator[bytes]:
+        size = self._size(self.profile.audio_bytes)
+        chunk_bytes = self.profile.chunk_bytes
+        sent = 0
+        while sent < size:
+            length = min(chunk_bytes, size - sent)
+            yield (_MP3_HEADER + bytes(length))[:length] if sent == 0 else bytes(length)
+            sent += length
+
+
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+
+def _check_prompt(prompt: str) -> None:
+    if not prompt or not isinstance(prompt, str):
+        raise ValueError("prompt must be a non-empty string")
+
+
+def _tokens(count: int) -> Iterator[str]:
+    return (word + " " for word in itertools.islice(itertools.cycle(_WORDS), count))
+
+
+def _sleep(seconds: float) -> None:
+    # async callers are cut off by cancellation; sync ones check here
+    left = deadline.remaining()
+    if left is not None and left < seconds:
+        time.sleep(left)
+        raise TimeoutError("Simulated upstream call cut off by the request deadline")
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+async def _asleep(seconds: float) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds)
@@ -0,0 +1,56 @@
+# mcp_sdk/providers/wrapper.py
+
+"""
+Base class for executor decorators (caching, hedging, ...).
+
+A wrapper exposes exactly the methods of the executor it wraps, so
+capability probing with hasattr() keeps working. Execution methods
+are routed through _call / _acall; everything else is delegated.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Callable
+
+
+SYNC_METHODS = frozenset({"generate", "generate_audio", "transcribe"})
+ASYNC_METHODS = {
+    "agenerate": "generate",
+    "agenerate_audio": "generate_audio",
+    "atranscribe": "transcribe",
+}
+
+
+class ExecutorWrapper:
+    """
+    Transparent executor decorator.
+
+    Subclasses override _call (sync methods) and/or _acall (async
+    methods). `method` is always the sync method name, so both paths
+    can share keys and policies.
+    """
+
+    def __init__(self, inner: Any) -> None:
+        self._inner = inner
+
+    @property
+    def inner(self) -> Any:
+        return self._inner
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_inner":
+            raise AttributeError(name)
+
+        attr = getattr(self._inner, name)
+        if name in SYNC_METHODS:
+            return functools.partial(self._call, name, attr)
+        if name in ASYNC_METHODS:
+            return functools.partial(self._acall, ASYNC_METHODS[name], attr)
+        return attr
+
+    def _call(self, method: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+    async def _acall(self, method: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await fn(*args, **kwargs)
@@ -25,6 +25,7 @@ setup(
             "mcp-cli=mcp_sdk.shell.cli:main",
             "mcp-http=mcp_sdk.shell.http:main",
             "mcp-stdio=mcp_sdk.shell.stdio:main",
+            "mcp-loadgen=mcp_sdk.shell.loadgen:main",
         ],
     },
 )
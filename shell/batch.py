@@ -0,0 +1,65 @@
+# mcp_sdk/shell/batch.py
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence
+
+from core.dispatcher import Dispatcher
+from protocol.request import MCPRequest
+from protocol.response import MCPResponse
+from protocol.errors import MCPError, MCPErrorCode
+
+
+MAX_BATCH_SIZE = 1000
+
+
+def dispatch_payloads(
+    dispatcher: Dispatcher,
+    payloads: Sequence[Any],
+    *,
+    max_concurrency: Optional[int] = None,
+) -> List[MCPResponse]:
+    """
+    Parse and dispatch a batch of raw request payloads.
+
+    Shared by the HTTP and STDIO shells.
+
+    - responses are returned in input order
+    - an item that fails to parse gets its own error response
+    - responses carry the item's `meta.id` when present
+    """
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise MCPError(
+            code=MCPErrorCode.SCHEMA_VIOLATION,
+            message="Batch too large",
+            details={"max_items": MAX_BATCH_SIZE},
+        )
+
+    responses: List[Optional[MCPResponse]] = [None] * len(payloads)
+    request_ids: List[Any] = [None] * len(payloads)
+    requests: List[MCPRequest] = []
+    positions: List[int] = []
+
+    for index, payload in enumerate(payloads):
+        if isinstance(payload, dict) and isinstance(payload.get("meta"), dict):
+            request_ids[index] = payload["meta"].get("id")
+
+        try:
+            requests.append(MCPRequest.from_dict(payload))
+            positions.append(index)
+        except Exception as exc:
+            invalid = MCPError(
+                code=MCPErrorCode.INVALID_REQUEST,
+                message="Invalid batch item",
+                details={"index": index, "error": str(exc)},
+            )
+            responses[index] = MCPResponse.error_response(error=invalid.to_dict())
+
+    dispatched = dispatcher.dispatch_batch(requests, max_concurrency=max_concurrency)
+    for index, response in zip(positions, dispatched):
+        responses[index] = response
+
+    return [
+        response.with_meta(id=request_id) if request_id is not None else response
+        for response, request_id in zip(responses, request_ids)
+    ]
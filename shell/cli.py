@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import os
 import sys
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from protocol.request import MCPRequest
-from protocol.response import MCPResponse
-from protocol.errors import MCPError, MCPErrorCode
+if TYPE_CHECKING:
+    from core.dispatcher import Dispatcher
 
-from utils.json import loads as json_loads, dumps as json_dumps
-from shell.composition import build_dispatcher
+# Only stdlib is imported at module level: forwarding a request to a warm
+# daemon (shell.daemon) must cost no more than interpreter start-up.
+# Protocol, core and providers are imported when running in-process.
+
+
+# input fields holding file paths, resolved against the caller's cwd
+PATH_FIELDS = ("file_path", "output_file")
 
 
 # -------------------------------------------------
@@ -16,7 +21,14 @@ from shell.composition import build_dispatcher
 # -------------------------------------------------
 
 def read_stdin() -> Dict[str, Any]:
-    raw = sys.stdin.read().strip()
+    return parse_payload(sys.stdin.buffer.read())
+
+
+def parse_payload(raw: bytes) -> Dict[str, Any]:
+    from protocol.errors import MCPError, MCPErrorCode
+    from utils.json import loads_bytes as json_loads_bytes
+
+    raw = raw.strip()
     if not raw:
         raise MCPError(
             code=MCPErrorCode.SCHEMA_VIOLATION,
@@ -24,7 +36,7 @@ def read_stdin() -> Dict[str, Any]:
         )
 
     try:
-        return json_loads(raw)
+        return json_loads_bytes(raw)
     except Exception as exc:
         raise MCPError(
             code=MCPErrorCode.SCHEMA_VIOLATION,
@@ -33,10 +45,14 @@ def read_stdin() -> Dict[str, Any]:
         )
 
 
-def write_stdout(obj: Any) -> None:
-    """Tulis output ke stdout menggunakan utils.json.dumps"""
+def serialize(obj: Any) -> bytes:
+    """Serialisasi output menggunakan utils.json.dumps_bytes"""
+    from protocol.errors import MCPError, MCPErrorCode
+    from protocol.response import MCPResponse
+    from utils.json import dumps_bytes as json_dumps_bytes
+
     try:
-        sys.stdout.write(json_dumps(obj))
+        return json_dumps_bytes(obj)
     except Exception as exc:
         # fallback fatal error jika json_dumps gagal
         fatal = MCPError(
@@ -44,33 +60,119 @@ def write_stdout(obj: Any) -> None:
             message="Failed to serialize output JSON",
             details={"error": str(exc)},
         )
-        sys.stdout.write(json_dumps(MCPResponse.error_response(error=fatal.to_dict()).to_dict()))
+        return json_dumps_bytes(MCPResponse.error_response(error=fatal.to_dict()).to_dict())
+
+
+def write_stdout(obj: Any) -> None:
+    """Tulis output ke stdout menggunakan utils.json.dumps_bytes"""
+    sys.stdout.buffer.write(serialize(obj))
 
 
 # -------------------------------------------------
-# Entry point
+# Request handling
 # -------------------------------------------------
 
-def main() -> None:
+def handle_payload(raw: bytes, dispatcher: Optional[Dispatcher] = None) -> bytes:
+    """
+    Run one raw CLI payload and return the serialized MCPResponse.
+
+    Used in-process and by the daemon (which passes its warm dispatcher).
+    """
+    from protocol.errors import MCPError
+    from protocol.response import MCPResponse
+
     try:
-        payload = read_stdin()
-        request = MCPRequest.from_dict(payload)
+        payload = parse_payload(raw)
+
+        if dispatcher is None:
+            from shell.composition import build_dispatcher
 
-        dispatcher = build_dispatcher()
-        response: MCPResponse = dispatcher.dispatch(request)
+            dispatcher = build_dispatcher()
 
-        write_stdout(response.to_dict())
+        return dispatcher.dispatch_payload(payload, render=lambda response: serialize(response.to_dict()))
 
     except MCPError as err:
-        write_stdout(MCPResponse.error_response(error=err.to_dict()).to_dict())
+        return serialize(MCPResponse.error_response(error=err.to_dict()).to_dict())
 
     except Exception as exc:
-        fatal = MCPError(
-            code=MCPErrorCode.INTERNAL_ERROR,
-            message="Fatal CLI error",
-            details={"error": str(exc)},
-        )
-        write_stdout(MCPResponse.error_response(error=fatal.to_dict()).to_dict())
+        return serialize(_fatal_response("Fatal CLI error", exc))
+
+
+def absolute_paths(raw: bytes) -> bytes:
+    """
+    Make relative input paths absolute before the payload is forwarded:
+    the daemon runs in its own working directory, not the caller's.
+    """
+    if not any(field.encode() in raw for field in PATH_FIELDS):
+        return raw
+
+    import json
+
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        # left as is; the daemon reports the parse error
+        return raw
+
+    fields = payload.get("input") if isinstance(payload, dict) else None
+    if not isinstance(fields, dict):
+        return raw
+
+    changed = False
+    for field in PATH_FIELDS:
+        value = fields.get(field)
+        if isinstance(value, str) and value and not os.path.isabs(value):
+            fields[field] = os.path.abspath(value)
+            changed = True
+    return json.dumps(payload).encode() if changed else raw
+
+
+def _fatal_response(message: str, exc: Exception) -> Dict[str, Any]:
+    from protocol.errors import MCPError, MCPErrorCode
+    from protocol.response import MCPResponse
+
+    fatal = MCPError(
+        code=MCPErrorCode.INTERNAL_ERROR,
+        message=message,
+        details={"error": str(exc)},
+    )
+    return MCPResponse.error_response(error=fatal.to_dict()).to_dict()
+
+
+# -------------------------------------------------
+# Entry point
+# -------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    mcp-cli              run one request from stdin (via the daemon if up)
+    mcp-cli daemon ...   keep a warm dispatcher on a Unix socket
+
+    Set MCP_NO_DAEMON=1 to always run in-process.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] == "daemon":
+        from shell.daemon import main as daemon_main
+
+        daemon_main(argv[1:])
+        return
+
+    raw = sys.stdin.buffer.read()
+
+    if not os.environ.get("MCP_NO_DAEMON"):
+        from shell.daemon import forward
+
+        try:
+            output = forward(absolute_paths(raw))
+        except OSError as exc:
+            write_stdout(_fatal_response("Daemon connection failed", exc))
+            return
+        if output is not None:
+            sys.stdout.buffer.write(output)
+            return
+
+    sys.stdout.buffer.write(handle_payload(raw))
 
 
 if __name__ == "__main__":
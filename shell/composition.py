@@ -2,18 +2,81 @@
 
 from __future__ import annotations
 
+import sys
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from core.bulkhead import Bulkhead
+from core.cache import ResultCache
 from core.dispatcher import Dispatcher
+from core.metrics import Metrics
+from core.middleware import Middleware
+from core.ratelimit import RateLimiter
+from core.singleflight import SingleFlight
 from core.tools import get_tools
 
-# providers (external world adapters)
-from providers.pollinations import (
-    PollinationsTextClient,
-    PollinationsImageClient,
-    PollinationsAudioClient,
-)
+# providers (external world adapters); vendor SDKs load on first use
+from providers.cache import CachePolicy, CachedExecutor, DiskCache
+from providers.hedging import HedgedExecutor, HedgePolicy
+from providers.registry import ExecutorFactory, ExecutorRegistry, lazy_factory
+from providers.simulated import SimulationProfile, profiles_from_env
+
+
+# executor key -> AI task type it serves
+PROVIDER_TYPES = {
+    "pollinations": "text",
+    "pollinations_image": "image",
+    "pollinations_audio": "audio",
+}
+
+# executor key -> factory; key must match request.ai.provider
+PROVIDER_FACTORIES: Mapping[str, ExecutorFactory] = {
+    "pollinations": lazy_factory("providers.pollinations.text", "PollinationsTextClient"),
+    "pollinations_image": lazy_factory("providers.pollinations.image", "PollinationsImageClient"),
+    "pollinations_audio": lazy_factory("providers.pollinations.audio", "PollinationsAudioClient"),
+}
+
+# AI task type -> simulated stand-in (providers.simulated)
+_SIMULATED_CLASSES = {
+    "text": "SimulatedTextClient",
+    "image": "SimulatedImageClient",
+    "audio": "SimulatedAudioClient",
+}
+
+
+def simulated_factories(
+    profiles: Optional[Mapping[str, SimulationProfile]] = None,
+) -> Dict[str, ExecutorFactory]:
+    """
+    Factories replacing every real provider with a simulated executor.
+
+    Keys stay the same, so requests need no change. `profiles` maps an
+    AI task type ("text", "image", "audio") to its profile; missing
+    types use SimulationProfile() defaults.
+    """
+    profiles = profiles or {}
+    return {
+        key: lazy_factory(
+            "providers.simulated",
+            _SIMULATED_CLASSES[ai_type],
+            profile=profiles.get(ai_type, SimulationProfile()),
+        )
+        for key, ai_type in PROVIDER_TYPES.items()
+    }
 
 
-def build_dispatcher() -> Dispatcher:
+def build_dispatcher(
+    tool_cache: Optional[ResultCache] = None,
+    ai_cache: Optional[DiskCache] = None,
+    ai_cache_policies: Optional[Dict[str, CachePolicy]] = None,
+    singleflight: Optional[SingleFlight] = None,
+    metrics: Optional[Metrics] = None,
+    enable_metrics: bool = True,
+    middleware: Sequence[Middleware] = (),
+    providers: Optional[Mapping[str, ExecutorFactory]] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    bulkhead: Optional[Bulkhead] = None,
+    hedge_policies: Optional[Dict[str, HedgePolicy]] = None,
+) -> Dispatcher:
     """
     Composition root for MCP SDK.
 
@@ -21,18 +84,117 @@ def build_dispatcher() -> Dispatcher:
     - This is the ONLY place where providers are instantiated
     - Core must not import providers
     - Shells (CLI / HTTP / STDIO) must call this function
+    - Providers are registered lazily: a provider's SDK is imported and
+      its client created on the first request that uses it
+
+    Args:
+        tool_cache: Optional opt-in cache for deterministic tool results
+        ai_cache: Optional persistent cache for AI generations
+        ai_cache_policies: Per-provider caching policy (executor key -> policy)
+        singleflight: Optional coalescing of concurrent identical AI requests
+        metrics: Metrics registry to record into (a new one by default)
+        enable_metrics: Set False to run without any instrumentation
+        middleware: Ordered request middleware (caching, tracing, auditing, ...)
+        providers: Executor factories by provider key (default: the real
+            providers, or simulated ones when MCP_SIMULATE is set)
+        rate_limiter: Optional per-provider / per-client admission control
+        bulkhead: Optional in-flight caps per provider and per tool
+        hedge_policies: Providers to hedge and retry (executor key -> policy)
     """
 
     tools = get_tools()
 
-    ai_executors = {
-        # key must match request.ai.provider
-        "pollinations": PollinationsTextClient(),
-        "pollinations_image": PollinationsImageClient(),
-        "pollinations_audio": PollinationsAudioClient(),
-    }
+    if providers is None:
+        profiles = profiles_from_env()
+        providers = PROVIDER_FACTORIES if profiles is None else simulated_factories(profiles)
+
+    factories: Dict[str, ExecutorFactory] = dict(providers)
+
+    # hedging sits inside the AI cache, so cache hits never hedge
+    hedgers: Dict[str, HedgedExecutor] = {}
+    for key, policy in (hedge_policies or {}).items():
+        if key in factories:
+            factories[key] = _hedged_factory(factories[key], key, policy, hedgers)
+
+    if ai_cache is not None:
+        policies = ai_cache_policies or {}
+        for key, factory in list(factories.items()):
+            policy = policies.get(key, CachePolicy())
+            # the cache keys entries by AI type; only known providers have one
+            if policy.enabled and key in PROVIDER_TYPES:
+                factories[key] = _cached_factory(factory, ai_cache, key, policy)
+
+    if enable_metrics:
+        metrics = metrics or Metrics()
+        if tool_cache is not None:
+            metrics.register_collector("tool_cache", tool_cache.stats)
+        if ai_cache is not None:
+            metrics.register_collector("ai_cache", ai_cache.stats)
+        if singleflight is not None:
+            metrics.register_collector("singleflight", singleflight.stats)
+        if rate_limiter is not None:
+            metrics.register_collector("rate_limiter", rate_limiter.stats)
+        if bulkhead is not None:
+            metrics.register_collector("bulkhead", bulkhead.stats)
+        if hedge_policies:
+            metrics.register_collector("hedging", lambda: _hedging_stats(hedgers))
+        metrics.register_collector("upstream_pool", _pool_stats)
+    else:
+        metrics = None
 
     return Dispatcher(
         tools=tools,
-        ai_executors=ai_executors,
+        ai_executors=ExecutorRegistry(factories),
+        cache=tool_cache,
+        singleflight=singleflight,
+        metrics=metrics,
+        middleware=middleware,
+        rate_limiter=rate_limiter,
+        bulkhead=bulkhead,
     )
+
+
+def _pool_stats() -> Dict[str, Any]:
+    # report the provider connection pool only once a provider loaded it
+    pool = sys.modules.get("providers.pool")
+    return pool.get_pool().stats() if pool is not None else {}
+
+
+def _hedging_stats(hedgers: Mapping[str, HedgedExecutor]) -> Dict[str, Any]:
+    # one flat namespace: <executor key>_<stat>, for executors built so far
+    return {
+        f"{key}_{name}": value
+        for key, hedger in list(hedgers.items())
+        for name, value in hedger.stats().items()
+    }
+
+
+def _hedged_factory(
+    factory: ExecutorFactory,
+    key: str,
+    policy: HedgePolicy,
+    hedgers: Dict[str, HedgedExecutor],
+) -> ExecutorFactory:
+    def _build() -> HedgedExecutor:
+        hedger = hedgers[key] = HedgedExecutor(factory(), policy)
+        return hedger
+
+    return _build
+
+
+def _cached_factory(
+    factory: ExecutorFactory,
+    cache: DiskCache,
+    key: str,
+    policy: CachePolicy,
+) -> ExecutorFactory:
+    def _build() -> CachedExecutor:
+        return CachedExecutor(
+            factory(),
+            cache,
+            provider=key,
+            ai_type=PROVIDER_TYPES[key],
+            policy=policy,
+        )
+
+    return _build
@@ -0,0 +1,235 @@
+# mcp_sdk/shell/daemon.py
+
+"""
+Warm CLI daemon over a Unix domain socket.
+
+`mcp-cli daemon` builds the dispatcher once and serves CLI payloads on
+a Unix socket. Plain `mcp-cli` calls forward stdin to it and print the
+reply, so each call pays interpreter start-up only; when no daemon is
+listening they run in-process as before.
+
+Wire format (one request per connection):
+- client sends the raw JSON payload, then shuts down its write side
+- daemon replies with the serialized MCPResponse and closes
+
+Socket path: $MCP_DAEMON_SOCKET, else mcp-sdk-<uid>.sock in
+$XDG_RUNTIME_DIR (or the temp dir). The socket is private to its user.
+The client only talks to a socket owned by its own uid (mode 0600, in
+a directory other users cannot swap it in) and, where the platform
+reports it, served by a process of that uid; anything else could
+receive the user's prompts, so the request runs in-process instead.
+A daemon that does not accept within CONNECT_TIMEOUT or answer within
+READ_TIMEOUT is treated as wedged and the request runs in-process too.
+
+Only stdlib is imported at module level; see shell/cli.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from core.dispatcher import Dispatcher
+
+
+SOCKET_ENV = "MCP_DAEMON_SOCKET"
+RECV_SIZE = 64 * 1024
+CONNECT_TIMEOUT = 1.0
+# well above the upstream HTTP timeout (providers.pool.DEFAULT_TIMEOUT),
+# so only a wedged daemon runs into it
+READ_TIMEOUT = 120.0
+
+
+def socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(base, f"mcp-sdk-{os.getuid()}.sock")
+
+
+# -------------------------------------------------
+# Client
+# -------------------------------------------------
+
+def forward(
+    raw: bytes,
+    path: Optional[str] = None,
+    connect_timeout: float = CONNECT_TIMEOUT,
+    timeout: float = READ_TIMEOUT,
+) -> Optional[bytes]:
+    """
+    Send one payload to the daemon and return its reply.
+
+    Returns None when no trusted daemon is listening, or it does not
+    accept within `connect_timeout` or go quiet for `timeout` seconds,
+    so the caller can run the request in-process. Other errors after
+    the connection is up are raised: the daemon may already be
+    executing the request.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    path = path or socket_path()
+    if not _trusted_socket(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(connect_timeout)
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+        if _peer_uid(sock) not in (None, os.getuid()):
+            return None
+
+        sock.settimeout(timeout)
+        chunks: List[bytes] = []
+        try:
+            sock.sendall(raw)
+            sock.shutdown(socket.SHUT_WR)
+            while True:
+                chunk = sock.recv(RECV_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except socket.timeout:
+            # wedged daemon: better to run it again here than to hang
+            return None
+        return b"".join(chunks)
+    finally:
+        sock.close()
+
+
+def _trusted_socket(path: str) -> bool:
+    """
+    True if path is a socket private to this user, in a directory where
+    no other user can replace it.
+    """
+    try:
+        info = os.lstat(path)
+        parent = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+
+    uid = os.getuid()
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != uid or info.st_mode & 0o077:
+        return False
+    if parent.st_uid not in (uid, 0):
+        return False
+    # a shared directory (e.g. /tmp) is safe only with the sticky bit
+    return not parent.st_mode & 0o022 or bool(parent.st_mode & stat.S_ISVTX)
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    """uid of the process serving sock, or None if the platform does not say."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+# -------------------------------------------------
+# Server
+# -------------------------------------------------
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        from shell.cli import handle_payload
+
+        # the client shuts down its write side after the payload
+        raw = self.rfile.read()
+        try:
+            self.wfile.write(handle_payload(raw, self.server.dispatcher))
+        except (BrokenPipeError, ConnectionResetError):
+            # client went away (e.g. a liveness probe); nothing to answer
+            pass
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Threaded Unix socket server holding one warm Dispatcher.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, dispatcher: Dispatcher) -> None:
+        self.dispatcher = dispatcher
+        self.path = path
+        _remove_stale_socket(path)
+
+        # create the socket file owner-only from the start
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _DaemonHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    if not os.path.exists(path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # left over from a daemon that did not shut down cleanly
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+
+    raise RuntimeError(f"A daemon is already listening on {path}")
+
+
+def serve(path: Optional[str] = None, dispatcher: Optional[Dispatcher] = None) -> None:
+    """
+    Serve CLI payloads until SIGINT/SIGTERM, then remove the socket.
+    """
+    if dispatcher is None:
+        from shell.composition import build_dispatcher
+
+        dispatcher = build_dispatcher()
+
+    server = DaemonServer(path or socket_path(), dispatcher)
+
+    def _stop(*_: object) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="mcp-cli daemon", description="Warm MCP CLI daemon")
+    parser.add_argument("--socket", default=None,
+                        help=f"Unix socket path (default: ${SOCKET_ENV} or {socket_path()})")
+    args = parser.parse_args(argv)
+
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import argparse
+import itertools
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from protocol.request import MCPRequest
 from protocol.response import MCPResponse
 from protocol.errors import MCPError, MCPErrorCode
 
+from shell.batch import dispatch_payloads
 from shell.composition import build_dispatcher
-from utils.json import dumps as json_dumps
+from utils.json import loads_array as json_loads_array, loads_bytes as json_loads_bytes, dumps_bytes as json_dumps_bytes
+
+
+DEFAULT_WORKERS = 16
+DEFAULT_BACKLOG = 128
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+# how often a blocked accept loop checks for shutdown()
+SLOT_POLL_INTERVAL = 0.5
 
 
 # -------------------------------------------------
@@ -19,14 +32,89 @@ class MCPHandler(BaseHTTPRequestHandler):
     """
     Minimal HTTP handler for MCP protocol.
 
-    Endpoint:
-    POST /mcp
+    Endpoints:
+    POST /mcp         single request object
+    POST /mcp/batch   JSON array of request objects
+    GET  /metrics     dispatcher metrics, Prometheus text format
+
+    Text requests with input.stream = true are answered with chunked
+    frames as tokens arrive: Server-Sent Events when the client sends
+    `Accept: text/event-stream`, NDJSON otherwise.
+
+    Audio generation with input.stream = true is sent as raw chunked
+    `audio/mpeg` when the client accepts `audio/*`; each upstream chunk
+    is forwarded as it arrives.
+
+    Image responses holding encoded bytes (input.image_format) are sent
+    as the raw image when the client accepts `image/*`, or as
+    `multipart/mixed` (MCPResponse JSON part + image part) when asked;
+    otherwise the bytes are base64 inside the JSON response.
+
+    Speaks HTTP/1.1, so clients may reuse one connection for many
+    requests. Idle connections are closed after the server's
+    keep-alive timeout; a server that limits kept-alive connections
+    (PooledHTTPServer) answers the ones over its limit with
+    `Connection: close`.
     """
 
+    protocol_version = "HTTP/1.1"
+    timeout = DEFAULT_KEEPALIVE_TIMEOUT
+    # headers and body are separate writes; with Nagle on, a keep-alive
+    # client's delayed ACK stalls every response by ~40 ms
+    disable_nagle_algorithm = True
+
     dispatcher = build_dispatcher()
 
+    def setup(self) -> None:
+        self.timeout = getattr(self.server, "keepalive_timeout", self.timeout)
+        self._keepalive_held = False
+        super().setup()
+
+    def finish(self) -> None:
+        try:
+            super().finish()
+        finally:
+            if self._keepalive_held:
+                self.server.release_keepalive()
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        super().send_response(code, message)
+        if self.close_connection or self._keepalive_held:
+            return
+        # over the server's keep-alive limit: close after this response
+        acquire = getattr(self.server, "acquire_keepalive", None)
+        if acquire is not None and not acquire():
+            self.close_connection = True
+        else:
+            self._keepalive_held = acquire is not None
+
+    def do_GET(self) -> None:
+        metrics = self.dispatcher.metrics
+        if self.path != "/metrics" or metrics is None:
+            self._send_error(
+                MCPError(
+                    code=MCPErrorCode.TOOL_NOT_FOUND,
+                    message="Endpoint not found",
+                )
+            )
+            return
+
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_POST(self) -> None:
+        if self.path == "/mcp/batch":
+            self._handle_batch()
+            return
+
         if self.path != "/mcp":
+            self._discard_body()
             self._send_error(
                 MCPError(
                     code=MCPErrorCode.TOOL_NOT_FOUND,
@@ -35,13 +123,22 @@ class MCPHandler(BaseHTTPRequestHandler):
             )
             return
 
+        frames: Optional[Iterator[MCPResponse]] = None
+        audio = False
+
         try:
             payload = self._read_json_body()
-            request = MCPRequest.from_dict(payload)
-            response = self.dispatcher.dispatch(request)
+            body = payload.get("input") if isinstance(payload, dict) else None
+            if isinstance(body, dict) and body.get("stream") is True:
+                request = MCPRequest.from_dict(payload)
+                audio = (request.ai or {}).get("type") == "audio"
+                frames = self.dispatcher.dispatch_stream(request)
+            else:
+                # parse and serialize spans are recorded by the dispatcher's middleware
+                rendered = self.dispatcher.dispatch_payload(payload, render=self._render)
 
         except MCPError as err:
-            response = MCPResponse.error_response(error=err.to_dict())
+            rendered = self._render(MCPResponse.error_response(error=err.to_dict()))
 
         except Exception as exc:
             fatal = MCPError(
@@ -49,33 +146,67 @@ class MCPHandler(BaseHTTPRequestHandler):
                 message="Fatal HTTP error",
                 details={"error": str(exc)},
             )
-            response = MCPResponse.error_response(error=fatal.to_dict())
+            rendered = self._render(MCPResponse.error_response(error=fatal.to_dict()))
 
-        self._send_response(response)
+        if frames is not None:
+            if audio and "audio/" in self.headers.get("Accept", ""):
+                self._send_audio_stream(frames)
+            else:
+                self._send_stream(frames)
+            return
+
+        self._send_body(*rendered)
+
+    def _handle_batch(self) -> None:
+        try:
+            payloads = self._read_json_array_body()
+            responses = dispatch_payloads(self.dispatcher, payloads)
+
+        except MCPError as err:
+            self._send_error(err)
+            return
+
+        except Exception as exc:
+            self._send_error(
+                MCPError(
+                    code=MCPErrorCode.INTERNAL_ERROR,
+                    message="Fatal HTTP error",
+                    details={"error": str(exc)},
+                )
+            )
+            return
+
+        self._send_json([response.to_dict() for response in responses])
 
     # -------------------------------------------------
     # Internal helpers
     # -------------------------------------------------
 
-    def _read_json_body(self) -> Dict[str, Any]:
+    def _content_length(self) -> int:
         length_header = self.headers.get("Content-Length")
         if not length_header:
+            # body framing unknown: the connection cannot be reused
+            self.close_connection = True
             raise MCPError(
                 code=MCPErrorCode.SCHEMA_VIOLATION,
                 message="Missing Content-Length header",
             )
 
         try:
-            length = int(length_header)
+            return int(length_header)
         except ValueError:
+            self.close_connection = True
             raise MCPError(
                 code=MCPErrorCode.SCHEMA_VIOLATION,
                 message="Invalid Content-Length header",
             )
 
-        raw = self.rfile.read(length).decode("utf-8")
+    def _read_json_body(self) -> Dict[str, Any]:
+        length = self._content_length()
+
+        raw = self.rfile.read(length)
         try:
-            return MCPRequest._json_loads(raw)  # bisa pakai util json nanti
+            return json_loads_bytes(raw)
         except Exception as exc:
             raise MCPError(
                 code=MCPErrorCode.SCHEMA_VIOLATION,
@@ -83,14 +214,165 @@ class MCPHandler(BaseHTTPRequestHandler):
                 details={"error": str(exc)},
             )
 
+    def _read_json_array_body(self) -> List[Any]:
+        length = self._content_length()
+
+        raw = self.rfile.read(length)
+        try:
+            return json_loads_array(raw)
+        except Exception as exc:
+            raise MCPError(
+                code=MCPErrorCode.SCHEMA_VIOLATION,
+                message="Invalid JSON body",
+                details={"error": str(exc)},
+            )
+
+    def _discard_body(self) -> None:
+        """Consume an unused request body so the connection stays in sync."""
+        try:
+            length = self._content_length()
+        except MCPError:
+            return
+        if length > 0:
+            self.rfile.read(length)
+
     def _send_response(self, response: MCPResponse) -> None:
-        body = json_dumps(response.to_dict()).encode("utf-8")
+        self._send_body(*self._render(response))
+
+    def _render(self, response: MCPResponse) -> Tuple[str, List[bytes | bytearray | memoryview]]:
+        """
+        Content type and body parts of a response, chosen by Accept:
+        the raw image, multipart/mixed, or JSON.
+        """
+        image = response.data.get("image") if response.success and response.data else None
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            accept = self.headers.get("Accept", "")
+            if "multipart/mixed" in accept:
+                return self._render_multipart(response, image)
+            if "image/" in accept:
+                # memoryview is written as-is; the encoded buffer is never copied
+                return _sniff_image_type(image), [image]
+        return "application/json", [_json_body(response.to_dict())]
 
+    def _render_multipart(
+        self,
+        response: MCPResponse,
+        image: bytes | bytearray | memoryview,
+    ) -> Tuple[str, List[bytes | bytearray | memoryview]]:
+        """
+        The MCPResponse JSON (image replaced by a descriptor) and the
+        raw image as two parts of one multipart/mixed body.
+        """
+        content_type = _sniff_image_type(image)
+        boundary = uuid.uuid4().hex.encode("ascii")
+
+        envelope = response.to_dict()
+        envelope["data"] = {
+            **envelope["data"],
+            "image": {"content_type": content_type, "size": len(image), "part": 2},
+        }
+
+        head = b"".join((
+            b"--", boundary, b"\r\n",
+            b"Content-Type: application/json\r\n\r\n",
+            json_dumps_bytes(envelope), b"\r\n",
+            b"--", boundary, b"\r\n",
+            b"Content-Type: ", content_type.encode("ascii"), b"\r\n",
+            b"Content-Length: %d\r\n\r\n" % len(image),
+        ))
+        tail = b"\r\n--" + boundary + b"--\r\n"
+        return "multipart/mixed; boundary=" + boundary.decode("ascii"), [head, image, tail]
+
+    def _send_json(self, obj: Any) -> None:
+        self._send_body("application/json", [_json_body(obj)])
+
+    def _send_body(self, content_type: str, parts: List[bytes | bytearray | memoryview]) -> None:
         self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(sum(len(part) for part in parts)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(body)
+        for part in parts:
+            self.wfile.write(part)
+
+    def _send_stream(self, frames: Iterator[MCPResponse]) -> None:
+        """
+        Write frames with chunked transfer encoding, one chunk per frame.
+        """
+        sse = "text/event-stream" in self.headers.get("Accept", "")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if sse else "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+        try:
+            for frame in frames:
+                body = json_dumps_bytes(frame.to_dict())
+                chunk = b"data: " + body + b"\n\n" if sse else body + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            # client went away; stop the upstream stream
+            self.close_connection = True
+        finally:
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
+
+    def _send_audio_stream(self, frames: Iterator[MCPResponse]) -> None:
+        """
+        Forward partial {"chunk": bytes} frames as one chunked audio body.
+
+        Errors before the first chunk are sent as a normal JSON response,
+        and a first frame without audio bytes falls back to _send_stream.
+        A mid-stream error (or a frame without bytes) aborts the body
+        without the terminating chunk, so the client sees a truncated
+        transfer instead of a bad file.
+        """
+        try:
+            first = next(frames, None)
+            if first is None or not first.meta.get("partial"):
+                if first is not None:
+                    self._send_response(first)
+                return
+            if _audio_chunk(first) is None:
+                self._send_stream(itertools.chain([first], frames))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Transfer-Encoding", "chunked")
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+
+            frame: Optional[MCPResponse] = first
+            while frame is not None and frame.meta.get("partial"):
+                chunk = _audio_chunk(frame)
+                if chunk is None:
+                    self.close_connection = True
+                    return
+                self.wfile.write(b"%x\r\n" % len(chunk))
+                self.wfile.write(chunk)
+                self.wfile.write(b"\r\n")
+                frame = next(frames, None)
+
+            if frame is not None and not frame.success:
+                self.close_connection = True
+                return
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            self.close_connection = True
+        finally:
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
 
     def _send_error(self, error: MCPError) -> None:
         response = MCPResponse.error_response(error=error.to_dict())
@@ -101,14 +383,161 @@ class MCPHandler(BaseHTTPRequestHandler):
         return
 
 
+def _json_body(obj: Any) -> bytes:
+    try:
+        return json_dumps_bytes(obj)
+    except Exception as exc:
+        # e.g. a live PIL image: answer with an error, not a dropped connection
+        fatal = MCPError(
+            code=MCPErrorCode.INTERNAL_ERROR,
+            message="Failed to serialize output JSON",
+            details={"error": str(exc)},
+        )
+        return json_dumps_bytes(MCPResponse.error_response(error=fatal.to_dict()).to_dict())
+
+
+def _audio_chunk(frame: MCPResponse) -> Optional[bytes | bytearray | memoryview]:
+    chunk = frame.data.get("chunk") if isinstance(frame.data, dict) else None
+    return chunk if isinstance(chunk, (bytes, bytearray, memoryview)) else None
+
+
+def _sniff_image_type(data: bytes | bytearray | memoryview) -> str:
+    """Content type of encoded image bytes, from their magic number."""
+    head = bytes(data[:12])
+    if head.startswith(b"\x89PNG"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+# -------------------------------------------------
+# Concurrent server
+# -------------------------------------------------
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that serves connections on a fixed pool of worker threads.
+
+    - at most `workers` connections are served at once
+    - while every worker is busy the accept loop waits, so pending
+      connections queue in the kernel listen backlog (`backlog`);
+      shutdown() still stops it, closing the connection it holds
+    - a keep-alive connection holds its worker until it goes idle
+      for `keepalive_timeout` seconds, so at most `workers - 1`
+      connections are kept alive; the rest are closed after their
+      response and one worker always stays free for new connections
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_class: type[BaseHTTPRequestHandler],
+        *,
+        workers: int = DEFAULT_WORKERS,
+        backlog: int = DEFAULT_BACKLOG,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+
+        self.request_queue_size = backlog
+        self.keepalive_timeout = keepalive_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        # one worker is never parked on an idle connection
+        self._keepalive = threading.BoundedSemaphore(workers - 1)
+        self._stopping = threading.Event()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="mcp-http",
+        )
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        while not self._slots.acquire(timeout=SLOT_POLL_INTERVAL):
+            if self._stopping.is_set():
+                self.shutdown_request(request)
+                return
+        try:
+            self._pool.submit(self._process_request_worker, request, client_address)
+        except Exception:
+            self._slots.release()
+            self.shutdown_request(request)
+            raise
+
+    def _process_request_worker(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def acquire_keepalive(self) -> bool:
+        """Claim a keep-alive permit for a connection; False if none is left."""
+        return self._keepalive.acquire(blocking=False)
+
+    def release_keepalive(self) -> None:
+        self._keepalive.release()
+
+    def shutdown(self) -> None:
+        # lets a process_request() waiting for a free worker give up
+        self._stopping.set()
+        super().shutdown()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
 # -------------------------------------------------
 # Server bootstrap
 # -------------------------------------------------
 
-def run(host: str = "127.0.0.1", port: int = 3333) -> None:
-    server = HTTPServer((host, port), MCPHandler)
-    server.serve_forever()
+def run(
+    host: str = "127.0.0.1",
+    port: int = 3333,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    backlog: int = DEFAULT_BACKLOG,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+) -> None:
+    server = PooledHTTPServer(
+        (host, port),
+        MCPHandler,
+        workers=workers,
+        backlog=backlog,
+        keepalive_timeout=keepalive_timeout,
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MCP HTTP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3333)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="number of connections served concurrently")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help="listen backlog for pending connections")
+    parser.add_argument("--keepalive-timeout", type=float, default=DEFAULT_KEEPALIVE_TIMEOUT,
+                        help="seconds an idle keep-alive connection is kept open")
+    args = parser.parse_args()
+
+    run(
+        args.host,
+        args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        keepalive_timeout=args.keepalive_timeout,
+    )
 
 
 if __name__ == "__main__":
-    run()
+    main()
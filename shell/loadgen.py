@@ -0,0 +1,513 @@
+# mcp_sdk/shell/loadgen.py
+
+"""
+Load generator for the MCP shells.
+
+Replays a JSONL corpus of MCP requests (or a synthetic mix) against the
+HTTP or STDIO shell and reports:
+- latency distribution (p50 / p90 / p99 / p99.9 / max)
+- responses by error code (MCPErrorCode, plus TIMEOUT / TRANSPORT_ERROR
+  for requests that got no MCP response)
+- throughput and errors per interval
+
+Load models:
+- closed loop (--concurrency N): N workers, each sends its next request
+  when the previous one is answered
+- open loop (--qps R): requests are due at a fixed rate whatever the
+  response times; latency is measured from the due time, so a backed-up
+  server shows up as latency instead of a lower request rate
+
+Corpus lines that are not a single MCP request object (blank lines,
+batches, other JSON) are skipped and counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import itertools
+import json
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from protocol.request import MCPRequest
+from utils.json import dumps_bytes as json_dumps_bytes, loads_bytes as json_loads_bytes
+
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 10.0
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_INFLIGHT = 256
+DEFAULT_STDIO_WORKERS = 16
+
+# client-side outcomes; everything else is an MCPErrorCode from the response
+TIMEOUT = "TIMEOUT"
+TRANSPORT_ERROR = "TRANSPORT_ERROR"
+
+# (weight, payload)
+SYNTHETIC_MIX: List[Tuple[int, Dict[str, Any]]] = [
+    (60, {"tool": "ai", "input": {"prompt": "Jelaskan apa itu MCP stateless."}}),
+    (30, {"tool": "validate_input", "input": {"fields": {"name": "x", "email": "y"}, "required": ["name", "email"]}}),
+    (5, {"tool": "validate_input", "input": {"fields": "not-a-dict"}}),
+    (5, {"tool": "missing_tool", "input": {}}),
+]
+
+
+# -------------------------------------------------
+# Workload
+# -------------------------------------------------
+
+def load_corpus(path: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read MCP request payloads from a JSONL file.
+
+    Returns (payloads, skipped lines).
+    """
+    payloads: List[Dict[str, Any]] = []
+    skipped = 0
+    with open(path, "rb") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json_loads_bytes(line)
+                MCPRequest.from_dict(payload)
+            except Exception:
+                skipped += 1
+                continue
+            payloads.append(payload)
+    return payloads, skipped
+
+
+def synthetic_mix(ai_provider: Optional[str] = None) -> List[Tuple[int, Dict[str, Any]]]:
+    mix = list(SYNTHETIC_MIX)
+    if ai_provider:
+        mix.append((50, {
+            "tool": "ai",
+            "input": {"prompt": "Jelaskan apa itu MCP stateless."},
+            "ai": {"provider": ai_provider, "type": "text"},
+        }))
+    return mix
+
+
+def workload(
+    payloads: List[Dict[str, Any]],
+    weights: Optional[List[int]] = None,
+    seed: int = 0,
+    timeout_ms: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Endless request stream: the corpus in order (repeated), or a seeded
+    weighted sample when `weights` is given. Every payload gets a
+    unique meta.id so STDIO responses can be matched, and
+    meta.timeout_ms when `timeout_ms` is given.
+    """
+    if weights is None:
+        source: Iterator[Dict[str, Any]] = itertools.cycle(payloads)
+    else:
+        rng = random.Random(seed)
+        source = (rng.choices(payloads, weights)[0] for _ in itertools.count())
+
+    for seq, payload in enumerate(source):
+        meta = payload.get("meta")
+        meta = dict(meta) if isinstance(meta, dict) else {}
+        meta["id"] = f"lg-{seq}"
+        if timeout_ms is not None:
+            meta["timeout_ms"] = timeout_ms
+        yield {**payload, "meta": meta}
+
+
+class _Shared:
+    """
+    Iterator safe to pull from several worker threads.
+    """
+
+    def __init__(self, requests: Iterator[Dict[str, Any]]) -> None:
+        self._requests = requests
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> _Shared:
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        with self._lock:
+            return next(self._requests)
+
+
+# -------------------------------------------------
+# Targets
+# -------------------------------------------------
+
+class HTTPTarget:
+    """
+    POSTs each request to an MCP HTTP endpoint; one keep-alive
+    connection per worker thread.
+    """
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported target URL: {url}")
+
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path or "/mcp"
+        self._timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[http.client.HTTPConnection] = []
+
+    def call(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        conn = self._connection()
+        try:
+            conn.request(
+                "POST",
+                self._path,
+                body=json_dumps_bytes(payload),
+                headers={"Content-Type": "application/json"},
+            )
+            response = conn.getresponse()
+            body = response.read()
+        except BaseException:
+            # the connection state is unknown; start fresh next time
+            conn.close()
+            self._local.conn = None
+            raise
+
+        if response.getheader("Content-Type", "").startswith("application/x-ndjson"):
+            # streamed: the last frame is the final response
+            body = body.strip().rsplit(b"\n", 1)[-1]
+        return json_loads_bytes(body)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            factory = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = self._local.conn = factory(self._host, self._port, timeout=self._timeout)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+class StdioTarget:
+    """
+    Pipelines requests into one STDIO shell subprocess and matches the
+    responses by meta.id.
+    """
+
+    def __init__(self, command: List[str], timeout: float = DEFAULT_TIMEOUT) -> None:
+        self._timeout = timeout
+        self._proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._lock = threading.Lock()
+        # separate: a write blocked on a full pipe must not stop the reader
+        self._write_lock = threading.Lock()
+        # meta.id -> [event, response]
+        self._pending: Dict[str, List[Any]] = {}
+        self._reader = threading.Thread(target=self._read, name="mcp-loadgen-stdio", daemon=True)
+        self._reader.start()
+
+        # wait until the shell is up, so start-up is not measured as latency
+        self.call({"tool": "validate_input", "input": {"fields": {}}, "meta": {"id": "lg-warmup"}})
+
+    def call(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = payload["meta"]["id"]
+        waiter: List[Any] = [threading.Event(), None]
+        line = json_dumps_bytes(payload) + b"\n"
+
+        if self._proc.poll() is not None:
+            raise ConnectionError("STDIO shell exited")
+        with self._lock:
+            self._pending[request_id] = waiter
+        try:
+            with self._write_lock:
+                self._proc.stdin.write(line)
+                self._proc.stdin.flush()
+        except BaseException:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise
+
+        if not waiter[0].wait(self._timeout):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError(f"No response for {request_id}")
+        if waiter[1] is None:
+            raise ConnectionError("STDIO shell closed its output")
+        return waiter[1]
+
+    def _read(self) -> None:
+        for line in self._proc.stdout:
+            try:
+                response = json_loads_bytes(line)
+                meta = response.get("meta") or {}
+            except Exception:
+                continue
+            if meta.get("partial"):
+                continue
+            with self._lock:
+                waiter = self._pending.pop(meta.get("id"), None)
+            if waiter is not None:
+                waiter[1] = response
+                waiter[0].set()
+
+        # EOF: fail whatever is still waiting
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter[0].set()
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._reader.join(timeout=1.0)
+
+
+# -------------------------------------------------
+# Recording and report
+# -------------------------------------------------
+
+class Recorder:
+    """
+    Thread-safe log of (finished at, latency, code) samples.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.samples: List[Tuple[float, float, str]] = []
+
+    def record(self, due: float, code: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self.samples.append((now - self.started, now - due, code))
+
+
+def call_once(target: Any, payload: Dict[str, Any], due: float, recorder: Recorder) -> None:
+    try:
+        response = target.call(payload)
+    except TimeoutError:
+        code = TIMEOUT
+    except Exception:
+        code = TRANSPORT_ERROR
+    else:
+        if response.get("success"):
+            code = ""
+        else:
+            code = str((response.get("error") or {}).get("code", "UNKNOWN"))
+    recorder.record(due, code)
+
+
+def run_closed_loop(
+    target: Any,
+    requests: Iterator[Dict[str, Any]],
+    recorder: Recorder,
+    *,
+    concurrency: int,
+    stop: Callable[[], bool],
+) -> None:
+    def _worker() -> None:
+        for payload in requests:
+            call_once(target, payload, time.perf_counter(), recorder)
+            if stop():
+                return
+
+    workers = [threading.Thread(target=_worker, daemon=True) for _ in range(concurrency)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def run_open_loop(
+    target: Any,
+    requests: Iterator[Dict[str, Any]],
+    recorder: Recorder,
+    *,
+    qps: float,
+    stop: Callable[[], bool],
+    max_inflight: int,
+) -> None:
+    interval = 1.0 / qps
+    with ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="mcp-loadgen") as pool:
+        due = time.perf_counter()
+        for payload in requests:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if stop():
+                break
+            # queued behind busy workers, a request still counts from `due`
+            pool.submit(call_once, target, payload, due, recorder)
+            due += interval
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def build_report(recorder: Recorder, elapsed: float, interval: float, skipped: int = 0) -> Dict[str, Any]:
+    samples = list(recorder.samples)
+    latencies = sorted(latency for _, latency, _ in samples)
+
+    codes: Dict[str, int] = {}
+    for _, _, code in samples:
+        codes[code or "OK"] = codes.get(code or "OK", 0) + 1
+
+    timeline: List[Dict[str, Any]] = []
+    # a short tail (e.g. draining the last responses) joins the last bucket
+    count = max(1, round(elapsed / interval))
+    buckets: Dict[int, List[Tuple[float, str]]] = {}
+    for finished, latency, code in samples:
+        buckets.setdefault(min(int(finished // interval), count - 1), []).append((latency, code))
+    for index in range(count):
+        bucket = buckets.get(index, [])
+        ordered = sorted(latency for latency, _ in bucket)
+        width = interval if index < count - 1 else max(elapsed - index * interval, 1e-9)
+        timeline.append({
+            "t": round(index * interval, 3),
+            "rps": len(bucket) / width,
+            "errors": sum(1 for _, code in bucket if code),
+            "p50_ms": percentile(ordered, 0.50) * 1e3,
+            "p99_ms": percentile(ordered, 0.99) * 1e3,
+        })
+
+    return {
+        "requests": len(samples),
+        "skipped_lines": skipped,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1e3,
+            "p90": percentile(latencies, 0.90) * 1e3,
+            "p99": percentile(latencies, 0.99) * 1e3,
+            "p99.9": percentile(latencies, 0.999) * 1e3,
+            "max": (latencies[-1] if latencies else 0.0) * 1e3,
+        },
+        "codes": dict(sorted(codes.items(), key=lambda item: -item[1])),
+        "timeline": timeline,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = report["requests"] or 1
+    print(f"requests      {report['requests']}  ({report['throughput_rps']:,.1f} req/s over {report['elapsed_s']:.1f} s)")
+    if report["skipped_lines"]:
+        print(f"skipped       {report['skipped_lines']} corpus lines that are not MCP requests")
+    print("latency ms    " + "  ".join(f"{name} {value:.2f}" for name, value in report["latency_ms"].items()))
+
+    print("\ncode                      count       %")
+    for code, count in report["codes"].items():
+        print(f"{code:<22}  {count:>7}  {count / total:>6.1%}")
+
+    print("\n     t     req/s   errors   p50 ms   p99 ms")
+    for row in report["timeline"]:
+        print(f"{row['t']:>6.1f}  {row['rps']:>8.1f}  {row['errors']:>7}  {row['p50_ms']:>7.2f}  {row['p99_ms']:>7.2f}")
+
+
+# -------------------------------------------------
+# Entry point
+# -------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="mcp-loadgen", description="Replay MCP requests against a shell")
+    parser.add_argument("--target", default="http://127.0.0.1:3333/mcp",
+                        help="HTTP endpoint URL, or 'stdio' to drive a STDIO shell subprocess")
+    parser.add_argument("--stdio-cmd", default=None,
+                        help="STDIO shell command (default: this interpreter running shell.stdio)")
+    parser.add_argument("--file", default=None,
+                        help="JSONL corpus of MCP requests (default: synthetic mix)")
+    parser.add_argument("--ai-provider", default=None,
+                        help="add AI text requests for this provider to the synthetic mix")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic mix")
+
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=None,
+                      help=f"closed loop with this many workers (default: {DEFAULT_CONCURRENCY})")
+    load.add_argument("--qps", type=float, default=None, help="open loop at this request rate")
+
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="stop after sending this many requests")
+    parser.add_argument("--max-inflight", type=int, default=DEFAULT_MAX_INFLIGHT,
+                        help="open loop: most requests awaiting a response")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-request timeout (s)")
+    parser.add_argument("--timeout-ms", type=int, default=None,
+                        help="server-side deadline stamped on every request (meta.timeout_ms)")
+    parser.add_argument("--interval", type=float, default=1.0, help="timeline bucket (s)")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        payloads, skipped = load_corpus(args.file)
+        if not payloads:
+            parser.error(f"{args.file} holds no MCP requests ({skipped} lines skipped)")
+        requests = workload(payloads, timeout_ms=args.timeout_ms)
+    else:
+        mix = synthetic_mix(args.ai_provider)
+        skipped = 0
+        requests = workload(
+            [payload for _, payload in mix], [weight for weight, _ in mix], args.seed, args.timeout_ms
+        )
+
+    if args.requests is not None:
+        requests = itertools.islice(requests, args.requests)
+    requests = _Shared(requests)
+
+    if args.target == "stdio":
+        workers = args.concurrency or DEFAULT_STDIO_WORKERS
+        command = shlex.split(args.stdio_cmd) if args.stdio_cmd else [
+            sys.executable, "-m", "shell.stdio", "--concurrency", str(workers),
+        ]
+        target: Any = StdioTarget(command, timeout=args.timeout)
+    else:
+        target = HTTPTarget(args.target, timeout=args.timeout)
+
+    recorder = Recorder()
+    deadline = recorder.started + args.duration
+
+    def _stop() -> bool:
+        return time.perf_counter() >= deadline
+
+    try:
+        if args.qps is not None:
+            run_open_loop(target, requests, recorder, qps=args.qps, stop=_stop, max_inflight=args.max_inflight)
+        else:
+            run_closed_loop(target, requests, recorder, concurrency=args.concurrency or DEFAULT_CONCURRENCY, stop=_stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - recorder.started
+        target.close()
+
+    report = build_report(recorder, elapsed, args.interval, skipped)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,51 +2,236 @@
 
 from __future__ import annotations
 
+import argparse
 import sys
-from typing import Any, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
 
+from core.dispatcher import Dispatcher
 from protocol.request import MCPRequest
 from protocol.response import MCPResponse
 from protocol.errors import MCPError, MCPErrorCode
 
-from utils.json import loads as json_loads
+from utils.json import loads_array as json_loads_array, loads_bytes as json_loads_bytes, dumps_bytes as json_dumps_bytes
+from shell.batch import dispatch_payloads
 from shell.composition import build_dispatcher
 
 
-def main() -> None:
+# -------------------------------------------------
+# Request handling
+# -------------------------------------------------
+
+def handle_line(dispatcher: Dispatcher, raw: bytes) -> Iterator[bytes]:
     """
-    STDIO runner for MCP.
+    Dispatch one JSON request line and yield JSON response lines.
 
-    Reads one JSON object per line.
-    Writes one JSON response per line.
+    Usually this is exactly one line. Text requests with
+    input.stream = true yield NDJSON partial frames as tokens arrive,
+    then the final response (an error response if the stream breaks).
+    Every line's meta carries the request's `meta.id` when present.
+
+    A line holding a JSON array is dispatched as a batch and answered
+    with one JSON array line.
+
+    Lines are handled as UTF-8 bytes end to end; no str copies are made.
     """
+    if raw.startswith(b"["):
+        yield _handle_batch_line(dispatcher, raw)
+        return
 
-    dispatcher = build_dispatcher()
+    request_id: Any = None
+    line: Optional[bytes] = None
+    frames: Iterator[MCPResponse]
 
-    for line in sys.stdin:
-        raw = line.strip()
-        if not raw:
-            continue
+    def _render(response: MCPResponse) -> bytes:
+        if request_id is not None:
+            response = response.with_meta(id=request_id)
+        return _serialize(response)
 
-        try:
-            payload: Dict[str, Any] = json_loads(raw)
-            request = MCPRequest.from_dict(payload)
+    try:
+        payload: Dict[str, Any] = json_loads_bytes(raw)
+        meta = payload.get("meta")
+        if isinstance(meta, dict):
+            request_id = meta.get("id")
+
+        if _wants_stream(payload):
+            frames = dispatcher.dispatch_stream(MCPRequest.from_dict(payload))
+        else:
+            # parse and serialize spans are recorded by the dispatcher's middleware
+            line = dispatcher.dispatch_payload(payload, render=_render)
+
+    except MCPError as err:
+        frames = iter((MCPResponse.error_response(error=err.to_dict()),))
+
+    except Exception as exc:
+        frames = iter((_fatal_response(exc),))
+
+    if line is not None:
+        yield line
+        return
+
+    try:
+        for response in frames:
+            yield _render(response)
+    except Exception as exc:
+        yield _render(_fatal_response(exc))
+
+
+def _handle_batch_line(dispatcher: Dispatcher, raw: bytes) -> bytes:
+    try:
+        responses = dispatch_payloads(dispatcher, json_loads_array(raw))
+
+    except MCPError as err:
+        return _serialize(MCPResponse.error_response(error=err.to_dict()))
+
+    except Exception as exc:
+        return _serialize(_fatal_response(exc))
+
+    return b"[" + b",".join(_serialize(response) for response in responses) + b"]"
+
+
+def _wants_stream(payload: Dict[str, Any]) -> bool:
+    body = payload.get("input")
+    return isinstance(body, dict) and body.get("stream") is True
 
-            response = dispatcher.dispatch(request)
 
-        except MCPError as err:
-            response = MCPResponse.error_response(error=err.to_dict())
+def _fatal_response(exc: Exception) -> MCPResponse:
+    fatal = MCPError(
+        code=MCPErrorCode.INTERNAL_ERROR,
+        message="Fatal STDIO error",
+        details={"error": str(exc)},
+    )
+    return MCPResponse.error_response(error=fatal.to_dict())
 
+
+def _serialize(response: MCPResponse) -> bytes:
+    try:
+        return json_dumps_bytes(response.to_dict())
+    except Exception as exc:
+        fatal = MCPError(
+            code=MCPErrorCode.INTERNAL_ERROR,
+            message="Failed to serialize output JSON",
+            details={"error": str(exc)},
+        )
+        fallback = MCPResponse.error_response(error=fatal.to_dict(), meta=response.meta)
+        return json_dumps_bytes(fallback.to_dict())
+
+
+# -------------------------------------------------
+# Output
+# -------------------------------------------------
+
+class _LineWriter:
+    """
+    Thread-safe line writer over a binary stream.
+
+    In ordered mode each request's lines are released together,
+    strictly by sequence number; otherwise every line (including
+    partial stream frames) is written as soon as it is ready.
+    """
+
+    def __init__(self, stream: BinaryIO, ordered: bool) -> None:
+        self._stream = stream
+        self._ordered = ordered
+        self._lock = threading.Lock()
+        self._next = 0
+        self._pending: Dict[int, List[bytes]] = {}
+
+    def write_request(self, seq: int, lines: Iterator[bytes]) -> None:
+        if not self._ordered:
+            for line in lines:
+                with self._lock:
+                    self._emit([line])
+            return
+
+        collected = list(lines)
+        with self._lock:
+            self._pending[seq] = collected
+            ready: List[bytes] = []
+            while self._next in self._pending:
+                ready.extend(self._pending.pop(self._next))
+                self._next += 1
+            if ready:
+                self._emit(ready)
+
+    def _emit(self, lines: List[bytes]) -> None:
+        self._stream.write(b"".join(line + b"\n" for line in lines))
+        self._stream.flush()
+
+
+# -------------------------------------------------
+# Runners
+# -------------------------------------------------
+
+def serve(
+    dispatcher: Dispatcher,
+    *,
+    concurrency: int = 1,
+    ordered: bool = False,
+    stdin: Optional[BinaryIO] = None,
+    stdout: Optional[BinaryIO] = None,
+) -> None:
+    """
+    Serve requests from stdin until EOF.
+
+    With concurrency > 1 up to `concurrency` requests run at once and
+    responses are written as they complete (or in input order when
+    `ordered` is set). Clients match responses by `meta.id`.
+    """
+    stdin = stdin if stdin is not None else sys.stdin.buffer
+    stdout = stdout if stdout is not None else sys.stdout.buffer
+
+    if concurrency <= 1:
+        for line in stdin:
+            raw = line.strip()
+            if not raw:
+                continue
+            for out in handle_line(dispatcher, raw):
+                stdout.write(out + b"\n")
+                stdout.flush()
+        return
+
+    writer = _LineWriter(stdout, ordered)
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def _work(seq: int, raw: bytes) -> None:
+        try:
+            writer.write_request(seq, handle_line(dispatcher, raw))
         except Exception as exc:
-            fatal = MCPError(
-                code=MCPErrorCode.INTERNAL_ERROR,
-                message="Fatal STDIO error",
-                details={"error": str(exc)},
-            )
-            response = MCPResponse.error_response(error=fatal.to_dict())
-
-        sys.stdout.write(response.to_json() + "\n")
-        sys.stdout.flush()
+            # every seq must be written, or ordered output stalls behind it
+            writer.write_request(seq, iter((_serialize(_fatal_response(exc)),)))
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mcp-stdio") as pool:
+        seq = 0
+        for line in stdin:
+            raw = line.strip()
+            if not raw:
+                continue
+            # bound in-flight work so stdin is not read arbitrarily far ahead
+            slots.acquire()
+            pool.submit(_work, seq, raw)
+            seq += 1
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    STDIO runner for MCP.
+
+    Reads one JSON object per line.
+    Writes one JSON response per line.
+    """
+    parser = argparse.ArgumentParser(description="MCP STDIO runner")
+    parser.add_argument("-j", "--concurrency", type=int, default=1,
+                        help="maximum number of requests in flight (default: 1, sequential)")
+    parser.add_argument("--ordered", action="store_true",
+                        help="write responses in input order when pipelining")
+    args = parser.parse_args(argv)
+
+    dispatcher = build_dispatcher()
+    serve(dispatcher, concurrency=args.concurrency, ordered=args.ordered)
 
 
 if __name__ == "__main__":
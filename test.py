@@ -1,6 +1,43 @@
+import asyncio
+import base64
+import email
+import http.client
+import io
+import json
 import logging
-from shell.composition import build_dispatcher
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.bulkhead import Bulkhead
+from core.cache import ResultCache
+from core.dispatcher import Dispatcher
+from core.middleware import Middleware
+from core.ratelimit import RateLimit, RateLimiter
+from core.singleflight import SingleFlight
+from core.tools.generate import GenerateTextTool
+from core.tools.validate import ValidateInputTool
+from providers.cache import CachedExecutor, DiskCache
+from providers.hedging import HedgedExecutor, HedgePolicy
+from providers.pollinations.audio import PollinationsAudioClient
+from providers.pool import ConnectionPool
+from providers.registry import ExecutorRegistry
+from providers.runtime import ProviderRuntime, get_runtime, run_sync
+from providers.simulated import SimulationProfile
+from shell.batch import MAX_BATCH_SIZE, dispatch_payloads
+from shell.http import MCPHandler, PooledHTTPServer
+from shell.composition import build_dispatcher, simulated_factories
+from protocol.errors import MCPError, MCPErrorCode
 from protocol.request import MCPRequest
+from protocol.response import MCPResponse
+from protocol.schema import MCPSchema
+from shell import daemon, stdio
+from utils.json import CODECS
 from utils.logging import get_logger
 from pathlib import Path
 
@@ -9,6 +46,18 @@ logger = get_logger("MCP", level=logging.DEBUG)
 OUTPUT_DIR = Path("test_outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# a simulated upstream slower than the short deadlines below
+SLOW_TEXT = SimulationProfile(latency_p50=0.3, latency_sigma=0, text_tokens=(3, 4), seed=1)
+
+# answers at once
+FAST_TEXT = SimulationProfile(time_scale=0, text_tokens=(3, 4), seed=1)
+
+# tokens trickle in after the first one
+STREAM_TEXT = SimulationProfile(latency_p50=0.05, latency_sigma=0, text_tokens=(6, 6), stream_interval=0.05, seed=1)
+
+# cold start budget for a tool-only CLI call (interpreter start included)
+CLI_STARTUP_BUDGET_S = 1.0
+
 def test_pollinations_text():
     logger.debug("=== TEST: Pollinations Text ===")
     dispatcher = build_dispatcher()
@@ -91,8 +140,1143 @@ def test_pollinations_audio():
         logger.debug("Error: %s", response.error)
 
 
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        return
+
+
+def _fetch_from(pool, url):
+    with pool.request("GET", url, timeout=5) as response:
+        return response.read()
+
+
+def test_connection_pool():
+    logger.debug("=== TEST: Provider connection pool ===")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_address[1]}/"
+
+    try:
+        # sequential requests share one keep-alive connection
+        pool = ConnectionPool(max_per_host=2)
+        for _ in range(10):
+            with pool.request("GET", url) as response:
+                assert response.read() == b"ok"
+        stats = pool.stats()
+        assert stats["created"] == 1 and stats["reused"] == 9, stats
+        assert stats["dns_misses"] == 1, stats
+
+        # callers beyond max_per_host wait for a released connection
+        pool = ConnectionPool(max_per_host=1)
+
+        def _fetch(_):
+            with pool.request("GET", url) as response:
+                return response.read()
+
+        with ThreadPoolExecutor(max_workers=4) as workers:
+            assert list(workers.map(_fetch, range(20))) == [b"ok"] * 20
+        stats = pool.stats()
+        assert stats["created"] == 1 and stats["open"] == 1, stats
+        assert stats["waits"] > 0, stats
+
+        # a release wakes a caller waiting for the same host, not another host
+        pool = ConnectionPool(max_per_host=1)
+        port = server.server_address[1]
+        held = {}
+        for host in ("localhost", "127.0.0.1"):
+            held[host] = pool.request("GET", f"http://{host}:{port}/")
+            held[host].read()
+
+        with ThreadPoolExecutor(max_workers=2) as workers:
+            other = workers.submit(_fetch_from, pool, f"http://127.0.0.1:{port}/")
+            time.sleep(0.1)
+            same = workers.submit(_fetch_from, pool, f"http://localhost:{port}/")
+            time.sleep(0.1)
+            held["localhost"].close()
+            assert same.result(timeout=1) == b"ok"
+            held["127.0.0.1"].close()
+            assert other.result(timeout=1) == b"ok"
+
+        # expired keep-alive connections are not reused
+        pool = ConnectionPool(keepalive_timeout=0)
+        for _ in range(3):
+            with pool.request("GET", url) as response:
+                response.read()
+        stats = pool.stats()
+        assert stats["created"] == 3 and stats["expired"] == 2, stats
+        print("Pool stats:", stats)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cli_cold_start():
+    logger.debug("=== TEST: CLI cold start (tool-only) ===")
+    repo_root = Path(__file__).resolve().parent
+    payload = b'{"tool":"validate_input","input":{"fields":{"a":1},"required":["a"]}}'
+    # measure the in-process path, not a running daemon
+    env = {**os.environ, "MCP_NO_DAEMON": "1"}
+
+    # tool-only requests must not import provider SDKs
+    probe = (
+        "import sys, io\n"
+        "sys.stdin = io.TextIOWrapper(io.BytesIO(sys.argv[1].encode()))\n"
+        "from shell import cli\n"
+        "cli.main()\n"
+        "heavy = [m for m in ('pollinations', 'PIL') if m in sys.modules]\n"
+        "sys.stdout.buffer.write(b'\\n' + repr(heavy).encode())\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe, payload.decode()],
+        cwd=repo_root, env=env, capture_output=True, check=True,
+    )
+    output, heavy = result.stdout.rsplit(b"\n", 1)
+    assert b'"valid":true' in output, result
+    assert heavy == b"[]", heavy
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "shell.cli"],
+        cwd=repo_root, env=env, input=payload, capture_output=True, check=True,
+    )
+    elapsed = time.perf_counter() - start
+    assert b'"valid":true' in result.stdout, result
+    assert elapsed < CLI_STARTUP_BUDGET_S, f"CLI cold start took {elapsed:.3f}s"
+    print(f"CLI cold start: {elapsed * 1000:.0f} ms")
+
+
+def _text_request(meta=None, prompt="apa itu mcp?"):
+    request = {"tool": "ai", "ai": {"provider": "pollinations", "type": "text"}, "input": {"prompt": prompt}}
+    if meta is not None:
+        request["meta"] = meta
+    return MCPRequest.from_dict(request)
+
+
+def _code(response):
+    return response.error["code"] if response.error else "ok"
+
+
+def test_singleflight_deadline():
+    logger.debug("=== TEST: Coalesced request outlives the leader's deadline ===")
+    dispatcher = build_dispatcher(
+        providers=simulated_factories({"text": SLOW_TEXT}), singleflight=SingleFlight(),
+    )
+    codes = {}
+
+    def _send(name, meta, delay):
+        time.sleep(delay)
+        codes[name] = _code(dispatcher.dispatch(_text_request(meta)))
+
+    # leader with a short deadline, identical follower without one
+    threads = [
+        threading.Thread(target=_send, args=("leader", {"timeout_ms": 100}, 0)),
+        threading.Thread(target=_send, args=("follower", None, 0.02)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert codes == {"leader": "DEADLINE_EXCEEDED", "follower": "ok"}, codes
+
+    async def _asend(meta, delay):
+        await asyncio.sleep(delay)
+        return _code(await dispatcher.dispatch_async(_text_request(meta)))
+
+    async def _both():
+        return await asyncio.gather(_asend({"timeout_ms": 100}, 0), _asend(None, 0.02))
+
+    assert asyncio.run(_both()) == ["DEADLINE_EXCEEDED", "ok"]
+    print("Singleflight:", dispatcher.metrics.snapshot()["collectors"]["singleflight"])
+
+
+def _in_parallel(*calls):
+    """Run (fn, delay) pairs on threads; return their results in order."""
+    results = [None] * len(calls)
+
+    def _run(index, fn, delay):
+        time.sleep(delay)
+        results[index] = fn()
+
+    threads = [threading.Thread(target=_run, args=(i, fn, delay)) for i, (fn, delay) in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_singleflight_coalescing():
+    logger.debug("=== TEST: Identical concurrent AI requests run upstream once ===")
+    singleflight = SingleFlight()
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": SLOW_TEXT}), singleflight=singleflight)
+
+    send = lambda: _code(dispatcher.dispatch(_text_request(prompt="sama")))
+    assert _in_parallel(*[(send, 0)] * 8) == ["ok"] * 8
+
+    async def _gather():
+        return await asyncio.gather(*(dispatcher.dispatch_async(_text_request(prompt="sama")) for _ in range(8)))
+
+    assert [_code(r) for r in asyncio.run(_gather())] == ["ok"] * 8
+    stats = singleflight.stats()
+    assert stats["requests"] == 16 and stats["executions"] == 2, stats
+
+
+def test_rate_limiter():
+    logger.debug("=== TEST: Token buckets per provider and per client ===")
+    limiter = RateLimiter(providers={"pollinations": RateLimit(rate=1, burst=2)})
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": FAST_TEXT}), rate_limiter=limiter)
+    codes = [_code(dispatcher.dispatch(_text_request(prompt=f"p{i}"))) for i in range(3)]
+    assert codes == ["ok", "ok", "RATE_LIMITED"], codes
+
+    limiter = RateLimiter(per_client=RateLimit(rate=1, burst=1))
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": FAST_TEXT}), rate_limiter=limiter)
+    codes = [
+        _code(dispatcher.dispatch(_text_request({"client_id": client}, prompt=f"p{i}")))
+        for i, client in enumerate(["a", "a", "b"])
+    ]
+    assert codes == ["ok", "RATE_LIMITED", "ok"], codes
+
+    # requests turned away by the provider bucket or the bulkhead give
+    # their client token back
+    limiter = RateLimiter(
+        providers={"pollinations": RateLimit(rate=0.001, burst=1)},
+        per_client=RateLimit(rate=0.001, burst=2),
+    )
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": FAST_TEXT}), rate_limiter=limiter)
+    responses = [dispatcher.dispatch(_text_request({"client_id": "a"}, prompt=f"p{i}")) for i in range(3)]
+    assert [_code(r) for r in responses] == ["ok", "RATE_LIMITED", "RATE_LIMITED"]
+    assert responses[2].error["details"]["scope"] == "provider", responses[2].error
+
+    limiter = RateLimiter(per_client=RateLimit(rate=0.001, burst=2))
+    dispatcher = build_dispatcher(
+        providers=simulated_factories({"text": SLOW_TEXT}),
+        rate_limiter=limiter,
+        bulkhead=Bulkhead(providers={"pollinations": 1}),
+    )
+    send = lambda prompt: _code(dispatcher.dispatch(_text_request({"client_id": "a"}, prompt=prompt)))
+    codes = _in_parallel(
+        (lambda: send("satu"), 0),
+        (lambda: send("dua"), 0.05),
+        (lambda: send("tiga"), 0.1),
+    )
+    assert codes == ["ok", "OVERLOADED", "OVERLOADED"], codes
+    assert send("empat") == "ok"
+
+
+def test_bulkhead():
+    logger.debug("=== TEST: A full provider compartment does not block tools ===")
+    dispatcher = build_dispatcher(
+        providers=simulated_factories({"text": SLOW_TEXT}),
+        bulkhead=Bulkhead(providers={"pollinations": 1}, tools={"validate_input": 1}),
+    )
+    tool = MCPRequest.from_dict({"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}})
+
+    codes = _in_parallel(
+        (lambda: _code(dispatcher.dispatch(_text_request(prompt="satu"))), 0),
+        (lambda: _code(dispatcher.dispatch(_text_request(prompt="dua"))), 0.05),
+        (lambda: _code(dispatcher.dispatch(tool)), 0.05),
+    )
+    assert codes == ["ok", "OVERLOADED", "ok"], codes
+
+
+def test_request_deadline():
+    logger.debug("=== TEST: meta.timeout_ms / deadline_ms bound AI requests ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": SLOW_TEXT}))
+
+    start = time.perf_counter()
+    assert _code(dispatcher.dispatch(_text_request({"timeout_ms": 100}))) == "DEADLINE_EXCEEDED"
+    assert time.perf_counter() - start < 0.25
+
+    start = time.perf_counter()
+    response = asyncio.run(dispatcher.dispatch_async(_text_request({"timeout_ms": 100})))
+    assert _code(response) == "DEADLINE_EXCEEDED"
+    assert time.perf_counter() - start < 0.25
+
+    # already past on arrival: rejected without calling the provider
+    past = int(time.time() * 1000) - 1000
+    assert _code(dispatcher.dispatch(_text_request({"deadline_ms": past}))) == "DEADLINE_EXCEEDED"
+    assert _code(dispatcher.dispatch(_text_request({"timeout_ms": 2000}))) == "ok"
+
+
+def test_metrics_prometheus():
+    logger.debug("=== TEST: Metrics render in Prometheus text format ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": FAST_TEXT}))
+    valid = MCPRequest.from_dict({"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}})
+    invalid = MCPRequest.from_dict({"tool": "validate_input", "input": {"fields": 1}})
+    assert _code(dispatcher.dispatch(_text_request())) == "ok"
+
+    # scrapes run while other threads keep recording
+    def _record():
+        for i in range(200):
+            dispatcher.dispatch(valid if i % 2 else invalid)
+
+    def _scrape():
+        for _ in range(200):
+            dispatcher.metrics.snapshot()
+
+    _in_parallel((_record, 0), (_record, 0), (_scrape, 0))
+
+    text = dispatcher.metrics.render_prometheus()
+    lines = text.splitlines()
+    assert "# TYPE mcp_requests_total counter" in lines
+    assert 'mcp_requests_total{kind="ai",name="pollinations",ai_type="text",code=""} 1' in lines
+    assert 'mcp_requests_total{kind="tool",name="validate_input",ai_type="",code=""} 200' in lines
+    assert 'mcp_requests_total{kind="tool",name="validate_input",ai_type="",code="SCHEMA_VIOLATION"} 200' in lines
+    assert 'mcp_request_duration_seconds_count{kind="tool",name="validate_input",ai_type=""} 400' in lines
+    assert 'mcp_request_duration_seconds_bucket{kind="tool",name="validate_input",ai_type="",le="+Inf"} 400' in lines
+    assert 'mcp_requests_in_flight{kind="tool",name="validate_input",ai_type=""} 0' in lines
+    assert 'mcp_upstream_calls_total{provider="pollinations",ai_type="text"} 1' in lines
+    assert text.endswith("\n")
+
+
+def _post(conn, payload):
+    conn.request("POST", "/mcp", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response, json.loads(response.read())
+
+
+def test_http_keepalive():
+    logger.debug("=== TEST: Idle keep-alive connections leave a worker free ===")
+    server = PooledHTTPServer(("127.0.0.1", 0), MCPHandler, workers=2, keepalive_timeout=5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    payload = {"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}}
+    clients = []
+
+    try:
+        # more idle clients than workers: each new one is still answered
+        for _ in range(4):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            clients.append(conn)
+            response, body = _post(conn, payload)
+            assert body["success"], body
+            assert response.getheader("Connection") == (None if len(clients) == 1 else "close")
+
+        # the one kept-alive connection is reused
+        sock = clients[0].sock
+        response, body = _post(clients[0], payload)
+        assert body["success"] and clients[0].sock is sock
+    finally:
+        for conn in clients:
+            conn.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_shutdown():
+    logger.debug("=== TEST: shutdown() stops an accept loop waiting for a worker ===")
+    server = PooledHTTPServer(("127.0.0.1", 0), MCPHandler, workers=1, keepalive_timeout=0.5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # the only worker waits for the rest of a request; the next
+    # connection leaves the accept loop waiting for it
+    busy = socket.create_connection(server.server_address)
+    busy.sendall(b"POST /mcp HTTP/1.1\r\n")
+    waiting = socket.create_connection(server.server_address)
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    server.shutdown()
+    assert time.perf_counter() - start < 2
+    busy.close()
+    waiting.close()
+    server.server_close()
+
+
+class _Recorder(Middleware):
+    """Middleware that logs its hooks and the spans each request ends with."""
+
+    def __init__(self, name, log, spans):
+        self.name = name
+        self.log = log
+        self.spans = spans
+
+    def before(self, ctx):
+        self.log.append(f"{self.name}.before")
+
+    def after(self, ctx, response):
+        self.log.append(f"{self.name}.after")
+        return response
+
+    def on_complete(self, ctx):
+        self.log.append(f"{self.name}.complete")
+        self.spans.append(set(ctx.spans))
+
+
+def test_middleware():
+    logger.debug("=== TEST: Middleware order and spans in every shell ===")
+    log, spans = [], []
+    dispatcher = build_dispatcher(middleware=[_Recorder("a", log, []), _Recorder("b", log, spans)])
+    payload = {"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}}
+
+    assert dispatcher.dispatch(MCPRequest.from_dict(payload)).success
+    assert log == ["a.before", "b.before", "b.after", "a.after", "b.complete", "a.complete"], log
+    assert spans == [{"validate", "route", "execute"}], spans
+
+    # the shells parse and serialize through the dispatcher, so both are timed
+    spans.clear()
+    lines = list(stdio.handle_line(dispatcher, json.dumps({**payload, "meta": {"id": 7}}).encode()))
+    assert json.loads(lines[0])["meta"]["id"] == 7, lines
+
+    handler = type("_Handler", (MCPHandler,), {"dispatcher": dispatcher})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        response, body = _post(conn, payload)
+        assert body["success"], body
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert spans == [{"parse", "validate", "route", "execute", "serialize"}] * 2, spans
+
+
+def test_compiled_validation():
+    logger.debug("=== TEST: Compiled validator messages match MCPSchema ===")
+    dispatcher = build_dispatcher()
+    # built directly: from_dict already rejects a non-dict meta or input
+    for request in (
+        MCPRequest(tool="validate_input", input={"fields": {}}, meta="x"),
+        MCPRequest(tool="validate_input", input=[]),
+        MCPRequest(tool="validate_input", input={f"k{i}": i for i in range(101)}),
+    ):
+        try:
+            MCPSchema.validate_request(request)
+            raise AssertionError(f"MCPSchema accepted {request}")
+        except MCPError as exc:
+            expected = exc.message
+        response = dispatcher.dispatch(request)
+        assert _code(response) == "SCHEMA_VIOLATION", response.error
+        assert response.error["message"] == expected, (response.error, expected)
+
+    # direct calls skip the dispatcher but still get a schema error
+    for tool, bad in ((GenerateTextTool(), {}), (ValidateInputTool(), {"fields": 1})):
+        try:
+            tool.execute(bad)
+            raise AssertionError(f"{tool.name} accepted {bad}")
+        except MCPError as exc:
+            assert exc.code == MCPErrorCode.SCHEMA_VIOLATION, exc
+
+
+def test_dispatch_async():
+    logger.debug("=== TEST: dispatch_async overlaps upstream waits ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": SLOW_TEXT}))
+
+    async def run():
+        requests = [_text_request(prompt=f"prompt {i}") for i in range(4)]
+        return await asyncio.gather(*(dispatcher.dispatch_async(request) for request in requests))
+
+    start = time.perf_counter()
+    responses = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    assert all(response.success for response in responses), [response.error for response in responses]
+    # four 0.3 s calls awaited together, not one after another
+    assert elapsed < 0.9, f"4 async calls took {elapsed:.2f}s"
+
+    # tools and errors come back as responses, like dispatch()
+    tool = MCPRequest.from_dict({"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}})
+    assert asyncio.run(dispatcher.dispatch_async(tool)).to_dict() == dispatcher.dispatch(tool).to_dict()
+    missing = asyncio.run(dispatcher.dispatch_async(MCPRequest.from_dict({"tool": "nope", "input": {}})))
+    assert not missing.success and missing.error, missing
+
+    # an executor without agenerate runs its sync method in a worker thread
+    inner = _Counting()
+    dispatcher = build_dispatcher(providers={"pollinations": lambda: inner})
+    response = asyncio.run(dispatcher.dispatch_async(_text_request(prompt="sync")))
+    assert response.success and inner.calls == 1, (response.error, inner.calls)
+
+
+def test_provider_runtime():
+    logger.debug("=== TEST: Shared runtime loop and fork reset ===")
+    runtime = ProviderRuntime()
+
+    async def where():
+        return threading.current_thread().name, asyncio.get_running_loop()
+
+    # every call runs on the same long-lived loop thread
+    first, second = runtime.run(where()), runtime.run(where())
+    assert first == second and first[0] == "mcp-provider-runtime", (first, second)
+
+    cancelled = threading.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    try:
+        runtime.run(hang(), timeout=0.1)
+        raise AssertionError("hanging call did not time out")
+    except TimeoutError:
+        pass
+    assert cancelled.wait(1), "timed out coroutine kept running"
+
+    async def nested():
+        inner = where()
+        try:
+            runtime.run(inner)
+        finally:
+            inner.close()
+
+    try:
+        runtime.run(nested())
+        raise AssertionError("run() blocked the loop thread")
+    except RuntimeError:
+        pass
+
+    runtime.close()
+    assert runtime.run(where())[1] is not first[1], "close() kept the old loop"
+    runtime.close()
+
+    # a forked child gets its own runtime with a live loop
+    if not hasattr(os, "fork"):
+        return
+    parent = get_runtime()
+    run_sync(where())
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = get_runtime() is not parent and run_sync(where())[0] == "mcp-provider-runtime"
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0, status
+
+
+def test_dispatch_batch():
+    logger.debug("=== TEST: Batch order, concurrency and size limit ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": SLOW_TEXT}))
+
+    def check(name):
+        return MCPRequest.from_dict({"tool": "validate_input", "input": {"fields": {name: 1}, "required": [name, "x"]}})
+
+    requests = [_text_request(prompt="slow"), check("a"), MCPRequest.from_dict({"tool": "nope", "input": {}}), check("b")]
+    for responses in (dispatcher.dispatch_batch(requests), asyncio.run(dispatcher.dispatch_batch_async(requests))):
+        assert [response.success for response in responses] == [True, True, False, True], responses
+        # the slow AI call finishes last but keeps its place
+        assert [response.to_dict() for response in responses[1::2]] == [
+            dispatcher.dispatch(request).to_dict() for request in requests[1::2]
+        ]
+
+    start = time.perf_counter()
+    responses = dispatcher.dispatch_batch([_text_request(prompt=f"p{i}") for i in range(4)], max_concurrency=4)
+    elapsed = time.perf_counter() - start
+    assert all(response.success for response in responses) and elapsed < 0.9, f"batch took {elapsed:.2f}s"
+
+    # bad items answer in place, with their meta.id
+    payloads = [{"tool": "validate_input", "input": {"fields": {}}, "meta": {"id": 1}}, {"input": 3, "meta": {"id": 2}}]
+    responses = dispatch_payloads(dispatcher, payloads)
+    assert responses[0].success and responses[0].meta["id"] == 1, responses[0]
+    assert _code(responses[1]) == "INVALID_REQUEST" and responses[1].meta["id"] == 2, responses[1]
+    assert responses[1].error["details"]["index"] == 1, responses[1].error
+
+    too_many = [payloads[0]] * (MAX_BATCH_SIZE + 1)
+    try:
+        dispatch_payloads(dispatcher, too_many)
+        raise AssertionError("oversized batch was dispatched")
+    except MCPError as exc:
+        assert exc.code == MCPErrorCode.SCHEMA_VIOLATION, exc
+        assert exc.details == {"max_items": MAX_BATCH_SIZE}, exc.details
+    line = json.loads(next(stdio.handle_line(dispatcher, json.dumps(too_many).encode())))
+    assert line["error"]["message"] == "Batch too large", line
+
+
+class _EchoTool:
+    """Tool that counts executions."""
+
+    name = "echo"
+
+    def __init__(self, cacheable=True):
+        self.cacheable = cacheable
+        self.calls = 0
+
+    def execute(self, input):
+        self.calls += 1
+        return {"echo": input, "calls": self.calls}
+
+
+def test_result_cache():
+    logger.debug("=== TEST: Tool result cache hits, eviction, TTL and opt-out ===")
+    now = [0.0]
+    cache = ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    assert cache.get("a") == (False, None)
+    value = {"items": [1]}
+    cache.put("a", value)
+    value["items"].append(2)
+    found, cached = cache.get("a")
+    assert found and cached == {"items": [1]}, cached
+    cached["items"].append(3)
+    assert cache.get("a")[1] == {"items": [1]}, "cached value was mutated"
+
+    # least recently used goes first
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert not cache.get("b")[0] and cache.get("a")[0] and cache.get("c")[0]
+
+    now[0] = 10
+    assert not cache.get("a")[0], "expired entry was served"
+    assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 5, "misses": 3, "evictions": 2}, cache.stats()
+
+    # through the dispatcher: equal inputs (any key order) run the tool once
+    tool, opted_out = _EchoTool(), _EchoTool(cacheable=False)
+    opted_out.name = "echo_live"
+    dispatcher = Dispatcher(tools={"echo": tool, "echo_live": opted_out}, cache=ResultCache())
+    for payload in ({"a": 1, "b": 2}, {"b": 2, "a": 1}):
+        for name in ("echo", "echo_live"):
+            assert dispatcher.dispatch(MCPRequest.from_dict({"tool": name, "input": payload})).success
+    assert tool.calls == 1 and opted_out.calls == 2, (tool.calls, opted_out.calls)
+
+    # inputs that cannot be hashed canonically are never cached
+    for _ in range(2):
+        dispatcher.dispatch(MCPRequest.from_dict({"tool": "echo", "input": {"x": float("nan")}}))
+    assert tool.calls == 3, tool.calls
+
+
+def _stream_payload(prompt="stream me"):
+    return {"tool": "ai", "ai": {"provider": "pollinations", "type": "text"}, "input": {"prompt": prompt, "stream": True}}
+
+
+def _check_frames(frames):
+    *partials, final = frames
+    assert partials and all(frame["meta"]["partial"] for frame in partials), frames
+    assert final["success"] and not final["meta"].get("partial"), final
+    assert final["data"]["text"] == "".join(frame["data"]["delta"] for frame in partials), frames
+    return partials
+
+
+def test_dispatch_stream():
+    logger.debug("=== TEST: Stream frames arrive as tokens do ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": STREAM_TEXT}))
+    request = MCPRequest.from_dict(_stream_payload())
+
+    start = time.perf_counter()
+    arrivals, frames = [], []
+    for frame in dispatcher.dispatch_stream(request):
+        arrivals.append(time.perf_counter() - start)
+        frames.append(frame.to_dict())
+    assert len(_check_frames(frames)) == 6, frames
+    # the first token is handed over long before the last one exists
+    assert arrivals[0] < arrivals[-1] / 2, arrivals
+
+    async def collect():
+        return [frame.to_dict() async for frame in dispatcher.dispatch_stream_async(request)]
+
+    _check_frames(asyncio.run(collect()))
+
+    # without input.stream there is one regular response
+    frames = list(dispatcher.dispatch_stream(_text_request()))
+    assert len(frames) == 1 and frames[0].success and not frames[0].meta.get("partial"), frames
+
+    # an upstream failure mid-stream ends with an error frame
+    failing = build_dispatcher(providers=simulated_factories({"text": SimulationProfile(
+        time_scale=0, text_tokens=(6, 6), error_rate=1.0, seed=1,
+    )}))
+    *partials, final = list(failing.dispatch_stream(request))
+    assert all(frame.meta["partial"] for frame in partials) and not final.success, final
+
+    # the shells write the same frames: NDJSON / SSE over HTTP, lines over STDIO
+    handler = type("_Handler", (MCPHandler,), {"dispatcher": dispatcher})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for accept, prefix, separator in (("application/json", b"", b"\n"), ("text/event-stream", b"data: ", b"\n\n")):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            conn.request("POST", "/mcp", body=json.dumps(_stream_payload()), headers={"Accept": accept})
+            response = conn.getresponse()
+            assert response.getheader("Transfer-Encoding") == "chunked", response.getheaders()
+            events = response.read().split(separator)[:-1]
+            assert all(event.startswith(prefix) for event in events), events
+            _check_frames([json.loads(event[len(prefix):]) for event in events])
+            conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    lines = list(stdio.handle_line(dispatcher, json.dumps({**_stream_payload(), "meta": {"id": 3}}).encode()))
+    frames = [json.loads(line) for line in lines]
+    _check_frames(frames)
+    assert all(frame["meta"]["id"] == 3 for frame in frames), frames
+
+
+def test_json_codecs():
+    logger.debug("=== TEST: JSON backends write the same bytes ===")
+    if "orjson" not in CODECS:
+        print("orjson not installed; nothing to compare")
+        return
+    fast, stdlib = CODECS["orjson"](), CODECS["stdlib"]()
+
+    response = MCPResponse.success_response(
+        data={"text": "héllo ☃ 😀", "chunk": b"\x00\xffmp3", "view": memoryview(b"xy"), "nested": {"a": [1, -2, 3.5, True, None]}},
+        meta={"id": 7, "partial": True, "note": 'quote" back\\ nl\n ctl\x01'},
+    ).to_dict()
+    error = MCPResponse.error_response(error={"code": "X", "details": {1: "int key"}}).to_dict()
+    for obj in (response, error):
+        for pretty in (False, True):
+            assert fast.dumps_bytes(obj, pretty) == stdlib.dumps_bytes(obj, pretty), (obj, pretty)
+            assert fast.dumps(obj, pretty) == stdlib.dumps(obj, pretty), (obj, pretty)
+
+    # exponent formatting may differ (1e20 / 1e+20); the values may not
+    numbers = [0.1, 1e20, 1e-7, 2 ** 53, -0.0]
+    assert fast.loads(fast.dumps_bytes(numbers)) == stdlib.loads(stdlib.dumps_bytes(numbers)) == numbers
+    raw = '{"a": "\\u00e9", "b": [1, 2.5, null]}'
+    assert fast.loads(raw) == stdlib.loads(raw) == fast.loads(raw.encode()) == stdlib.loads(raw.encode())
+
+    # MCP_JSON_BACKEND picks the backend; the CLI answers the same either way
+    repo_root = Path(__file__).resolve().parent
+    payload = b'{"tool":"validate_input","input":{"fields":{"a":"\xc3\xa9"},"required":["a","b"]}}'
+    outputs = {}
+    for name in ("orjson", "stdlib"):
+        env = {**os.environ, "MCP_NO_DAEMON": "1", "MCP_JSON_BACKEND": name}
+        probe = subprocess.run(
+            [sys.executable, "-c", "from utils import json; print(json.backend())"],
+            cwd=repo_root, env=env, capture_output=True, check=True,
+        )
+        assert probe.stdout.strip() == name.encode(), probe
+        outputs[name] = subprocess.run(
+            [sys.executable, "-m", "shell.cli"],
+            cwd=repo_root, env=env, input=payload, capture_output=True, check=True,
+        ).stdout
+    assert outputs["orjson"] == outputs["stdlib"] and b'"valid":false' in outputs["stdlib"], outputs
+
+
+class _FixedImage:
+    """Image executor answering one small PNG as a memoryview."""
+
+    PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+    def generate(self, prompt, save_to_file=False, file_path=None):
+        return memoryview(self.PNG)
+
+
+def test_http_image_responses():
+    logger.debug("=== TEST: Raw and multipart image responses ===")
+    dispatcher = build_dispatcher(providers={"pollinations_image": _FixedImage})
+    handler = type("_Handler", (MCPHandler,), {"dispatcher": dispatcher})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    payload = json.dumps({"tool": "ai", "ai": {"provider": "pollinations_image", "type": "image"}, "input": {"prompt": "kucing"}})
+
+    def fetch(accept):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        try:
+            conn.request("POST", "/mcp", body=payload, headers={"Accept": accept})
+            response = conn.getresponse()
+            return response.getheader("Content-Type"), response.read()
+        finally:
+            conn.close()
+
+    try:
+        # the image as the whole body
+        content_type, body = fetch("image/*")
+        assert content_type == "image/png" and body == _FixedImage.PNG, content_type
+
+        # JSON envelope and raw image as two parts
+        content_type, body = fetch("multipart/mixed")
+        message = email.message_from_bytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        envelope, image = message.get_payload()
+        assert envelope.get_content_type() == "application/json", envelope
+        envelope = json.loads(envelope.get_payload(decode=True))
+        assert envelope["success"] and envelope["data"]["image"] == {
+            "content_type": "image/png", "size": len(_FixedImage.PNG), "part": 2,
+        }, envelope
+        assert image.get_content_type() == "image/png" and image.get_payload(decode=True) == _FixedImage.PNG
+
+        # anything else gets JSON with the image in base64
+        content_type, body = fetch("application/json")
+        assert content_type == "application/json", content_type
+        assert base64.b64decode(json.loads(body)["data"]["image"]) == _FixedImage.PNG
+
+        # errors stay JSON whatever the client accepts
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("POST", "/mcp", body=payload.replace("kucing", " "), headers={"Accept": "image/*"})
+        response = conn.getresponse()
+        assert response.getheader("Content-Type") == "application/json", response.getheaders()
+        assert not json.loads(response.read())["success"]
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _AudioUpstream(BaseHTTPRequestHandler):
+    """Serves MP3 bytes per prompt: whole, cut short, or cut mid-chunk."""
+
+    protocol_version = "HTTP/1.1"
+    MP3 = b"ID3" + bytes(range(256)) * 8
+
+    def do_GET(self):
+        prompt = self.path.split("?", 1)[0].strip("/")
+        half = len(self.MP3) // 2
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        if prompt == "chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"%x\r\n%s\r\n" % (half, self.MP3[:half]))
+        else:
+            self.send_header("Content-Length", str(len(self.MP3)))
+            self.end_headers()
+            self.wfile.write(self.MP3[:half])
+            self.wfile.flush()
+            if prompt == "whole":
+                time.sleep(0.05)
+                self.wfile.write(self.MP3[half:])
+        self.wfile.flush()
+        if prompt != "whole":
+            self.close_connection = True
+
+    def log_message(self, *_):
+        return
+
+
+def test_audio_stream():
+    logger.debug("=== TEST: Audio streams to disk atomically ===")
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), _AudioUpstream)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    client = PollinationsAudioClient(endpoint=f"http://127.0.0.1:{upstream.server_address[1]}")
+    dispatcher = build_dispatcher(providers={"pollinations_audio": lambda: client})
+    handler = type("_Handler", (MCPHandler,), {"dispatcher": dispatcher})
+    server = PooledHTTPServer(("127.0.0.1", 0), handler, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(prompt, file_path):
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        try:
+            conn.request("POST", "/mcp", headers={"Accept": "audio/*"}, body=json.dumps({
+                "tool": "ai", "ai": {"provider": "pollinations_audio", "type": "audio"},
+                "input": {"prompt": prompt, "file_path": file_path, "stream": True},
+            }))
+            response = conn.getresponse()
+            return response.getheader("Content-Type"), response.read()
+        finally:
+            conn.close()
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            target = Path(workdir) / "answer.mp3"
+
+            # chunks arrive as they download and land in the file
+            chunks = list(client.stream_audio("whole", target, chunk_size=1024))
+            assert len(chunks) > 1 and b"".join(chunks) == _AudioUpstream.MP3, [len(chunk) for chunk in chunks]
+            assert target.read_bytes() == _AudioUpstream.MP3
+
+            # a failed or abandoned download leaves the old file and no temp file
+            for prompt in ("short", "chunked"):
+                try:
+                    list(client.stream_audio(prompt, target))
+                    raise AssertionError(f"{prompt} download was accepted")
+                except RuntimeError:
+                    pass
+            pieces = client.stream_audio("whole", target)
+            next(pieces)
+            pieces.close()
+            assert sorted(os.listdir(workdir)) == ["answer.mp3"], os.listdir(workdir)
+            assert target.read_bytes() == _AudioUpstream.MP3
+
+            # over HTTP the MP3 is the chunked body
+            streamed = Path(workdir) / "streamed.mp3"
+            content_type, body = post("whole", str(streamed))
+            assert content_type == "audio/mpeg" and body == _AudioUpstream.MP3, content_type
+            assert streamed.read_bytes() == _AudioUpstream.MP3
+
+            # a mid-stream failure truncates the transfer and leaves no file
+            try:
+                post("short", str(Path(workdir) / "lost.mp3"))
+                raise AssertionError("truncated audio looked complete")
+            except http.client.IncompleteRead:
+                pass
+            assert sorted(os.listdir(workdir)) == ["answer.mp3", "streamed.mp3"], os.listdir(workdir)
+    finally:
+        server.shutdown()
+        server.server_close()
+        upstream.shutdown()
+        upstream.server_close()
+
+
+class _Counting:
+    """Executor that counts calls; writes a file when asked to."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, seed=None, save_to_file=False, file_path=None):
+        self.calls += 1
+        if save_to_file:
+            Path(file_path).write_bytes(f"{prompt}:{self.calls}".encode())
+            return file_path
+        return f"{prompt}:{self.calls}"
+
+
+def test_disk_cache():
+    logger.debug("=== TEST: Disk cache writes, seeds and lost blobs ===")
+    with tempfile.TemporaryDirectory() as root:
+        cache = DiskCache(Path(root) / "cache")
+        cache.put_text("k1", "halo")
+        cache.put_bytes("k2", b"\x00\x01")
+        assert cache.get("k1").text == "halo"
+        assert cache.get("k2").blob_path.read_bytes() == b"\x00\x01"
+
+        # a failed write leaves neither a temp file nor an entry behind
+        try:
+            cache.put_file("k3", Path(root) / "missing.png")
+            raise AssertionError("OSError expected")
+        except OSError:
+            pass
+        assert cache.get("k3") is None
+        assert not list((Path(root) / "cache").rglob("*.tmp"))
+
+        # only explicit non-negative int seeds are cached
+        for seed, calls in ((7, 1), (0, 1), (-1, 2), (None, 2), ("7", 2), (True, 2)):
+            inner = _Counting()
+            executor = CachedExecutor(inner, DiskCache(Path(root) / f"seed{seed}"), provider="p", ai_type="text")
+            first, second = executor.generate("halo", seed=seed), executor.generate("halo", seed=seed)
+            assert inner.calls == calls, (seed, inner.calls)
+            assert (first == second) == (calls == 1), (seed, first, second)
+
+        # a blob lost after the entry was written is a miss, not an error
+        inner = _Counting()
+        cache = DiskCache(Path(root) / "files")
+        executor = CachedExecutor(inner, cache, provider="p", ai_type="image")
+        target = Path(root) / "out.png"
+        assert executor.generate("kucing", seed=1, save_to_file=True, file_path=str(target)) == str(target)
+        assert executor.generate("kucing", seed=1, save_to_file=True, file_path=str(target)) == str(target)
+        assert inner.calls == 1 and target.read_bytes() == b"kucing:1"
+
+        for blob in (Path(root) / "files").rglob("*.bin"):
+            blob.unlink()
+        assert executor.generate("kucing", seed=1, save_to_file=True, file_path=str(target)) == str(target)
+        assert inner.calls == 2 and target.read_bytes() == b"kucing:2"
+
+
+def test_executor_registry():
+    logger.debug("=== TEST: Lazy executor registry ===")
+    built = []
+
+    def _slow():
+        time.sleep(0.3)
+        built.append("slow")
+        return "slow"
+
+    def _broken():
+        raise KeyError("model")
+
+    registry = ExecutorRegistry({"slow": _slow, "fast": lambda: "fast", "broken": _broken})
+    assert registry.loaded() == {}
+
+    # a slow factory does not hold up other keys, and runs only once
+    start = time.perf_counter()
+    timed = lambda key: (registry[key], time.perf_counter() - start)
+    results = _in_parallel((lambda: timed("slow"), 0), (lambda: timed("slow"), 0), (lambda: timed("fast"), 0.05))
+    assert [value for value, _ in results] == ["slow", "slow", "fast"]
+    assert results[2][1] < 0.2, results
+    assert built == ["slow"]
+
+    # a KeyError inside a factory is not a missing provider
+    assert registry.get("nope") is None
+    try:
+        registry.get("broken")
+        raise AssertionError("KeyError expected")
+    except KeyError as exc:
+        assert exc.args == ("model",)
+
+    dispatcher = build_dispatcher(providers={"broken": _broken})
+    request = MCPRequest.from_dict({"tool": "ai", "ai": {"provider": "broken", "type": "text"}, "input": {"prompt": "halo"}})
+    assert _code(dispatcher.dispatch(request)) == "INTERNAL_ERROR"
+
+
+def test_daemon_timeout():
+    logger.debug("=== TEST: A wedged daemon falls back to in-process ===")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "mcp.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        os.chmod(path, 0o600)
+        listener.listen(1)
+        # accepts, then never answers
+        accepted = []
+        threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True).start()
+
+        try:
+            start = time.perf_counter()
+            assert daemon.forward(b"{}", path, timeout=0.2) is None
+            assert time.perf_counter() - start < 1
+            assert accepted
+        finally:
+            for conn, _ in accepted:
+                conn.close()
+            listener.close()
+
+
+class _SlowImages:
+    """Sync-only image executor that counts upstream calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, save_to_file=False, file_path=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return file_path or b"image"
+
+
+def test_hedging_skips_file_outputs():
+    logger.debug("=== TEST: Hedging never duplicates a file write ===")
+    # hedge after 10 ms; every call takes 50 ms
+    policy = HedgePolicy(initial_delay=0.01, min_samples=1000, window=1000)
+
+    images = _SlowImages()
+    executor = HedgedExecutor(images, policy)
+    assert executor.generate("kucing") == b"image"
+    assert images.calls == 2, images.calls
+
+    images = _SlowImages()
+    executor = HedgedExecutor(images, policy)
+    target = str(OUTPUT_DIR / "hedged.png")
+    assert executor.generate("kucing", save_to_file=True, file_path=target) == target
+    assert images.calls == 1 and executor.stats()["hedges"] == 0, executor.stats()
+
+
+class _Flaky:
+    """Executor that fails `failures` times with `error`, then answers."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_hedging_retries():
+    logger.debug("=== TEST: Transient failures are retried within the budget ===")
+    policy = HedgePolicy(hedge_percentile=None, backoff_base=0.01, seed=1)
+
+    flaky = _Flaky(2, RuntimeError("upstream: HTTP 503"))
+    executor = HedgedExecutor(flaky, policy)
+    assert executor.generate("halo") == "ok"
+    assert flaky.calls == 3 and executor.stats()["retries"] == 2, executor.stats()
+
+    # not transient: raised at once
+    flaky = _Flaky(1, ValueError("bad prompt"))
+    executor = HedgedExecutor(flaky, policy)
+    try:
+        executor.generate("halo")
+        raise AssertionError("ValueError expected")
+    except ValueError:
+        pass
+    assert flaky.calls == 1
+
+    # a budget of one extra attempt allows one retry, then gives up
+    policy = HedgePolicy(hedge_percentile=None, backoff_base=0.01, budget_ratio=0, budget_burst=1, seed=1)
+    flaky = _Flaky(5, RuntimeError("upstream: HTTP 503"))
+    executor = HedgedExecutor(flaky, policy)
+    try:
+        executor.generate("halo")
+        raise AssertionError("RuntimeError expected")
+    except RuntimeError:
+        pass
+    assert flaky.calls == 2 and executor.stats()["budget_denied"] == 1, executor.stats()
+
+
+def test_stdio_pipelining():
+    logger.debug("=== TEST: Pipelined STDIO answers fast requests first ===")
+    dispatcher = build_dispatcher(providers=simulated_factories({"text": SLOW_TEXT}))
+    slow = {"tool": "ai", "ai": {"provider": "pollinations", "type": "text"},
+            "input": {"prompt": "halo"}, "meta": {"id": 1}}
+    fast = {"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}, "meta": {"id": 2}}
+    lines = (json.dumps(slow) + "\n" + json.dumps(fast) + "\n").encode()
+
+    for ordered, expected in ((False, [2, 1]), (True, [1, 2])):
+        stdout = io.BytesIO()
+        stdio.serve(dispatcher, concurrency=4, ordered=ordered, stdin=io.BytesIO(lines), stdout=stdout)
+        ids = [json.loads(line)["meta"]["id"] for line in stdout.getvalue().splitlines()]
+        assert ids == expected, (ordered, ids)
+
+
+class _BrokenStreams:
+    """Dispatcher stand-in whose streams fail after the first frame."""
+
+    def __init__(self):
+        self._dispatcher = build_dispatcher()
+
+    def dispatch_payload(self, payload, render=None):
+        return self._dispatcher.dispatch_payload(payload, render)
+
+    def dispatch_stream(self, request):
+        yield MCPResponse.success_response(data={"delta": "ha"}, meta={"partial": True})
+        raise RuntimeError("upstream stream broke")
+
+
+def test_stdio_ordered_handler_error():
+    logger.debug("=== TEST: Ordered STDIO output survives a failing request ===")
+    tool = {"tool": "validate_input", "input": {"fields": {"a": 1}, "required": ["a"]}}
+    stream = {"tool": "ai", "ai": {"provider": "pollinations", "type": "text"},
+              "input": {"prompt": "halo", "stream": True}}
+    lines = [
+        json.dumps({**tool, "meta": {"id": 1}}),
+        json.dumps({**stream, "meta": {"id": 2}}),
+        json.dumps({**tool, "meta": {"id": 3}}),
+    ]
+    stdin = io.BytesIO("\n".join(lines).encode() + b"\n")
+    stdout = io.BytesIO()
+
+    stdio.serve(_BrokenStreams(), concurrency=4, ordered=True, stdin=stdin, stdout=stdout)
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [r["meta"]["id"] for r in responses] == [1, 2, 2, 3], responses
+    assert responses[2]["error"]["code"] == "INTERNAL_ERROR", responses[2]
+    assert responses[3]["success"], responses[3]
+
 
 if __name__ == "__main__":
+    test_cli_cold_start()
+    test_connection_pool()
+    test_http_keepalive()
+    test_http_shutdown()
+    test_middleware()
+    test_disk_cache()
+    test_executor_registry()
+    test_daemon_timeout()
+    test_singleflight_coalescing()
+    test_rate_limiter()
+    test_bulkhead()
+    test_request_deadline()
+    test_metrics_prometheus()
+    test_singleflight_deadline()
+    test_hedging_retries()
+    test_hedging_skips_file_outputs()
+    test_stdio_pipelining()
+    test_stdio_ordered_handler_error()
+    test_compiled_validation()
+    test_dispatch_async()
+    test_provider_runtime()
+    test_dispatch_batch()
+    test_result_cache()
+    test_dispatch_stream()
+    test_json_codecs()
+    test_http_image_responses()
+    test_audio_stream()
     test_pollinations_text()
     test_pollinations_image()
     # test_pollinations_audio()
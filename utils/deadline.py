@@ -0,0 +1,80 @@
+# mcp_sdk/utils/deadline.py
+
+"""
+Request deadline carried in a context variable.
+
+The dispatcher opens a scope for each AI request that has
+meta.timeout_ms or meta.deadline_ms. Code running inside it bounds its
+blocking waits with remaining(): rate-limit and bulkhead queues,
+coalesced callers, the provider runtime and socket timeouts. Context
+variables follow asyncio tasks and asyncio.to_thread, so the deadline
+reaches worker threads without being passed around.
+
+Deadlines are time.monotonic() instants; a nested scope can only
+shorten the current deadline. Work shared by several requests (a
+coalesced upstream call) runs detached() from any one caller's
+deadline; each caller bounds only its own wait for it.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("mcp_deadline", default=None)
+
+
+def current() -> Optional[float]:
+    """The active deadline (a time.monotonic() instant), or None."""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the active deadline (never negative), or None."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def bound(timeout: Optional[float]) -> Optional[float]:
+    """`timeout` shortened to the time left (None means no limit)."""
+    left = remaining()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    return min(timeout, left)
+
+
+@contextmanager
+def scope(deadline: Optional[float]) -> Iterator[None]:
+    """Run the block under `deadline` (or the earlier active one)."""
+    if deadline is None:
+        yield
+        return
+
+    active = _deadline.get()
+    token = _deadline.set(deadline if active is None else min(active, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Run the block without any deadline."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -1,16 +1,121 @@
 # mcp_sdk/utils/json.py
 
+"""
+JSON codec used by every shell.
+
+A fast backend (orjson) is used when installed, stdlib json otherwise.
+Set MCP_JSON_BACKEND=stdlib (or orjson) to force a backend.
+
+Shells should prefer the bytes entry points (loads_bytes / dumps_bytes):
+they avoid the intermediate str decode/encode copies on transport IO.
+
+Binary values (bytes, bytearray, memoryview) are encoded as base64
+strings by both backends.
+"""
+
 from __future__ import annotations
 
+import base64
 import json
-from typing import Any
+import os
+from typing import Any, Callable, Dict
 
 
 class JSONError(ValueError):
     """Raised when JSON parsing or serialization fails."""
 
 
-def loads(raw: str) -> dict[str, Any]:
+# -------------------------------------------------
+# Backends
+# -------------------------------------------------
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _StdlibCodec:
+    name = "stdlib"
+
+    @staticmethod
+    def loads(raw: str | bytes) -> Any:
+        if isinstance(raw, (bytes, bytearray)):
+            # explicit UTF-8 decode skips json's encoding detection
+            raw = raw.decode("utf-8")
+        return json.loads(raw)
+
+    @staticmethod
+    def dumps(data: Any, pretty: bool = False) -> str:
+        if pretty:
+            return json.dumps(data, ensure_ascii=False, indent=2, default=_default)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    @classmethod
+    def dumps_bytes(cls, data: Any, pretty: bool = False) -> bytes:
+        return cls.dumps(data, pretty).encode("utf-8")
+
+
+class _OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._compact = orjson.OPT_NON_STR_KEYS
+        self._pretty = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+
+    def loads(self, raw: str | bytes) -> Any:
+        return self._orjson.loads(raw)
+
+    def dumps(self, data: Any, pretty: bool = False) -> str:
+        return self.dumps_bytes(data, pretty).decode("utf-8")
+
+    def dumps_bytes(self, data: Any, pretty: bool = False) -> bytes:
+        return self._orjson.dumps(
+            data, default=_default, option=self._pretty if pretty else self._compact
+        )
+
+
+def _available_codecs() -> Dict[str, Callable[[], Any]]:
+    codecs: Dict[str, Callable[[], Any]] = {}
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        codecs["orjson"] = _OrjsonCodec
+    codecs["stdlib"] = _StdlibCodec
+    return codecs
+
+
+CODECS = _available_codecs()
+
+
+def _select_codec() -> Any:
+    requested = os.environ.get("MCP_JSON_BACKEND")
+    if requested:
+        if requested not in CODECS:
+            raise JSONError(f"JSON backend not available: {requested}")
+        return CODECS[requested]()
+    # first entry is the fastest available
+    return next(iter(CODECS.values()))()
+
+
+_codec = _select_codec()
+
+
+def backend() -> str:
+    """Name of the active JSON backend."""
+    return _codec.name
+
+
+# -------------------------------------------------
+# Public API
+# -------------------------------------------------
+
+def loads(raw: str | bytes) -> dict[str, Any]:
     """
     Parse JSON string into dict.
 
@@ -19,8 +124,8 @@ def loads(raw: str) -> dict[str, Any]:
     - no silent fallback
     """
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as e:
+        data = _codec.loads(raw)
+    except ValueError as e:
         raise JSONError(str(e)) from e
 
     if not isinstance(data, dict):
@@ -29,11 +134,46 @@ def loads(raw: str) -> dict[str, Any]:
     return data
 
 
+def loads_bytes(raw: bytes | bytearray | memoryview) -> dict[str, Any]:
+    """
+    Parse UTF-8 JSON bytes into dict without decoding to str first.
+    """
+    if isinstance(raw, memoryview):
+        raw = raw.tobytes()
+    return loads(raw)
+
+
+def loads_array(raw: str | bytes) -> list[Any]:
+    """
+    Parse JSON string into list (batch payloads).
+
+    Rules:
+    - input must be valid JSON array
+    - no silent fallback
+    """
+    try:
+        data = _codec.loads(raw)
+    except ValueError as e:
+        raise JSONError(str(e)) from e
+
+    if not isinstance(data, list):
+        raise JSONError("JSON root must be an array")
+
+    return data
+
+
 def dumps(data: Any, pretty: bool = False) -> str:
     try:
-        if pretty:
-            return json.dumps(data, ensure_ascii=False, indent=2)
-        else:
-            return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return _codec.dumps(data, pretty)
+    except (TypeError, ValueError) as e:
+        raise JSONError(str(e)) from e
+
+
+def dumps_bytes(data: Any, pretty: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes, ready to write to a socket or pipe.
+    """
+    try:
+        return _codec.dumps_bytes(data, pretty)
     except (TypeError, ValueError) as e:
         raise JSONError(str(e)) from e